@@ -0,0 +1,40 @@
+"""
+Streaming File Responses for the Export Endpoints
+
+The rows are read while the response is being sent, through a server-side
+cursor (stream_results), so neither the query result nor the file is ever
+held in memory. The stream outlives the route, so it opens its own session.
+"""
+
+from typing import List, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.database import SessionLocal
+from app.services.exports import EXPORT_BATCH_SIZE, MEDIA_TYPES, csv_chunks, xlsx_chunks
+
+ExportFormat = Literal["csv", "xlsx"]
+
+
+def _stream_rows(query: Select):
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            yield row
+    finally:
+        db.close()
+
+
+def export_response(name: str, columns: List[str], query: Select, file_format: ExportFormat) -> StreamingResponse:
+    """
+    Stream the rows of `query` as a CSV or XLSX attachment named `name`.<format>
+    """
+    rows = _stream_rows(query)
+    chunks = xlsx_chunks(columns, rows, title=name) if file_format == "xlsx" else csv_chunks(columns, rows)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{file_format}"'}
+    )
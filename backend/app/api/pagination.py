@@ -0,0 +1,167 @@
+"""
+Keyset Pagination and Field Projection for List Endpoints
+
+1. Pages are ordered on a unique key (id, or (created_at, id)); the cursor is
+   the key of the last item served, encoded as an opaque string. The next page
+   is `WHERE key > cursor ORDER BY key LIMIT n`, which an index answers
+   directly however deep the page is (OFFSET has to skip every earlier row).
+   Paging starts when the client passes `limit` or `cursor`: a plain request
+   still gets every item, so existing callers are not silently truncated.
+2. Response bodies keep their shape (lists stay lists): the cursor of the next
+   page is sent in the X-Next-Cursor header, absent on the last page.
+3. `fields=id,title` restricts every item to the listed fields, so a client can
+   skip heavy parts such as embedded rosters.
+"""
+
+from typing import List, Optional, Sequence, Set, Tuple
+from datetime import datetime
+import base64
+import json
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List:
+    """
+    Key values of a cursor, converted back to the python type of each column
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for value, column in zip(values, columns)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(
+    query: Query,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: Optional[int],
+    descending: bool = False
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of a query ordered on a unique key
+
+    Args:
+        query: Query returning ORM objects or rows that expose the key columns
+        columns: Key columns, the last one unique (usually the primary key)
+        cursor: Cursor returned with the previous page (None for the first page)
+        limit: Page size (None: DEFAULT_PAGE_SIZE with a cursor, every item without)
+        descending: Newest first (for (created_at, id) keys)
+
+    Returns:
+        Tuple of (items, next_cursor), next_cursor being None on the last page
+    """
+    limit = _page_size(cursor, limit)
+    items = _page_query(query, columns, cursor, limit, descending).all()
+    return _split_page(items, columns, limit)
+
+
+async def keyset_page_async(
+    db: AsyncSession,
+    statement: Select,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: Optional[int],
+    descending: bool = False
+) -> Tuple[List, Optional[str]]:
+    """
+    keyset_page for a select() run on an AsyncSession
+
+    Items are ORM objects when `statement` selects a single entity, rows
+    otherwise (as with a Query).
+    """
+    limit = _page_size(cursor, limit)
+    result = await db.execute(_page_query(statement, columns, cursor, limit, descending))
+    description = statement.column_descriptions[0]
+    single_entity = len(statement.column_descriptions) == 1 and description["expr"] is description["entity"]
+    items = result.scalars().all() if single_entity else result.all()
+    return _split_page(items, columns, limit)
+
+
+def _page_size(cursor: Optional[str], limit: Optional[int]) -> Optional[int]:
+    if limit is None and cursor:
+        return DEFAULT_PAGE_SIZE
+    return limit
+
+
+def _page_query(query, columns: Sequence, cursor: Optional[str], limit: Optional[int], descending: bool):
+    # Query and Select share filter / order_by / limit
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        after = tuple_(*values) if len(columns) > 1 else values[0]
+        query = query.filter(key < after if descending else key > after)
+
+    query = query.order_by(*[column.desc() if descending else column for column in columns])
+    return query if limit is None else query.limit(limit + 1)
+
+
+def _split_page(items: List, columns: Sequence, limit: Optional[int]) -> Tuple[List, Optional[str]]:
+    if limit is None or len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, column.key) for column in columns])
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[Set[str]]:
+    """
+    Field names of a `fields=a,b,c` parameter (None when no projection is asked)
+    """
+    if not fields:
+        return None
+    selected = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = selected - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))} (available: {', '.join(allowed)})"
+        )
+    return selected
+
+
+def page_response(
+    response: Response,
+    items: List,
+    next_cursor: Optional[str],
+    fields: Optional[Set[str]] = None,
+    model=None
+):
+    """
+    Return a page: the items as they are, or projected on `fields`
+
+    Projected items no longer match the endpoint's response model, so they are
+    validated with `model` first (plain dict items are projected as they are),
+    then serialised directly.
+    """
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    if fields is None:
+        response.headers.update(headers)
+        return items
+
+    if model is not None:
+        projected = [model.model_validate(item).model_dump(include=fields) for item in items]
+    else:
+        projected = [{name: value for name, value in item.items() if name in fields} for item in items]
+    return JSONResponse(content=jsonable_encoder(projected), headers=headers)
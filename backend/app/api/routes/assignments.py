@@ -1,13 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, get_db
 from app.models.assignment import Assignment
-from app.models.project import Project, ProjectType
+from app.models.project import Project, ProjectType, project_students
+from app.models.student import Student
+from app.models.university import University
 from app.models.preference import StudentPreference
-from app.services.group_algorithm import assign_students_to_groups
-from pydantic import BaseModel
-from typing import List, Optional
+from app.services.group_algorithm import assign_students_to_groups, GroupFormationAlgorithm
+from app.services.group_balancing import balance_groups
+from app.services.genetic_algorithm import evolve_groups
+from app.services.exact_solver import solve_groups_exactly, MAX_EXACT_STUDENTS
+from app.services.english_leveling import assign_students_by_level
+from app.services.exchange_matching import match_students_to_universities, parse_university_ranking
+from app.services.project_assignment import assign_students_to_projects, rank_to_satisfaction
+from app.services.job_queue import job_queue, AlgorithmJob, JobCancelled
+from app.services.batch_runner import run_group_projects_batch, group_assignment_rows
+from app.services.bulk_writer import bulk_insert_assignments
+from app.services.preview_cache import preview_cache, fingerprint, CachedPreview
+from app.services.run_history import (
+    record_run, deactivate_runs, get_active_run, activate_run, diff_runs, SATISFIED_SCORE
+)
+from app.models.algorithm_run import AlgorithmRun
+from app.services.exports import assignment_export
+from app.api.pagination import MAX_PAGE_SIZE, keyset_page_async, parse_fields, page_response
+from app.api.exports import ExportFormat, export_response
+from app.database import SessionLocal
+from pydantic import BaseModel, Field
+from sqlalchemy import or_, func, case, delete, distinct, select
+from typing import List, Optional, Literal, Callable, Tuple
 from datetime import datetime
+from collections import defaultdict
+import time
 import uuid
 
 router = APIRouter()
@@ -30,8 +56,29 @@ class AssignmentStats(BaseModel):
     average_group_size: float
     mutual_matches: int
 
+class BalanceWeights(BaseModel):
+    partner: float = Field(default=1.0, ge=0)  # Partner preferences satisfied
+    filiere: float = Field(default=0.0, ge=0)  # Filière diversity inside groups
+    gpa: float = Field(default=0.0, ge=0)  # Similar mean GPA across groups
+    english: float = Field(default=0.0, ge=0)  # Similar mean English level across groups
+
 class RunAlgorithmRequest(BaseModel):
     project_id: int
+    solver: Literal["greedy", "genetic", "exact"] = "greedy"  # exact: small cohorts only
+    generations: int = Field(default=200, ge=1, le=100000)  # Genetic solver only
+    time_budget_ms: Optional[int] = Field(default=None, ge=1)  # Wall-clock limit for iterative solvers
+    seed: Optional[int] = None
+    restarts: int = Field(default=1, ge=1, le=256)  # Greedy solver only: best of N seeded runs
+    balance: Optional[BalanceWeights] = None  # Rebalance groups on student profiles after the solve
+    dry_run: bool = False  # Group projects only: return the groups without saving them
+
+class RunProjectAssignmentRequest(BaseModel):
+    project_ids: Optional[List[int]] = None  # Defaults to every active project
+
+class RunBatchRequest(BaseModel):
+    project_ids: Optional[List[int]] = None  # Defaults to every active group project
+    time_budget_ms: Optional[int] = Field(default=None, ge=1)  # Local search budget per project
+    seed: Optional[int] = None
 
 class RunAlgorithmResponse(BaseModel):
     status: str
@@ -39,45 +86,241 @@ class RunAlgorithmResponse(BaseModel):
     assignments_created: int
     groups_created: int
     stats: dict
+    groups: Optional[List[List[int]]] = None  # Dry runs only
+    preview_key: Optional[str] = None  # Dry runs only: commit with POST /previews/{preview_key}/commit
+    cleared_project_ids: Optional[List[int]] = None  # Project assignment only: other projects whose assignments were removed
+
+class RunBatchResponse(BaseModel):
+    projects: List[dict]
+    total_seconds: float
+
+class AlgorithmRunResponse(BaseModel):
+    id: str
+    project_id: int
+    algorithm: str
+    parameters: Optional[dict] = None
+    stats: Optional[dict] = None
+    total_assignments: int
+    total_groups: int
+    satisfied_students: int
+    solve_seconds: Optional[float] = None
+    is_active: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class JobResponse(BaseModel):
+    id: str
+    project_id: Optional[int] = None
+    status: str
+    phase: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[RunAlgorithmResponse] = None
+    error: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+def _no_report(phase: str):
+    pass
 
 @router.get("/", response_model=List[AssignmentResponse])
-async def get_assignments(project_id: Optional[int] = None, db: Session = Depends(get_db)):
-    """Get all assignments, optionally filtered by project"""
-    query = db.query(Assignment)
+async def get_assignments(
+    response: Response,
+    project_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get assignments, optionally filtered by project
+    
+    Paginated by id: pass the X-Next-Cursor response header back as `cursor`.
+    `fields=student_id,group_number` returns only those fields.
+    """
+    selected = parse_fields(fields, list(AssignmentResponse.model_fields))
+    query = select(Assignment)
     
     if project_id:
-        query = query.filter(Assignment.project_id == project_id)
+        query = query.where(Assignment.project_id == project_id)
+    
+    assignments, next_cursor = await keyset_page_async(db, query, [Assignment.id], cursor, limit)
+    return page_response(response, assignments, next_cursor, selected, AssignmentResponse)
+
+@router.get("/projects/{project_id}/export")
+def export_project_assignments(
+    project_id: int,
+    format: ExportFormat = "csv",
+    db: Session = Depends(get_db)
+):
+    """
+    Download the assignments of a project, group by group, as CSV or XLSX
+    
+    Streamed: the rows are read from a server-side cursor while the file is sent.
+    """
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
     
-    assignments = query.all()
-    return assignments
+    columns, query = assignment_export(project_id)
+    return export_response(f"project_{project_id}_assignments", columns, query, format)
 
 @router.post("/run-algorithm", response_model=RunAlgorithmResponse)
-async def run_assignment_algorithm(request: RunAlgorithmRequest, db: Session = Depends(get_db)):
+def run_assignment_algorithm(request: RunAlgorithmRequest, db: Session = Depends(get_db)):
     """
     Run the group formation algorithm for a specific project
     
+    The solve happens in the request (on FastAPI's thread pool, so other
+    requests keep being served). For large cohorts, prefer POST /jobs and poll.
+    """
+    return _run_algorithm(request, db)
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_algorithm_job(request: RunAlgorithmRequest, db: Session = Depends(get_db)):
+    """
+    Queue a run-algorithm solve and return its job id right away
+    
+    Poll GET /jobs/{job_id} for the current phase, then the result or error.
+    """
+    if not db.query(Project.id).filter(Project.id == request.project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    def run(job: AlgorithmJob) -> RunAlgorithmResponse:
+        # The job outlives the request: it gets its own session
+        job_db = SessionLocal()
+        try:
+            return _run_algorithm(request, job_db, job.report, job.cancel_requested)
+        finally:
+            job_db.close()
+    
+    return job_queue.submit(run, project_id=request.project_id)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_algorithm_job(job_id: str):
+    """Get the phase of a queued solve, and its result once finished"""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+def cancel_algorithm_job(job_id: str):
+    """
+    Cancel a queued or running solve
+    
+    A queued job is cancelled at once. A running one cuts its solver short and
+    stops before saving, so it never writes its assignments.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return job_queue.cancel(job_id)
+
+@router.post("/previews/{preview_key}/commit", response_model=RunAlgorithmResponse)
+def commit_preview(preview_key: str, db: Session = Depends(get_db)):
+    """
+    Save the groups of a dry run as the project's assignments, without solving again
+    
+    The preview must still be cached, and the project's preferences must not
+    have changed since it was computed.
+    """
+    preview = preview_cache.get(preview_key)
+    if not preview:
+        raise HTTPException(status_code=404, detail="Preview not found, run a new dry run")
+    
+    project = db.query(Project).filter(Project.id == preview.project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    current_key, _ = _preview_key(project, _load_preferences(project.id, db), preview.parameters, db)
+    if current_key != preview_key:
+        raise HTTPException(status_code=409, detail="The project changed since this preview, run a new dry run")
+    
+    return _save_group_run(preview, db)
+
+def _run_algorithm(
+    request: RunAlgorithmRequest,
+    db: Session,
+    report: Callable[[str], None] = _no_report,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> RunAlgorithmResponse:
+    """
+    Run the algorithm matching the project type and save the assignments
+    
+    ENGLISH_LEVELING projects are grouped by English level from their roster
+    instead (see _run_english_leveling), and EXCHANGE_PROGRAM projects are
+    matched to universities (see _run_exchange_program).
+    
+    report(phase) is called when a phase starts (loading, solving, saving).
+    should_stop() is polled by the group solvers, which return their best
+    groups so far once it answers True; the run then raises JobCancelled.
+    
     Steps:
     1. Get project and validate it's a GROUP_PROJECT
     2. Get all student preferences for this project
-    3. Run algorithm to form groups
-    4. Create Assignment records
+    3. Run algorithm to form groups (a dry run, or a run with an explicit seed,
+       reuses the cached preview of the same inputs)
+    4. Create Assignment records, unless this is a dry run
     5. Return statistics
     """
+    report("loading")
+    
     # Get project
     project = db.query(Project).filter(Project.id == request.project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Only support GROUP_PROJECT for now
-    if project.project_type != ProjectType.GROUP_PROJECT:
-        raise HTTPException(
-            status_code=400, 
-            detail="Algorithm only supports GROUP_PROJECT type currently"
+    if request.dry_run and project.project_type != ProjectType.GROUP_PROJECT:
+        raise HTTPException(status_code=400, detail="Dry runs are only available for group projects")
+    
+    if project.project_type == ProjectType.ENGLISH_LEVELING:
+        return _run_english_leveling(project, db, report)
+    
+    if project.project_type == ProjectType.EXCHANGE_PROGRAM:
+        return _run_exchange_program(project, db, report)
+    
+    preference_dict = _load_preferences(request.project_id, db)
+    parameters = request.dict(exclude={"project_id", "dry_run"})
+    preview_key, profiles = _preview_key(project, preference_dict, parameters, db)
+    
+    # A save without a seed asks for a fresh solve, not the groups of an earlier run
+    reuse_preview = request.dry_run or request.seed is not None
+    preview = preview_cache.get(preview_key) if reuse_preview else None
+    if preview is None:
+        groups, stats, solve_seconds = _solve_groups(project, preference_dict, request, profiles, report, should_stop)
+        # A solve cut short by a cancellation is not the answer to these inputs:
+        # it is neither cached (later dry runs would reuse it) nor returned
+        if should_stop is not None and should_stop():
+            raise JobCancelled()
+        preview = CachedPreview(
+            preview_key, project.id, request.solver, parameters,
+            groups, preference_dict, stats, solve_seconds
         )
+        preview_cache.put(preview)
     
-    # Get all student preferences for this project
-    preferences = db.query(StudentPreference).filter(
-        StudentPreference.project_id == request.project_id
+    if request.dry_run:
+        return RunAlgorithmResponse(
+            status="preview",
+            message=f"Preview of {len(preview.groups)} groups (not saved)",
+            assignments_created=0,
+            groups_created=len(preview.groups),
+            stats=preview.stats,
+            groups=preview.groups,
+            preview_key=preview_key
+        )
+    
+    report("saving")
+    return _save_group_run(preview, db)
+
+def _load_preferences(project_id: int, db: Session) -> dict:
+    """Preference dict (student_id -> preferred_partner_id) of a group project"""
+    preferences = db.query(StudentPreference.student_id, StudentPreference.preferred_partner_id).filter(
+        StudentPreference.project_id == project_id
     ).all()
     
     if not preferences:
@@ -86,67 +329,470 @@ async def run_assignment_algorithm(request: RunAlgorithmRequest, db: Session = D
             detail="No student preferences found for this project"
         )
     
-    # Build preference dict and get all student IDs
-    student_ids = list(set([p.student_id for p in preferences]))
-    preference_dict = {}
+    return {pref.student_id: pref.preferred_partner_id for pref in preferences}
+
+def _preview_key(
+    project: Project,
+    preference_dict: dict,
+    parameters: dict,
+    db: Session
+) -> Tuple[str, Optional[list]]:
+    """
+    Fingerprint of a group formation run, and the student profiles when it balances on them
+    """
+    balance = parameters.get("balance")
+    profiles = None
+    if balance and (balance["filiere"] or balance["gpa"] or balance["english"]):
+        profiles = db.query(Student.id, Student.filiere, Student.gpa, Student.english_level).filter(
+            Student.id.in_(list(preference_dict))
+        ).all()
     
-    for pref in preferences:
-        preference_dict[pref.student_id] = pref.preferred_partner_id
+    key = fingerprint(
+        project.id, preference_dict, project.group_size or 3, parameters,
+        [tuple(row) for row in profiles] if profiles is not None else None
+    )
+    return key, profiles
+
+def _solve_groups(
+    project: Project,
+    preference_dict: dict,
+    request: RunAlgorithmRequest,
+    profiles: Optional[list],
+    report: Callable[[str], None] = _no_report,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[List[List[int]], dict, float]:
+    """
+    Run the requested solver, then the balancing pass if student profiles are given
+    """
+    student_ids = list(set(preference_dict))
     
     # Run algorithm
-    groups, stats = assign_students_to_groups(
-        student_ids=student_ids,
+    report("solving")
+    started = time.perf_counter()
+    if request.solver == "genetic":
+        groups, stats = evolve_groups(
+            student_ids=student_ids,
+            preferences=preference_dict,
+            group_size=project.group_size or 3,
+            generations=request.generations,
+            time_budget_s=request.time_budget_ms / 1000 if request.time_budget_ms else 10.0,
+            seed=request.seed,
+            should_stop=should_stop
+        )
+    elif request.solver == "exact":
+        if len(student_ids) > MAX_EXACT_STUDENTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"The exact solver handles at most {MAX_EXACT_STUDENTS} students, use the greedy or genetic solver"
+            )
+        # Stats include solution_value, upper_bound, gap and optimal
+        groups, stats = solve_groups_exactly(
+            student_ids=student_ids,
+            preferences=preference_dict,
+            group_size=project.group_size or 3,
+            time_budget_ms=request.time_budget_ms or 5000,
+            seed=request.seed,
+            should_stop=should_stop
+        )
+    else:
+        groups, stats = assign_students_to_groups(
+            student_ids=student_ids,
+            preferences=preference_dict,
+            group_size=project.group_size or 3,
+            time_budget_ms=request.time_budget_ms,  # Optional local search pass
+            seed=request.seed,
+            restarts=request.restarts,
+            should_stop=should_stop
+        )
+    
+    if profiles is not None:
+        groups, stats = _balance_groups(groups, preference_dict, request, stats, profiles, should_stop)
+    solve_seconds = time.perf_counter() - started
+    
+    return groups, stats, solve_seconds
+
+def _save_group_run(preview: CachedPreview, db: Session) -> RunAlgorithmResponse:
+    """
+    Replace the project's assignments with a solved grouping and record the run
+    """
+    groups = preview.groups
+    
+    # Delete existing assignments for this project
+    db.query(Assignment).filter(Assignment.project_id == preview.project_id).delete(synchronize_session=False)
+    
+    # Create Assignment records in bulk
+    algorithm_run_id = str(uuid.uuid4())
+    rows = group_assignment_rows(preview.project_id, groups, preview.preferences, preview.stats, algorithm_run_id)
+    assignments_created = bulk_insert_assignments(db, rows)
+    
+    record_run(
+        db, preview.project_id, algorithm_run_id, preview.algorithm,
+        preview.parameters, preview.stats, rows, preview.solve_seconds
+    )
+    db.commit()
+    
+    return RunAlgorithmResponse(
+        status="success",
+        message=f"Successfully created {len(groups)} groups for {assignments_created} students",
+        assignments_created=assignments_created,
+        groups_created=len(groups),
+        stats=preview.stats
+    )
+
+def _balance_groups(
+    groups: List[List[int]],
+    preference_dict: dict,
+    request: RunAlgorithmRequest,
+    stats: dict,
+    profiles: list,
+    should_stop: Optional[Callable[[], bool]] = None
+):
+    """
+    Trade partner satisfaction against filière, GPA and English-level balance
+    """
+    groups, balance = balance_groups(
+        groups=groups,
         preferences=preference_dict,
-        group_size=project.group_size or 3
+        students={row.id: (row.filiere, row.gpa, row.english_level) for row in profiles},
+        weights=request.balance.dict(),
+        time_budget_ms=request.time_budget_ms or 1000,
+        seed=request.seed,
+        should_stop=should_stop
     )
     
+    # Satisfaction metrics of the rebalanced groups, keeping the solver details
+    scorer = GroupFormationAlgorithm()
+    scorer.preferences = preference_dict
+    stats = {**stats, **scorer.calculate_satisfaction_score(groups), "balance": balance}
+    
+    return groups, stats
+
+def _run_english_leveling(
+    project: Project,
+    db: Session,
+    report: Callable[[str], None] = _no_report
+) -> RunAlgorithmResponse:
+    """
+    Form level-homogeneous groups from the students enrolled in the project
+    """
+    students = db.query(Student.id, Student.english_level, Student.gpa).join(
+        project_students, project_students.c.student_id == Student.id
+    ).filter(project_students.c.project_id == project.id).all()
+    
+    if not students:
+        raise HTTPException(
+            status_code=400,
+            detail="No students enrolled in this project"
+        )
+    
+    report("solving")
+    started = time.perf_counter()
+    groups, stats = assign_students_by_level(
+        students=[tuple(row) for row in students],
+        group_size=project.group_size or 4
+    )
+    solve_seconds = time.perf_counter() - started
+    
+    report("saving")
+    
     # Delete existing assignments for this project
-    db.query(Assignment).filter(Assignment.project_id == request.project_id).delete()
+    db.query(Assignment).filter(Assignment.project_id == project.id).delete(synchronize_session=False)
     
-    # Create Assignment records
     algorithm_run_id = str(uuid.uuid4())
-    assignments_created = 0
+    assigned_at = datetime.utcnow()
+    rows = []
     
     for group_num, group in enumerate(groups, start=1):
         for student_id in group:
-            # Check if student got their preference
-            preferred = preference_dict.get(student_id)
-            got_preference = preferred and preferred in group
-            
-            assignment = Assignment(
-                student_id=student_id,
-                project_id=request.project_id,
-                group_number=group_num,
-                preference_rank=1 if got_preference else None,
-                satisfaction_score=10.0 if got_preference else 5.0,
-                algorithm_score=stats['satisfaction_rate'],
-                algorithm_run_id=algorithm_run_id,
-                assigned_at=datetime.utcnow()
-            )
-            db.add(assignment)
-            assignments_created += 1
+            rows.append({
+                "student_id": student_id,
+                "project_id": project.id,
+                "group_number": group_num,
+                "preference_rank": None,
+                "satisfaction_score": None,
+                "algorithm_score": stats['homogeneity_rate'],
+                "algorithm_run_id": algorithm_run_id,
+                "assigned_at": assigned_at
+            })
+    
+    assignments_created = bulk_insert_assignments(db, rows)
     
+    record_run(db, project.id, algorithm_run_id, "english_leveling", None, stats, rows, solve_seconds)
     db.commit()
     
     return RunAlgorithmResponse(
         status="success",
-        message=f"Successfully created {len(groups)} groups for {assignments_created} students",
+        message=f"Successfully created {len(groups)} level groups for {assignments_created} students",
         assignments_created=assignments_created,
         groups_created=len(groups),
         stats=stats
     )
 
+def _run_exchange_program(
+    project: Project,
+    db: Session,
+    report: Callable[[str], None] = _no_report
+) -> RunAlgorithmResponse:
+    """
+    Match students to partner universities by deferred acceptance
+    
+    For exchange programs, group_number holds the id of the University obtained.
+    """
+    universities = db.query(University).filter(University.project_id == project.id).all()
+    if not universities:
+        raise HTTPException(
+            status_code=400,
+            detail="No universities configured for this exchange program"
+        )
+    
+    rows = db.query(
+        StudentPreference.student_id,
+        StudentPreference.university_ranking,
+        Student.general_rank,
+        Student.gpa,
+        Student.english_level
+    ).join(Student, Student.id == StudentPreference.student_id).filter(
+        StudentPreference.project_id == project.id
+    ).all()
+    
+    if not rows:
+        raise HTTPException(
+            status_code=400,
+            detail="No student preferences found for this project"
+        )
+    
+    rankings = {row.student_id: parse_university_ranking(row.university_ranking) for row in rows}
+    students = {row.student_id: (row.general_rank, row.gpa, row.english_level) for row in rows}
+    
+    report("solving")
+    started = time.perf_counter()
+    matching, stats = match_students_to_universities(
+        rankings=rankings,
+        capacities={u.code: u.capacity for u in universities},
+        students=students,
+        requirements={u.code: u.required_english_level for u in universities}
+    )
+    solve_seconds = time.perf_counter() - started
+    
+    report("saving")
+    
+    # Delete existing assignments for this project
+    db.query(Assignment).filter(Assignment.project_id == project.id).delete(synchronize_session=False)
+    
+    university_ids = {u.code: u.id for u in universities}
+    algorithm_run_id = str(uuid.uuid4())
+    assigned_at = datetime.utcnow()
+    
+    assignment_rows = []
+    for student_id, code in matching.items():
+        if code is None:
+            continue
+        rank = rankings[student_id].index(code) + 1
+        assignment_rows.append({
+            "student_id": student_id,
+            "project_id": project.id,
+            "group_number": university_ids[code],
+            "preference_rank": rank,
+            "satisfaction_score": rank_to_satisfaction(rank),
+            "algorithm_score": stats['satisfaction_rate'],
+            "algorithm_run_id": algorithm_run_id,
+            "assigned_at": assigned_at
+        })
+    
+    bulk_insert_assignments(db, assignment_rows)
+    record_run(db, project.id, algorithm_run_id, "exchange_matching", None, stats, assignment_rows, solve_seconds)
+    db.commit()
+    
+    return RunAlgorithmResponse(
+        status="success",
+        message=f"Matched {len(assignment_rows)} of {len(rows)} students to {len(universities)} universities",
+        assignments_created=len(assignment_rows),
+        groups_created=len({row["group_number"] for row in assignment_rows}),
+        stats=stats
+    )
+
+@router.post("/run-batch", response_model=RunBatchResponse)
+def run_batch_algorithm(request: RunBatchRequest, db: Session = Depends(get_db)):
+    """
+    Form groups for many GROUP_PROJECT projects in one call
+    
+    Preferences are loaded in one query, projects are solved in parallel and
+    each project is saved in its own transaction (see run_group_projects_batch).
+    """
+    return run_group_projects_batch(
+        db,
+        project_ids=request.project_ids,
+        time_budget_ms=request.time_budget_ms,
+        seed=request.seed
+    )
+
+@router.post("/run-project-assignment", response_model=RunAlgorithmResponse)
+async def run_project_assignment(request: RunProjectAssignmentRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Assign each student to exactly one project from their ranked choices
+    
+    Steps:
+    1. Get the candidate projects and their capacities
+    2. Get every ranked preference for these projects
+    3. Run the min-cost-flow solver across all projects at once (in the
+       threadpool: the event loop keeps serving other requests meanwhile)
+    4. Replace the previous assignments of these students and projects (their
+       groups in other projects too, reported in cleared_project_ids)
+    5. Return statistics
+    """
+    query = select(Project.id, Project.min_students, Project.max_students).where(Project.is_active == True)
+    if request.project_ids:
+        query = query.where(Project.id.in_(request.project_ids))
+    projects = (await db.execute(query)).all()
+    
+    if not projects:
+        raise HTTPException(status_code=404, detail="No active project found")
+    
+    capacities = {p.id: (p.min_students, p.max_students) for p in projects}
+    
+    # Sparse preference matrix: student_id -> {project_id: rank}
+    rows = (await db.execute(select(
+        StudentPreference.student_id,
+        StudentPreference.project_id,
+        StudentPreference.rank
+    ).where(StudentPreference.project_id.in_(list(capacities))))).all()
+    
+    if not rows:
+        raise HTTPException(
+            status_code=400,
+            detail="No student preferences found for these projects"
+        )
+    
+    preference_matrix = defaultdict(dict)
+    for student_id, project_id, rank in rows:
+        preference_matrix[student_id][project_id] = rank
+    
+    # Run algorithm
+    started = time.perf_counter()
+    assignment, stats = await run_in_threadpool(
+        assign_students_to_projects,
+        preferences=dict(preference_matrix),
+        capacities=capacities
+    )
+    solve_seconds = time.perf_counter() - started
+    
+    assignments_created, cleared_project_ids = await db.run_sync(
+        _replace_project_assignments,
+        capacities, preference_matrix, assignment, stats, request.dict(), solve_seconds
+    )
+    await db.commit()
+    
+    message = f"Assigned {assignments_created} of {stats['total_students']} students to {stats['projects_used']} projects"
+    if cleared_project_ids:
+        message += f" (assignments removed from projects {', '.join(map(str, cleared_project_ids))})"
+    return RunAlgorithmResponse(
+        status="success",
+        message=message,
+        assignments_created=assignments_created,
+        groups_created=stats['projects_used'],
+        stats=stats,
+        cleared_project_ids=cleared_project_ids
+    )
+
+def _replace_project_assignments(
+    db: Session,
+    capacities: dict,
+    preference_matrix: dict,
+    assignment: dict,
+    stats: dict,
+    parameters: dict,
+    solve_seconds: float
+) -> Tuple[int, List[int]]:
+    """
+    Write a project assignment solve and its run history (the caller commits)
+    
+    A run is recorded only for the projects that received students. Returns
+    the number of assignments created and the ids of the projects outside
+    the solve whose assignments were removed (e.g. the groups of the students
+    involved).
+    """
+    # A student holds a single assignment: drop the previous ones of everybody involved
+    involved_students = db.query(StudentPreference.student_id).filter(
+        StudentPreference.project_id.in_(list(capacities))
+    )
+    replaced = db.query(Assignment).filter(
+        or_(
+            Assignment.project_id.in_(list(capacities)),
+            Assignment.student_id.in_(involved_students)
+        )
+    )
+    # Projects losing assignments no longer match their active run
+    affected_project_ids = [
+        project_id for (project_id,) in replaced.with_entities(Assignment.project_id).distinct()
+    ]
+    for affected_project_id in affected_project_ids:
+        deactivate_runs(db, affected_project_id)
+    replaced.delete(synchronize_session=False)
+    cleared_project_ids = sorted(set(affected_project_ids) - set(capacities))
+    
+    # Create Assignment records, with one run id per project that gets students
+    run_ids = {project_id: str(uuid.uuid4()) for project_id in set(assignment.values()) - {None}}
+    assigned_at = datetime.utcnow()
+    rows_by_project = {project_id: [] for project_id in run_ids}
+    
+    for student_id, project_id in assignment.items():
+        if project_id is None:
+            continue
+        rank = preference_matrix[student_id][project_id]
+        rows_by_project[project_id].append({
+            "student_id": student_id,
+            "project_id": project_id,
+            "group_number": None,
+            "preference_rank": rank,
+            "satisfaction_score": rank_to_satisfaction(rank),
+            "algorithm_score": stats['satisfaction_rate'],
+            "algorithm_run_id": run_ids[project_id],
+            "assigned_at": assigned_at
+        })
+    
+    assignments_created = 0
+    for project_id, project_rows in rows_by_project.items():
+        assignments_created += bulk_insert_assignments(db, project_rows)
+        record_run(
+            db, project_id, run_ids[project_id], "project_assignment",
+            parameters, stats, project_rows, solve_seconds
+        )
+    
+    return assignments_created, cleared_project_ids
+
 @router.get("/stats", response_model=AssignmentStats)
-async def get_assignment_stats(project_id: Optional[int] = None, db: Session = Depends(get_db)):
-    """Get statistics about assignments for a project"""
-    query = db.query(Assignment)
+async def get_assignment_stats(project_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get statistics about assignments for a project
+    
+    Read from the summary stored with the project's active run when there is
+    one, otherwise counted by the database.
+    """
+    run = await db.run_sync(get_active_run, project_id) if project_id else None
+    
+    if run:
+        total = run.total_assignments
+        satisfied = run.satisfied_students
+        return AssignmentStats(
+            total_assignments=total,
+            satisfaction_rate=(satisfied / total * 100) if total > 0 else 0,
+            total_groups=run.total_groups,
+            average_group_size=total / run.total_groups if run.total_groups else 0,
+            mutual_matches=(run.stats or {}).get("mutual_matches", satisfied)
+        )
+    
+    query = select(
+        func.count(Assignment.id),
+        func.count(case((Assignment.satisfaction_score >= SATISFIED_SCORE, 1))),
+        func.count(distinct(Assignment.group_number))
+    )
     
     if project_id:
-        query = query.filter(Assignment.project_id == project_id)
+        query = query.where(Assignment.project_id == project_id)
     
-    assignments = query.all()
+    total, satisfied, total_groups = (await db.execute(query)).one()
     
-    if not assignments:
+    if not total:
         return AssignmentStats(
             total_assignments=0,
             satisfaction_rate=0.0,
@@ -155,26 +801,69 @@ async def get_assignment_stats(project_id: Optional[int] = None, db: Session = D
             mutual_matches=0
         )
     
-    # Calculate stats
-    total = len(assignments)
-    satisfied = sum(1 for a in assignments if a.satisfaction_score and a.satisfaction_score >= 8.0)
-    groups = set(a.group_number for a in assignments if a.group_number)
-    
     return AssignmentStats(
         total_assignments=total,
         satisfaction_rate=(satisfied / total * 100) if total > 0 else 0,
-        total_groups=len(groups),
-        average_group_size=total / len(groups) if groups else 0,
+        total_groups=total_groups,
+        average_group_size=total / total_groups if total_groups else 0,
         mutual_matches=satisfied  # Simplified for now
     )
 
+@router.get("/runs", response_model=List[AlgorithmRunResponse])
+def get_algorithm_runs(project_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Get the run history, newest first, optionally filtered by project"""
+    query = db.query(AlgorithmRun).options(defer(AlgorithmRun.assignments))
+    
+    if project_id:
+        query = query.filter(AlgorithmRun.project_id == project_id)
+    
+    return query.order_by(AlgorithmRun.created_at.desc()).all()
+
+@router.get("/runs/diff")
+def diff_algorithm_runs(run_a: str, run_b: str, db: Session = Depends(get_db)):
+    """Get the students who changed group between two runs"""
+    runs = {run.id: run for run in db.query(AlgorithmRun).filter(AlgorithmRun.id.in_([run_a, run_b]))}
+    if run_a not in runs or run_b not in runs:
+        raise HTTPException(status_code=404, detail="Run not found")
+    
+    return diff_runs(runs[run_a], runs[run_b])
+
+@router.get("/runs/{run_id}", response_model=AlgorithmRunResponse)
+def get_algorithm_run(run_id: str, db: Session = Depends(get_db)):
+    """Get one run with its parameters and full stats"""
+    run = db.query(AlgorithmRun).filter(AlgorithmRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+@router.post("/runs/{run_id}/activate", response_model=AlgorithmRunResponse)
+def activate_algorithm_run(run_id: str, db: Session = Depends(get_db)):
+    """Restore the assignments of an older run and make it the project's active run"""
+    run = db.query(AlgorithmRun).filter(AlgorithmRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    
+    try:
+        activate_run(db, run)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Some students of this run are now assigned to another project"
+        )
+    
+    db.refresh(run)
+    return run
+
 @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
-async def clear_assignments(project_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def clear_assignments(project_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
     """Clear all assignments (useful for testing)"""
-    query = db.query(Assignment)
+    query = delete(Assignment)
     
     if project_id:
-        query = query.filter(Assignment.project_id == project_id)
+        query = query.where(Assignment.project_id == project_id)
     
-    query.delete()
-    db.commit()
+    await db.execute(query)
+    await db.run_sync(deactivate_runs, project_id)
+    await db.commit()
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.form_question import FormQuestion, QuestionType
 from app.models.student_response import StudentResponse
 from app.models.project import Project
+from app.services.exports import response_export
+from app.services.form_responses import upsert_student_responses
+from app.api.pagination import MAX_PAGE_SIZE, keyset_page_async, parse_fields, page_response
+from app.api.exports import ExportFormat, export_response
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -58,10 +64,10 @@ class StudentResponseResponse(BaseModel):
 
 # Routes pour les questions de formulaire
 @router.post("/projects/{project_id}/forms", response_model=FormQuestionResponse, status_code=status.HTTP_201_CREATED)
-def create_form_question(project_id: int, question: FormQuestionCreate, db: Session = Depends(get_db)):
+async def create_form_question(project_id: int, question: FormQuestionCreate, db: AsyncSession = Depends(get_async_db)):
     """Créer une question de formulaire pour un projet"""
     # Vérifier que le projet existe
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Projet non trouvé")
     
@@ -71,40 +77,39 @@ def create_form_question(project_id: int, question: FormQuestionCreate, db: Sess
         **question.dict(exclude={'project_id'})
     )
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    await db.commit()
+    await db.refresh(db_question)
     
     # Marquer le projet comme ayant un formulaire
     project.has_custom_form = True
-    db.commit()
+    await db.commit()
     
     return db_question
 
 @router.get("/projects/{project_id}/forms", response_model=List[FormQuestionResponse])
-def get_project_forms(project_id: int, db: Session = Depends(get_db)):
+async def get_project_forms(project_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupérer toutes les questions de formulaire d'un projet"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not await db.scalar(select(Project.id).where(Project.id == project_id)):
         raise HTTPException(status_code=404, detail="Projet non trouvé")
     
-    questions = db.query(FormQuestion).filter(
+    questions = await db.scalars(select(FormQuestion).where(
         FormQuestion.project_id == project_id
-    ).order_by(FormQuestion.order).all()
+    ).order_by(FormQuestion.order))
     
-    return questions
+    return questions.all()
 
 @router.put("/projects/{project_id}/forms/{question_id}", response_model=FormQuestionResponse)
-def update_form_question(
+async def update_form_question(
     project_id: int,
     question_id: int,
     question_update: FormQuestionUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Modifier une question de formulaire"""
-    question = db.query(FormQuestion).filter(
+    question = await db.scalar(select(FormQuestion).where(
         FormQuestion.id == question_id,
         FormQuestion.project_id == project_id
-    ).first()
+    ))
     
     if not question:
         raise HTTPException(status_code=404, detail="Question non trouvée")
@@ -113,103 +118,110 @@ def update_form_question(
     for field, value in question_update.dict(exclude_unset=True).items():
         setattr(question, field, value)
     
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
     return question
 
 @router.delete("/projects/{project_id}/forms/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_form_question(project_id: int, question_id: int, db: Session = Depends(get_db)):
+async def delete_form_question(project_id: int, question_id: int, db: AsyncSession = Depends(get_async_db)):
     """Supprimer une question de formulaire"""
-    question = db.query(FormQuestion).filter(
+    question = await db.scalar(select(FormQuestion).where(
         FormQuestion.id == question_id,
         FormQuestion.project_id == project_id
-    ).first()
+    ))
     
     if not question:
         raise HTTPException(status_code=404, detail="Question non trouvée")
     
-    db.delete(question)
-    db.commit()
+    await db.delete(question)
+    await db.commit()
     
     # Vérifier s'il reste des questions pour ce projet
-    remaining_questions = db.query(FormQuestion).filter(
+    remaining_questions = await db.scalar(select(func.count(FormQuestion.id)).where(
         FormQuestion.project_id == project_id
-    ).count()
+    ))
     
     if remaining_questions == 0:
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await db.get(Project, project_id)
         if project:
             project.has_custom_form = False
-            db.commit()
+            await db.commit()
     
     return None
 
 # Routes pour les réponses des étudiants
 @router.post("/students/{student_id}/responses", response_model=List[StudentResponseResponse], status_code=status.HTTP_201_CREATED)
-def submit_student_responses(
+async def submit_student_responses(
     student_id: int,
     responses: List[StudentResponseCreate],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Soumettre les réponses d'un étudiant à un formulaire"""
-    db_responses = []
+    """
+    Soumettre les réponses d'un étudiant à un formulaire
+    
+    Une requête pour vérifier toutes les questions, puis un seul upsert
+    (une réponse existante à la même question est mise à jour).
+    """
+    question_ids = {response.question_id for response in responses}
+    found = set(
+        await db.scalars(select(FormQuestion.id).where(FormQuestion.id.in_(question_ids)))
+    ) if question_ids else set()
     
     for response in responses:
-        # Vérifier que la question existe
-        question = db.query(FormQuestion).filter(FormQuestion.id == response.question_id).first()
-        if not question:
+        if response.question_id not in found:
             raise HTTPException(status_code=404, detail=f"Question {response.question_id} non trouvée")
-        
-        # Vérifier si une réponse existe déjà
-        existing_response = db.query(StudentResponse).filter(
-            StudentResponse.student_id == student_id,
-            StudentResponse.question_id == response.question_id
-        ).first()
-        
-        if existing_response:
-            # Mettre à jour la réponse existante
-            existing_response.response_text = response.response_text
-            existing_response.response_value = response.response_value
-            existing_response.submitted_at = datetime.utcnow()
-            db_responses.append(existing_response)
-        else:
-            # Créer une nouvelle réponse
-            db_response = StudentResponse(
-                student_id=student_id,
-                **response.dict()
-            )
-            db.add(db_response)
-            db_responses.append(db_response)
-    
-    db.commit()
-    for resp in db_responses:
-        db.refresh(resp)
-    
-    return db_responses
+    
+    saved = await db.run_sync(upsert_student_responses, student_id, [response.dict() for response in responses])
+    await db.commit()
+    
+    return saved
 
 @router.get("/students/{student_id}/responses", response_model=List[StudentResponseResponse])
-def get_student_responses(student_id: int, project_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def get_student_responses(student_id: int, project_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
     """Récupérer toutes les réponses d'un étudiant"""
-    query = db.query(StudentResponse).filter(StudentResponse.student_id == student_id)
+    query = select(StudentResponse).where(StudentResponse.student_id == student_id)
     
     if project_id:
         # Filtrer par projet
-        query = query.join(FormQuestion).filter(FormQuestion.project_id == project_id)
+        query = query.join(FormQuestion).where(FormQuestion.project_id == project_id)
     
-    responses = query.all()
-    return responses
+    responses = await db.scalars(query)
+    return responses.all()
 
 @router.get("/projects/{project_id}/responses")
-def get_project_responses(project_id: int, db: Session = Depends(get_db)):
-    """Récupérer toutes les réponses pour un projet (pour les professeurs)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+async def get_project_responses(
+    project_id: int,
+    http_response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Récupérer les réponses pour un projet, groupées par étudiant (pour les professeurs)
+    
+    Pagination par étudiant: renvoyer l'en-tête X-Next-Cursor dans `cursor` pour
+    la page suivante. `fields=student_id,responses` omet les profils étudiants.
+    """
+    selected = parse_fields(fields, ["student_id", "student", "responses"])
+    if not await db.scalar(select(Project.id).where(Project.id == project_id)):
         raise HTTPException(status_code=404, detail="Projet non trouvé")
     
-    # Récupérer toutes les réponses avec les informations des étudiants
-    responses = db.query(StudentResponse).join(FormQuestion).filter(
-        FormQuestion.project_id == project_id
-    ).all()
+    # Page d'étudiants ayant répondu, puis leurs réponses avec questions et profils
+    students, next_cursor = await keyset_page_async(
+        db,
+        select(StudentResponse.student_id).join(FormQuestion).where(
+            FormQuestion.project_id == project_id
+        ).distinct(),
+        [StudentResponse.student_id], cursor, limit
+    )
+    responses = await db.scalars(select(StudentResponse).join(FormQuestion).options(
+        joinedload(StudentResponse.question),
+        joinedload(StudentResponse.student)
+    ).where(
+        FormQuestion.project_id == project_id,
+        StudentResponse.student_id.in_([row.student_id for row in students])
+    ).order_by(StudentResponse.student_id, StudentResponse.id))
     
     # Grouper par étudiant
     student_responses = {}
@@ -228,4 +240,21 @@ def get_project_responses(project_id: int, db: Session = Depends(get_db)):
             "submitted_at": response.submitted_at
         })
     
-    return list(student_responses.values())
+    return page_response(http_response, list(student_responses.values()), next_cursor, selected)
+
+@router.get("/projects/{project_id}/responses/export")
+def export_project_responses(
+    project_id: int,
+    format: ExportFormat = "csv",
+    db: Session = Depends(get_db)
+):
+    """
+    Télécharger les réponses au formulaire d'un projet en CSV ou XLSX (une ligne par réponse)
+    
+    Le fichier est envoyé au fur et à mesure de la lecture (curseur côté serveur).
+    """
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Projet non trouvé")
+    
+    columns, query = response_export(project_id)
+    return export_response(f"project_{project_id}_responses", columns, query, format)
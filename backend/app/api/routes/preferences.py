@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from app.database import get_async_db, get_db
 from app.models.preference import StudentPreference
 from app.models.student import Student
 from app.models.project import Project
 from app.schemas import PreferenceCreate, PreferenceResponse, MessageResponse
+from app.services.exports import preference_export
+from app.services.preference_writer import replace_student_preferences
+from app.services.preference_stats import adjust_stats, get_stats
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page_async
+from app.api.exports import ExportFormat, export_response
 from pydantic import BaseModel, validator
 from datetime import datetime
 
@@ -54,20 +61,33 @@ class PreferencesBulkCreate(BaseModel):
 
 # Routes
 @router.post("/students/{student_id}/preferences", response_model=List[PreferenceResponse], status_code=status.HTTP_201_CREATED)
-def create_student_preferences(
+async def create_student_preferences(
     student_id: int,
     preferences_data: PreferencesBulkCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Soumettre les préférences d'un étudiant (création en masse)"""
+    """
+    Soumettre les préférences d'un étudiant (création en masse)
+    
+    Une requête pour tous les projets demandés (vérifiés en mémoire), puis
+    un DELETE et un INSERT multi-lignes.
+    """
     # Vérifier que l'étudiant existe
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+    if not await db.scalar(select(Student.id).where(Student.id == student_id)):
         raise HTTPException(status_code=404, detail="Étudiant non trouvé")
     
     # Vérifier que tous les projets existent et sont ouverts
+    project_ids = [pref.project_id for pref in preferences_data.preferences]
+    projects = {
+        project.id: project
+        for project in await db.execute(select(
+            Project.id, Project.title, Project.is_active, Project.is_open_for_preferences, Project.deadline
+        ).where(Project.id.in_(project_ids)))
+    }
+    now = datetime.utcnow()
+    
     for pref in preferences_data.preferences:
-        project = db.query(Project).filter(Project.id == pref.project_id).first()
+        project = projects.get(pref.project_id)
         if not project:
             raise HTTPException(status_code=404, detail=f"Projet {pref.project_id} non trouvé")
         if not project.is_active or not project.is_open_for_preferences:
@@ -76,49 +96,36 @@ def create_student_preferences(
                 detail=f"Le projet '{project.title}' n'accepte plus de préférences"
             )
         # Vérifier la deadline
-        if project.deadline and project.deadline < datetime.utcnow():
+        if project.deadline and project.deadline < now:
             raise HTTPException(
                 status_code=400,
                 detail=f"La deadline pour le projet '{project.title}' est dépassée"
             )
     
-    # Supprimer les préférences existantes de cet étudiant
-    db.query(StudentPreference).filter(StudentPreference.student_id == student_id).delete()
-    
-    # Créer les nouvelles préférences
-    db_preferences = []
-    for pref in preferences_data.preferences:
-        db_pref = StudentPreference(
-            student_id=student_id,
-            project_id=pref.project_id,
-            rank=pref.rank
-        )
-        db.add(db_pref)
-        db_preferences.append(db_pref)
-    
-    db.commit()
-    for pref in db_preferences:
-        db.refresh(pref)
+    # Remplacer les préférences existantes de cet étudiant
+    saved = await db.run_sync(
+        replace_student_preferences, student_id, [pref.dict() for pref in preferences_data.preferences]
+    )
+    await db.commit()
     
-    return db_preferences
+    return saved
 
 # ===== NEW: PARTNER PREFERENCE ENDPOINT =====
 
 @router.post("/students/{student_id}/partner-preference", response_model=MessageResponse)
-def submit_partner_preference(
+async def submit_partner_preference(
     student_id: int,
     preference_data: PreferenceCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit partner preference for a group project"""
     
     # Verify student exists
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+    if not await db.scalar(select(Student.id).where(Student.id == student_id)):
         raise HTTPException(status_code=404, detail="Student not found")
     
     # Verify project exists
-    project = db.query(Project).filter(Project.id == preference_data.project_id).first()
+    project = await db.get(Project, preference_data.project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -139,8 +146,7 @@ def submit_partner_preference(
     
     # Verify preferred partner exists (if provided)
     if preference_data.preferred_partner_id:
-        partner = db.query(Student).filter(Student.id == preference_data.preferred_partner_id).first()
-        if not partner:
+        if not await db.scalar(select(Student.id).where(Student.id == preference_data.preferred_partner_id)):
             raise HTTPException(status_code=404, detail="Preferred partner not found")
         
         # Prevent self-selection
@@ -148,10 +154,10 @@ def submit_partner_preference(
             raise HTTPException(status_code=400, detail="Cannot select yourself as partner")
     
     # Check if preference already exists
-    existing_pref = db.query(StudentPreference).filter(
+    existing_pref = await db.scalar(select(StudentPreference).where(
         StudentPreference.student_id == student_id,
         StudentPreference.project_id == preference_data.project_id
-    ).first()
+    ))
     
     if existing_pref:
         # Update existing preference
@@ -159,10 +165,13 @@ def submit_partner_preference(
         existing_pref.rank = preference_data.rank
         if preference_data.university_ranking:
             existing_pref.university_ranking = preference_data.university_ranking
-        db.commit()
+        await db.commit()
         message = "Partner preference updated successfully"
     else:
         # Create new preference
+        has_preferences = await db.scalar(select(StudentPreference.id).where(
+            StudentPreference.student_id == student_id
+        ).limit(1)) is not None
         new_pref = StudentPreference(
             student_id=student_id,
             project_id=preference_data.project_id,
@@ -171,21 +180,24 @@ def submit_partner_preference(
             university_ranking=preference_data.university_ranking
         )
         db.add(new_pref)
-        db.commit()
+        await db.run_sync(adjust_stats, total_preferences=1, students_with_preferences=0 if has_preferences else 1)
+        await db.commit()
         message = "Partner preference submitted successfully"
     
     return MessageResponse(message=message, success=True)
 
 @router.get("/students/{student_id}/preferences", response_model=List[PreferenceWithProjectResponse])
-def get_student_preferences(student_id: int, db: Session = Depends(get_db)):
+async def get_student_preferences(student_id: int, db: AsyncSession = Depends(get_async_db)):
     """Récupérer les préférences d'un étudiant"""
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+    if not await db.scalar(select(Student.id).where(Student.id == student_id)):
         raise HTTPException(status_code=404, detail="Étudiant non trouvé")
     
-    preferences = db.query(StudentPreference).filter(
+    # Projets chargés avec les préférences (pas de chargement paresseux en async)
+    preferences = await db.scalars(select(StudentPreference).options(
+        joinedload(StudentPreference.project)
+    ).where(
         StudentPreference.student_id == student_id
-    ).order_by(StudentPreference.rank).all()
+    ).order_by(StudentPreference.rank))
     
     # Enrichir avec les informations du projet
     result = []
@@ -206,45 +218,67 @@ def get_student_preferences(student_id: int, db: Session = Depends(get_db)):
     return result
 
 @router.put("/students/{student_id}/preferences", response_model=List[PreferenceResponse])
-def update_student_preferences(
+async def update_student_preferences(
     student_id: int,
     preferences_data: PreferencesBulkCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Modifier les préférences d'un étudiant (remplace toutes les préférences existantes)"""
     # Utiliser la même logique que la création
-    return create_student_preferences(student_id, preferences_data, db)
+    return await create_student_preferences(student_id, preferences_data, db)
 
 @router.delete("/students/{student_id}/preferences", status_code=status.HTTP_204_NO_CONTENT)
-def delete_student_preferences(student_id: int, db: Session = Depends(get_db)):
+async def delete_student_preferences(student_id: int, db: AsyncSession = Depends(get_async_db)):
     """Supprimer toutes les préférences d'un étudiant"""
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+    if not await db.scalar(select(Student.id).where(Student.id == student_id)):
         raise HTTPException(status_code=404, detail="Étudiant non trouvé")
     
-    db.query(StudentPreference).filter(
-        StudentPreference.student_id == student_id
-    ).delete()
+    removed = (await db.execute(
+        delete(StudentPreference).where(StudentPreference.student_id == student_id)
+    )).rowcount
+    await db.run_sync(adjust_stats, total_preferences=-removed, students_with_preferences=-1 if removed else 0)
     
-    db.commit()
+    await db.commit()
     return None
 
 @router.get("/projects/{project_id}/preferences")
-def get_project_preferences(project_id: int, db: Session = Depends(get_db)):
-    """Récupérer toutes les préférences pour un projet (utile pour les professeurs)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+async def get_project_preferences(
+    project_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Récupérer les préférences pour un projet (utile pour les professeurs)
+    
+    Pagination par (rang, id): renvoyer l'en-tête X-Next-Cursor dans `cursor`
+    pour la page suivante; total_preferences compte toutes les pages.
+    """
+    project_title = await db.scalar(select(Project.title).where(Project.id == project_id))
+    if project_title is None:
         raise HTTPException(status_code=404, detail="Projet non trouvé")
     
-    preferences = db.query(StudentPreference).filter(
-        StudentPreference.project_id == project_id
-    ).order_by(StudentPreference.rank).all()
+    total_preferences = await db.scalar(
+        select(func.count(StudentPreference.id)).where(StudentPreference.project_id == project_id)
+    )
+    
+    # Étudiants et utilisateurs chargés avec la page (pas de chargement paresseux par ligne)
+    preferences, next_cursor = await keyset_page_async(
+        db,
+        select(StudentPreference).options(
+            joinedload(StudentPreference.student).joinedload(Student.user)
+        ).where(StudentPreference.project_id == project_id),
+        [StudentPreference.rank, StudentPreference.id], cursor, limit
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     # Grouper par rang
     result = {
         "project_id": project_id,
-        "project_title": project.title,
-        "total_preferences": len(preferences),
+        "project_title": project_title,
+        "total_preferences": total_preferences,
         "by_rank": {}
     }
     
@@ -264,20 +298,42 @@ def get_project_preferences(project_id: int, db: Session = Depends(get_db)):
     
     return result
 
+@router.get("/projects/{project_id}/preferences/export")
+def export_project_preferences(
+    project_id: int,
+    format: ExportFormat = "csv",
+    db: Session = Depends(get_db)
+):
+    """
+    Télécharger la feuille de préférences d'un projet (par rang) en CSV ou XLSX
+    
+    Le fichier est envoyé au fur et à mesure de la lecture (curseur côté serveur).
+    """
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Projet non trouvé")
+    
+    columns, query = preference_export(project_id)
+    return export_response(f"project_{project_id}_preferences", columns, query, format)
+
 @router.get("/preferences/stats")
-def get_preferences_stats(db: Session = Depends(get_db)):
-    """Récupérer des statistiques globales sur les préférences"""
-    total_students = db.query(Student).count()
-    students_with_preferences = db.query(StudentPreference.student_id).distinct().count()
-    total_projects = db.query(Project).filter(Project.is_active == True).count()
-    total_preferences = db.query(StudentPreference).count()
+async def get_preferences_stats(db: AsyncSession = Depends(get_async_db)):
+    """
+    Récupérer des statistiques globales sur les préférences
+    
+    Les compteurs sont tenus à jour par les écritures (table preference_stats):
+    une lecture par clé primaire, quelle que soit la taille des tables.
+    """
+    stats = await db.run_sync(get_stats)
+    total_students = stats.total_students
+    students_with_preferences = stats.students_with_preferences
+    total_preferences = stats.total_preferences
     
     return {
         "total_students": total_students,
         "students_with_preferences": students_with_preferences,
         "students_without_preferences": total_students - students_with_preferences,
         "completion_rate": (students_with_preferences / total_students * 100) if total_students > 0 else 0,
-        "total_active_projects": total_projects,
+        "total_active_projects": stats.total_active_projects,
         "total_preferences_submitted": total_preferences,
         "avg_preferences_per_student": (total_preferences / students_with_preferences) if students_with_preferences > 0 else 0
     }
@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_async_db, get_db, SessionLocal
 from app.schemas import (
     ProjectCreate, ProjectResponse, ProjectWithStudents, ProjectUpdate,
-    StudentUploadRequest, StudentUploadResponse, StudentInProject
+    StudentUploadRequest, StudentUploadResponse, StudentInProject,
+    UniversityCreate, UniversityResponse
 )
-from app.models.project import Project, ProjectType
+from app.models.project import Project, ProjectType, project_students
 from app.models.student import Student
-from app.models.user import User, UserRole
-from typing import List
+from app.models.university import University
+from app.services.project_queries import (
+    with_rosters, get_project_with_students, get_project_roster
+)
+from app.services.preference_stats import adjust_stats, reconcile_stats
+from app.services.student_import import (
+    IMPORT_CHUNK_SIZE, import_student_chunk, import_roster, read_roster_chunks
+)
+from app.api.pagination import MAX_PAGE_SIZE, keyset_page_async, parse_fields, page_response
+from typing import List, Optional
+from itertools import chain
+from zipfile import BadZipFile
+import json
 
 router = APIRouter()
 
@@ -16,72 +32,47 @@ router = APIRouter()
 
 @router.get("/", response_model=List[ProjectWithStudents])
 async def get_projects(
+    response: Response,
     teacher_id: int = None,
     is_active: bool = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all projects with optional filters"""
-    query = db.query(Project)
+    """
+    Get projects (newest first) with optional filters
+    
+    Paginated: pass the X-Next-Cursor response header back as `cursor` for the
+    next page. `fields=id,title` returns only those fields (the rosters are
+    not loaded unless `students` is asked for).
+    """
+    selected = parse_fields(fields, list(ProjectWithStudents.model_fields))
+    query = select(Project)
     
     if teacher_id:
-        query = query.filter(Project.teacher_id == teacher_id)
+        query = query.where(Project.teacher_id == teacher_id)
     if is_active is not None:
-        query = query.filter(Project.is_active == is_active)
-    
-    projects = query.order_by(Project.created_at.desc()).all()
-    
-    # Include student count for each project
-    projects_with_students = []
-    for project in projects:
-        students_data = []
-        for student in project.students:
-            if student.user:
-                full_name = f"{student.user.first_name} {student.user.last_name}" if student.user.first_name else student.user.email
-                students_data.append(StudentInProject(
-                    id=student.id,
-                    name=full_name,
-                    email=student.user.email,
-                    filiere=student.filiere.value if student.filiere else None,
-                    rank=student.general_rank,
-                    grade=student.gpa
-                ))
-        
-        projects_with_students.append({
-            **project.__dict__,
-            "students": students_data
-        })
+        query = query.where(Project.is_active == is_active)
+    
+    projects, next_cursor = await keyset_page_async(db, query, [Project.created_at, Project.id], cursor, limit, descending=True)
     
-    return projects_with_students
+    # All rosters of the page in one more query
+    projects = await db.run_sync(with_rosters, projects, include_students=selected is None or "students" in selected)
+    return page_response(response, projects, next_cursor, selected, ProjectWithStudents)
 
 @router.get("/{project_id}", response_model=ProjectWithStudents)
-async def get_project(project_id: int, db: Session = Depends(get_db)):
+async def get_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific project by ID with students"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.run_sync(get_project_with_students, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Get all students linked to this project
-    students_data = []
-    for student in project.students:
-        if student.user:
-            full_name = f"{student.user.first_name} {student.user.last_name}" if student.user.first_name else student.user.email
-            students_data.append(StudentInProject(
-                id=student.id,
-                name=full_name,
-                email=student.user.email,
-                filiere=student.filiere.value if student.filiere else None,
-                rank=student.general_rank,
-                grade=student.gpa
-            ))
-    
-    return {
-        **project.__dict__,
-        "students": students_data
-    }
+    return project
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_project(project_data: ProjectCreate, db: Session = Depends(get_db)):
+async def create_project(project_data: ProjectCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new project with students"""
     
     # TODO: Get teacher_id from authenticated user (for now using default)
@@ -104,8 +95,9 @@ async def create_project(project_data: ProjectCreate, db: Session = Depends(get_
     )
     
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.run_sync(adjust_stats, total_active_projects=1)
+    await db.commit()
+    await db.refresh(new_project)
     
     # Create/link students if provided
     if project_data.students:
@@ -121,33 +113,38 @@ async def create_project(project_data: ProjectCreate, db: Session = Depends(get_
 async def update_project(
     project_id: int, 
     project_data: ProjectUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Update only provided fields
+    was_active = bool(project.is_active)
     update_data = project_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(project, field, value)
     
-    db.commit()
-    db.refresh(project)
+    await db.run_sync(adjust_stats, total_active_projects=bool(project.is_active) - was_active)
+    await db.commit()
+    await db.refresh(project)
     return project
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_project(project_id: int, db: Session = Depends(get_db)):
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.flush()
+    # Its preferences go with it: recount rather than track the cascade
+    await db.run_sync(reconcile_stats)
+    await db.commit()
     return
 
 # ===== STUDENT MANAGEMENT =====
@@ -156,108 +153,31 @@ async def delete_project(project_id: int, db: Session = Depends(get_db)):
 async def upload_students_to_project(
     project_id: int,
     upload_data: StudentUploadRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload students to a project via CSV data"""
     
     # Check if project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not await db.scalar(select(Project.id).where(Project.id == project_id)):
         raise HTTPException(status_code=404, detail="Project not found")
     
     created_count = 0
     existing_count = 0
     result_students = []
     
-    for student_data in upload_data.students:
-        # Check if user already exists by email
-        existing_user = db.query(User).filter(User.email == student_data.email).first()
+    # Set-based: a few queries per chunk instead of several per student
+    try:
+        for start in range(0, len(upload_data.students), IMPORT_CHUNK_SIZE):
+            chunk = upload_data.students[start:start + IMPORT_CHUNK_SIZE]
+            chunk_created, chunk_existing, chunk_students = await db.run_sync(import_student_chunk, project_id, chunk)
+            created_count += chunk_created
+            existing_count += chunk_existing
+            result_students.extend(chunk_students)
         
-        if existing_user:
-            existing_count += 1
-            # Get student profile
-            student = db.query(Student).filter(Student.user_id == existing_user.id).first()
-            if student:
-                # Link student to project if not already linked
-                if project not in student.projects:
-                    student.projects.append(project)
-                
-                full_name = f"{existing_user.first_name} {existing_user.last_name}" if existing_user.first_name else existing_user.email
-                result_students.append(StudentInProject(
-                    id=student.id,
-                    name=full_name,
-                    email=existing_user.email,
-                    filiere=student.filiere.value if student.filiere else None,
-                    rank=student.general_rank,
-                    grade=student.gpa
-                ))
-        else:
-            # Create new user
-            name_parts = student_data.name.split(' ', 1)
-            first_name = name_parts[0] if name_parts else student_data.name
-            last_name = name_parts[1] if len(name_parts) > 1 else ""
-            
-            new_user = User(
-                email=student_data.email,
-                username=student_data.email.split('@')[0],
-                first_name=first_name,
-                last_name=last_name,
-                role=UserRole.STUDENT,
-                hashed_password="temporary_password_hash"  # TODO: Generate proper password
-            )
-            db.add(new_user)
-            db.flush()  # Get the user ID
-            
-            # Create student profile
-            from app.models.student import Filiere, EnglishLevel
-            
-            # Map filiere string to enum (handle common variations)
-            filiere_value = Filiere.AUTRE  # Default
-            if student_data.filiere:
-                filiere_upper = student_data.filiere.upper()
-                # Try common mappings
-                filiere_map = {
-                    'INFORMATIQUE': Filiere.INFORMATIQUE,
-                    'INFO': Filiere.INFORMATIQUE,
-                    'E5FI': Filiere.INFORMATIQUE,
-                    'ELECTRONIQUE': Filiere.ELECTRONIQUE,
-                    'ELEC': Filiere.ELECTRONIQUE,
-                    'E5SE': Filiere.SYSTEMES_EMBARQUES,
-                    'ENERGIE': Filiere.ENERGIE,
-                    'BIOTECHNOLOGIE': Filiere.BIOTECHNOLOGIE,
-                    'BIOTECH': Filiere.BIOTECHNOLOGIE,
-                    'SYSTEMES_EMBARQUES': Filiere.SYSTEMES_EMBARQUES,
-                    'RESEAUX': Filiere.RESEAUX,
-                    'AUTRE': Filiere.AUTRE
-                }
-                filiere_value = filiere_map.get(filiere_upper, Filiere.AUTRE)
-            
-            new_student = Student(
-                user_id=new_user.id,
-                student_number=f"STU{new_user.id:06d}",  # Auto-generate student number
-                filiere=filiere_value,
-                english_level=EnglishLevel.B1,  # Default
-                general_rank=student_data.rank,
-                gpa=student_data.grade
-            )
-            db.add(new_student)
-            db.flush()
-            
-            # Link student to project
-            new_student.projects.append(project)
-            
-            created_count += 1
-            full_name = f"{new_user.first_name} {new_user.last_name}".strip()
-            result_students.append(StudentInProject(
-                id=new_student.id,
-                name=full_name,
-                email=new_user.email,
-                filiere=new_student.filiere.value if new_student.filiere else None,
-                rank=new_student.general_rank,
-                grade=new_student.gpa
-            ))
-    
-    db.commit()
+        await db.commit()
+    except IntegrityError as error:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Students could not be imported: {error.orig}")
     
     return StudentUploadResponse(
         success=True,
@@ -267,55 +187,138 @@ async def upload_students_to_project(
         students=result_students
     )
 
+@router.post("/{project_id}/import-students")
+def import_students_file(
+    project_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Import a promotion file (CSV or XLSX with name, email, filiere, rank, grade columns)
+    
+    The file is read and imported chunk by chunk, each chunk committed. The
+    response streams one JSON line per chunk (rows processed, created,
+    existing and rejected so far), the last one with "done": true and the
+    first rejected rows.
+    """
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Read the first chunk now, so an unreadable file is a 400 and not a broken stream
+    try:
+        chunks = read_roster_chunks(file.file, file.filename or "")
+        first_chunk = next(chunks, [])
+    except (ValueError, BadZipFile) as error:
+        raise HTTPException(status_code=400, detail=f"Invalid roster file: {error}")
+    
+    def progress():
+        # The stream outlives the route: it gets its own session
+        import_db = SessionLocal()
+        try:
+            for report in import_roster(import_db, project_id, chain([first_chunk], chunks)):
+                yield json.dumps(report) + "\n"
+        finally:
+            import_db.close()
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
 @router.get("/{project_id}/students", response_model=List[StudentInProject])
-async def get_project_students(project_id: int, db: Session = Depends(get_db)):
+async def get_project_students(project_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all students enrolled in a project"""
     
     # Check if project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not await db.scalar(select(Project.id).where(Project.id == project_id)):
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Get all students linked to this project via the many-to-many relationship
-    students_data = []
-    for student in project.students:
-        if student.user:
-            full_name = f"{student.user.first_name} {student.user.last_name}" if student.user.first_name else student.user.email
-            students_data.append(StudentInProject(
-                id=student.id,
-                name=full_name,
-                email=student.user.email,
-                filiere=student.filiere.value if student.filiere else None,
-                rank=student.general_rank,
-                grade=student.gpa
-            ))
-    
-    return students_data
+    # Roster with user details in one joined query
+    return await db.run_sync(get_project_roster, project_id)
 
 @router.delete("/{project_id}/students/{student_id}")
 async def remove_student_from_project(
     project_id: int, 
     student_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove a student from a project"""
     
     # Check if project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not await db.scalar(select(Project.id).where(Project.id == project_id)):
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Check if student exists
-    student = db.query(Student).filter(Student.id == student_id).first()
-    if not student:
+    if not await db.scalar(select(Student.id).where(Student.id == student_id)):
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Check if student is in the project
-    if student not in project.students:
+    # Remove the enrolment row directly instead of loading the whole roster
+    removed = (await db.execute(
+        project_students.delete().where(
+            project_students.c.project_id == project_id,
+            project_students.c.student_id == student_id
+        )
+    )).rowcount
+    if not removed:
         raise HTTPException(status_code=400, detail="Student is not enrolled in this project")
-    
-    # Remove student from project
-    project.students.remove(student)
-    db.commit()
+    await db.commit()
     
     return {"message": "Student removed from project successfully", "student_id": student_id}
+
+# ===== EXCHANGE PROGRAM UNIVERSITIES =====
+
+@router.get("/{project_id}/universities", response_model=List[UniversityResponse])
+async def get_project_universities(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the partner universities of an exchange program"""
+    if not await db.scalar(select(Project.id).where(Project.id == project_id)):
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    universities = await db.scalars(
+        select(University).where(University.project_id == project_id).order_by(University.code)
+    )
+    return universities.all()
+
+@router.post("/{project_id}/universities", response_model=UniversityResponse, status_code=status.HTTP_201_CREATED)
+async def add_project_university(
+    project_id: int,
+    university_data: UniversityCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add a partner university (with its number of seats) to an exchange program"""
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    if project.project_type != ProjectType.EXCHANGE_PROGRAM:
+        raise HTTPException(status_code=400, detail="Universities can only be added to exchange programs")
+    
+    code = university_data.code.strip().upper()
+    existing = await db.scalar(select(University.id).where(
+        University.project_id == project_id,
+        University.code == code
+    ))
+    if existing:
+        raise HTTPException(status_code=400, detail=f"University code '{code}' already exists in this project")
+    
+    university = University(
+        project_id=project_id,
+        code=code,
+        name=university_data.name,
+        capacity=university_data.capacity,
+        required_english_level=university_data.required_english_level
+    )
+    db.add(university)
+    await db.commit()
+    await db.refresh(university)
+    return university
+
+@router.delete("/{project_id}/universities/{university_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project_university(project_id: int, university_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Remove a partner university from an exchange program"""
+    university = await db.scalar(select(University).where(
+        University.id == university_id,
+        University.project_id == project_id
+    ))
+    if not university:
+        raise HTTPException(status_code=404, detail="University not found")
+    
+    await db.delete(university)
+    await db.commit()
+    return
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.models.teacher import Teacher
+from app.api.pagination import MAX_PAGE_SIZE, keyset_page, parse_fields, page_response
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -32,10 +33,29 @@ class TeacherWithUserResponse(TeacherResponse):
 
 # Routes
 @router.get("/", response_model=List[TeacherResponse])
-def get_all_teachers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Récupérer la liste de tous les professeurs"""
-    teachers = db.query(Teacher).offset(skip).limit(limit).all()
-    return teachers
+def get_all_teachers(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    skip: Optional[int] = Query(default=None, ge=0, deprecated=True),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Récupérer la liste des professeurs (100 par page par défaut)
+    
+    Pagination par id: renvoyer l'en-tête X-Next-Cursor dans `cursor` pour la page suivante.
+    `skip` (ancienne pagination par décalage) reste accepté sans `cursor`.
+    """
+    selected = parse_fields(fields, list(TeacherResponse.model_fields))
+    if skip is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="`skip` et `cursor` ne peuvent pas être combinés")
+        teachers = db.query(Teacher).order_by(Teacher.id).offset(skip).limit(limit).all()
+        return page_response(response, teachers, None, selected, TeacherResponse)
+    
+    teachers, next_cursor = keyset_page(db.query(Teacher), [Teacher.id], cursor, limit)
+    return page_response(response, teachers, next_cursor, selected, TeacherResponse)
 
 @router.get("/{teacher_id}", response_model=TeacherWithUserResponse)
 def get_teacher(teacher_id: int, db: Session = Depends(get_db)):
@@ -8,11 +8,26 @@ class Settings(BaseSettings):
     # For development, you can use SQLite instead:
     # DATABASE_URL: str = "sqlite:///./student_assignment.db"
     
+    # Async engine of the API routes (defaults to DATABASE_URL with its async
+    # driver: postgresql+asyncpg, sqlite+aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    ASYNC_POOL_SIZE: int = 20  # Ignored by SQLite (one connection per session)
+    ASYNC_MAX_OVERFLOW: int = 30
+    
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Algorithm jobs (threads running queued solves)
+    ALGORITHM_JOB_WORKERS: int = 2
+    
+    # Group formation previews kept in memory (dry runs)
+    PREVIEW_CACHE_SIZE: int = 128
+    
+    # Seconds between full recounts of the preference statistics (0 = never)
+    PREFERENCE_STATS_RECONCILE_SECONDS: int = 0
+    
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:5173"]
     
@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+import os
+
+# backend/ directory, where alembic.ini lives
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Database connection
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
@@ -13,8 +18,59 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers, by database
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite"
+}
+
+def async_database_url(url: str):
+    """
+    The same database through its async driver (postgresql://... -> postgresql+asyncpg://...)
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{backend}': set ASYNC_DATABASE_URL")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+# Async engine of the API routes: a query awaits the database instead of
+# blocking the event loop. Scripts, background jobs and streamed responses
+# (exports, imports) keep the sync engine above.
+ASYNC_DATABASE_URL = make_url(settings.ASYNC_DATABASE_URL or async_database_url(SQLALCHEMY_DATABASE_URL))
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=engine.echo,
+    # SQLite opens one connection per session (no pool to size)
+    **({} if ASYNC_DATABASE_URL.get_backend_name() == "sqlite" else {
+        "pool_size": settings.ASYNC_POOL_SIZE,
+        "max_overflow": settings.ASYNC_MAX_OVERFLOW
+    })
+)
+
+# Objects are not expired on commit: reloading an attribute after the route
+# has returned (while the response is serialised) would need the database
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+def upgrade_database():
+    """
+    Create missing tables, then apply the Alembic migrations
+    
+    create_all never changes existing tables (new indexes, constraints), the
+    migrations in migrations/versions do.
+    """
+    from alembic import command
+    from alembic.config import Config
+    
+    Base.metadata.create_all(bind=engine)
+    
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.attributes["configure_logger"] = False  # Keep the application's logging setup
+    command.upgrade(config, "head")
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -22,3 +78,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session (see async_engine)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -8,6 +8,9 @@ from .assignment import Assignment
 from .preference import StudentPreference
 from .form_question import FormQuestion, QuestionType
 from .student_response import StudentResponse
+from .university import University
+from .algorithm_run import AlgorithmRun
+from .preference_stats import PreferenceStats
 
 __all__ = [
     "User",
@@ -22,4 +25,7 @@ __all__ = [
     "FormQuestion",
     "QuestionType",
     "StudentResponse",
+    "University",
+    "AlgorithmRun",
+    "PreferenceStats",
 ]
\ No newline at end of file
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Float, JSON, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+class AlgorithmRun(Base):
+    __tablename__ = "algorithm_runs"
+
+    id = Column(String(36), primary_key=True)  # Même valeur que Assignment.algorithm_run_id
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    
+    algorithm = Column(String(50), nullable=False)  # greedy, genetic, english_leveling, ...
+    parameters = Column(JSON, nullable=True)  # Paramètres de la requête (seed, time_budget_ms, ...)
+    stats = Column(JSON, nullable=True)  # Sortie complète de calculate_*_score
+    
+    # Résumé pré-calculé pour /assignments/stats
+    total_assignments = Column(Integer, nullable=False, default=0)
+    total_groups = Column(Integer, nullable=False, default=0)
+    satisfied_students = Column(Integer, nullable=False, default=0)  # satisfaction_score >= 8
+    
+    # Affectations du run: [[student_id, group_number, preference_rank, satisfaction_score], ...]
+    assignments = Column(JSON, nullable=False, default=list)
+    
+    solve_seconds = Column(Float, nullable=True)
+    is_active = Column(Boolean, default=False, nullable=False)  # Run actuellement affiché pour le projet
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    project = relationship("Project", back_populates="algorithm_runs")
+    
+    # Un seul run actif par projet: recherche par (project_id, is_active)
+    __table_args__ = (
+        Index('ix_algorithm_runs_project_active', 'project_id', 'is_active'),
+    )
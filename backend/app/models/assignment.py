@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, String, Boolean, Text, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, String, Boolean, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -36,4 +36,6 @@ class Assignment(Base):
     # Contrainte: un étudiant ne peut être affecté qu'à un seul projet
     __table_args__ = (
         UniqueConstraint('student_id', name='unique_student_assignment'),
+        # Affectations d'un projet, par groupe
+        Index('ix_assignments_project_group', 'project_id', 'group_number'),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Text, Enum, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Text, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -37,3 +37,8 @@ class FormQuestion(Base):
     # Relationships
     project = relationship("Project", back_populates="form_questions")
     responses = relationship("StudentResponse", back_populates="question", cascade="all, delete-orphan")
+    
+    # Questions d'un projet dans l'ordre d'affichage
+    __table_args__ = (
+        Index('ix_form_questions_project_order', 'project_id', 'order'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, String, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -30,4 +30,7 @@ class StudentPreference(Base):
     __table_args__ = (
         UniqueConstraint('student_id', 'project_id', name='unique_student_project_preference'),
         UniqueConstraint('student_id', 'rank', name='unique_student_rank'),
+        # Préférences d'un projet triées par rang, et recherche des élèves qui ont choisi un partenaire
+        Index('ix_student_preferences_project_rank', 'project_id', 'rank'),
+        Index('ix_student_preferences_preferred_partner', 'preferred_partner_id'),
     )
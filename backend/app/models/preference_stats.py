@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime
+from datetime import datetime
+from ..database import Base
+
+class PreferenceStats(Base):
+    __tablename__ = "preference_stats"
+
+    # Une seule ligne (id = 1), lue par /preferences/stats
+    id = Column(Integer, primary_key=True)
+    
+    # Compteurs mis à jour dans la transaction de chaque écriture de préférences
+    total_students = Column(Integer, nullable=False, default=0)
+    students_with_preferences = Column(Integer, nullable=False, default=0)
+    total_active_projects = Column(Integer, nullable=False, default=0)
+    total_preferences = Column(Integer, nullable=False, default=0)
+    
+    # Dernier recomptage complet (COUNT sur les tables)
+    reconciled_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
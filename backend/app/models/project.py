@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Enum as SQLEnum, Table
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Enum as SQLEnum, Table, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -54,3 +54,10 @@ class Project(Base):
     student_preferences = relationship("StudentPreference", back_populates="project", cascade="all, delete-orphan")
     assignments = relationship("Assignment", back_populates="project", cascade="all, delete-orphan")
     students = relationship("Student", secondary=project_students, back_populates="projects")
+    universities = relationship("University", back_populates="project", cascade="all, delete-orphan")  # For exchange programs
+    algorithm_runs = relationship("AlgorithmRun", back_populates="project", cascade="all, delete-orphan")  # Run history
+    
+    # Liste des projets d'un professeur (filtre is_active, tri par date de création)
+    __table_args__ = (
+        Index('ix_projects_teacher_active_created', 'teacher_id', 'is_active', 'created_at'),
+    )
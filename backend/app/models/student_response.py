@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -18,3 +18,10 @@ class StudentResponse(Base):
     # Relationships
     student = relationship("Student", back_populates="form_responses")
     question = relationship("FormQuestion", back_populates="responses")
+    
+    # Une seule réponse par élève et par question (cible de l'upsert à la soumission),
+    # et réponses d'une question (jointure par projet)
+    __table_args__ = (
+        Index('ix_student_responses_student_question', 'student_id', 'question_id', unique=True),
+        Index('ix_student_responses_question', 'question_id'),
+    )
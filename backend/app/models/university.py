@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+from .student import EnglishLevel
+
+class University(Base):
+    __tablename__ = "universities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    
+    code = Column(String(10), nullable=False)  # Lettre utilisée dans university_ranking (ex: "A")
+    name = Column(String(255), nullable=False)
+    capacity = Column(Integer, nullable=False, default=1)  # Nombre de places d'échange
+    required_english_level = Column(Enum(EnglishLevel), nullable=True)  # Niveau minimum exigé
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    project = relationship("Project", back_populates="universities")
+    
+    # Contrainte: un code par université dans un programme d'échange
+    __table_args__ = (
+        UniqueConstraint('project_id', 'code', name='unique_project_university_code'),
+    )
@@ -128,6 +128,26 @@ class PreferenceResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# University Schemas (exchange programs)
+class UniversityCreate(BaseModel):
+    """Add a university to an exchange program"""
+    code: str = Field(..., min_length=1, max_length=10)  # Letter used in university_ranking
+    name: str = Field(..., min_length=1, max_length=255)
+    capacity: int = Field(default=1, ge=0)
+    required_english_level: Optional[EnglishLevelEnum] = None
+
+class UniversityResponse(BaseModel):
+    """University response"""
+    id: int
+    project_id: int
+    code: str
+    name: str
+    capacity: int
+    required_english_level: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
 # Upload Schemas
 class StudentUploadRequest(BaseModel):
     """Upload students to a project"""
@@ -0,0 +1,182 @@
+"""
+Batch Runner for Group Projects
+
+Runs the group formation algorithm for many GROUP_PROJECT projects at once:
+1. Load the preferences of every project in a single query, ordered by project
+2. Solve the projects in parallel over a process pool
+3. Write each project's assignments in one bulk insert and one transaction
+4. Return per-project stats and the total wall-clock time
+
+A project that fails to save (for example a student already assigned to
+another project) is rolled back on its own and reported, the others are kept.
+"""
+
+from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from datetime import datetime
+import os
+import time
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.assignment import Assignment
+from app.services.bulk_writer import bulk_insert_assignments
+from app.models.preference import StudentPreference
+from app.models.project import Project, ProjectType
+from app.services.group_algorithm import assign_students_to_groups
+from app.services.run_history import record_run
+
+
+def group_assignment_rows(
+    project_id: int,
+    groups: List[List[int]],
+    preferences: Dict[int, Optional[int]],
+    stats: Dict[str, any],
+    algorithm_run_id: str
+) -> List[Dict[str, any]]:
+    """
+    Build the Assignment rows of a grouping, ready for a bulk insert
+    """
+    assigned_at = datetime.utcnow()
+    rows = []
+
+    for group_num, group in enumerate(groups, start=1):
+        members = set(group)
+        for student_id in group:
+            # Check if student got their preference
+            got_preference = preferences.get(student_id) in members
+            rows.append({
+                "student_id": student_id,
+                "project_id": project_id,
+                "group_number": group_num,
+                "preference_rank": 1 if got_preference else None,
+                "satisfaction_score": 10.0 if got_preference else 5.0,
+                "algorithm_score": stats['satisfaction_rate'],
+                "algorithm_run_id": algorithm_run_id,
+                "assigned_at": assigned_at
+            })
+
+    return rows
+
+
+def _solve_project(
+    task: Tuple[int, List[int], Dict[int, Optional[int]], int, Optional[int], Optional[int]]
+) -> Tuple[int, List[List[int]], Dict[str, any], float]:
+    project_id, student_ids, preferences, group_size, time_budget_ms, seed = task
+    started = time.perf_counter()
+    groups, stats = assign_students_to_groups(
+        student_ids=student_ids,
+        preferences=preferences,
+        group_size=group_size,
+        time_budget_ms=time_budget_ms,
+        seed=seed
+    )
+    return project_id, groups, stats, time.perf_counter() - started
+
+
+def run_group_projects_batch(
+    db: Session,
+    project_ids: Optional[List[int]] = None,
+    time_budget_ms: Optional[int] = None,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None
+) -> Dict[str, any]:
+    """
+    Form groups for every active GROUP_PROJECT (or the given ones) in one batch
+
+    Args:
+        db: Database session
+        project_ids: Projects to run (default: every active group project)
+        time_budget_ms: Optional local search budget per project
+        seed: Seed used for every project, for reproducible runs
+        workers: Processes used to solve projects (default: CPU count)
+
+    Returns:
+        Dict with per-project results and the total wall-clock time
+    """
+    started = time.perf_counter()
+
+    query = db.query(Project.id, Project.group_size).filter(
+        Project.is_active == True,
+        Project.project_type == ProjectType.GROUP_PROJECT
+    )
+    if project_ids:
+        query = query.filter(Project.id.in_(project_ids))
+    group_sizes = {project_id: group_size or 3 for project_id, group_size in query.all()}
+
+    # One query for every project's preferences, grouped by project
+    rows = db.query(
+        StudentPreference.project_id,
+        StudentPreference.student_id,
+        StudentPreference.preferred_partner_id
+    ).filter(
+        StudentPreference.project_id.in_(list(group_sizes))
+    ).order_by(StudentPreference.project_id).all()
+
+    preferences_by_project: Dict[int, Dict[int, Optional[int]]] = {}
+    tasks = []
+    for project_id, project_rows in groupby(rows, key=lambda row: row.project_id):
+        preferences = {row.student_id: row.preferred_partner_id for row in project_rows}
+        preferences_by_project[project_id] = preferences
+        tasks.append((project_id, list(preferences), preferences, group_sizes[project_id], time_budget_ms, seed))
+
+    results: Dict[int, Dict[str, any]] = {
+        project_id: {"project_id": project_id, "status": "skipped", "detail": "No student preferences found for this project"}
+        for project_id in group_sizes
+    }
+
+    workers = min(workers if workers is not None else (os.cpu_count() or 1), len(tasks))
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        solved = executor.map(_solve_project, tasks)
+    else:
+        executor = None
+        solved = map(_solve_project, tasks)
+
+    try:
+        # Save each project as soon as its solve comes back
+        for project_id, groups, stats, solve_seconds in solved:
+            algorithm_run_id = str(uuid.uuid4())
+            assignment_rows = group_assignment_rows(
+                project_id, groups, preferences_by_project[project_id], stats, algorithm_run_id
+            )
+
+            try:
+                db.query(Assignment).filter(Assignment.project_id == project_id).delete(synchronize_session=False)
+                bulk_insert_assignments(db, assignment_rows)
+                record_run(
+                    db, project_id, algorithm_run_id, "greedy",
+                    {"time_budget_ms": time_budget_ms, "seed": seed, "batch": True},
+                    stats, assignment_rows, solve_seconds
+                )
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                results[project_id] = {
+                    "project_id": project_id,
+                    "status": "failed",
+                    "detail": "Some students are already assigned to another project",
+                    "solve_seconds": solve_seconds
+                }
+                continue
+
+            results[project_id] = {
+                "project_id": project_id,
+                "status": "success",
+                "algorithm_run_id": algorithm_run_id,
+                "assignments_created": len(assignment_rows),
+                "groups_created": len(groups),
+                "solve_seconds": solve_seconds,
+                "stats": stats
+            }
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "projects": [results[project_id] for project_id in sorted(results)],
+        "total_seconds": time.perf_counter() - started
+    }
@@ -0,0 +1,93 @@
+"""
+Bulk Writer for Assignment Rows
+
+Writes the rows built by the algorithm flows (one dict per assignment, see
+group_assignment_rows) without going through the ORM unit of work:
+1. PostgreSQL: a single COPY ... FROM STDIN on the session's connection
+2. Other databases (SQLite in development): one Core INSERT executed with
+   executemany per CHUNK_SIZE rows (the statement is compiled once and
+   cached, and no ORM objects are built)
+
+Rows are written in the session's current transaction, so the caller still
+commits (or rolls back) them together with the run history.
+"""
+
+from typing import List, Dict
+from datetime import datetime
+import csv
+import io
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.assignment import Assignment
+
+# Columns every assignment row carries
+ASSIGNMENT_COLUMNS = (
+    "student_id",
+    "project_id",
+    "group_number",
+    "preference_rank",
+    "satisfaction_score",
+    "algorithm_score",
+    "algorithm_run_id",
+    "assigned_at"
+)
+
+# Rows per executemany call
+CHUNK_SIZE = 5000
+
+
+def bulk_insert_assignments(db: Session, rows: List[Dict[str, any]], chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Insert assignment rows in bulk
+
+    Args:
+        db: Database session (the caller commits)
+        rows: Dicts with the ASSIGNMENT_COLUMNS keys
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_assignments(db, rows)
+    else:
+        statement = insert(Assignment.__table__)
+        for start in range(0, len(rows), chunk_size):
+            db.execute(statement, rows[start:start + chunk_size])
+
+    return len(rows)
+
+
+def _copy_assignments(db: Session, rows: List[Dict[str, any]]):
+    """
+    COPY the rows through the session's psycopg2 connection
+    """
+    created_at = datetime.utcnow()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = [row[column] for column in ASSIGNMENT_COLUMNS]
+        # COPY skips the Python-side column defaults
+        values += [False, created_at]
+        # Unquoted empty fields are NULL in CSV COPY
+        writer.writerow(["" if value is None else _copy_value(value) for value in values])
+    buffer.seek(0)
+
+    columns = ", ".join(ASSIGNMENT_COLUMNS + ("is_validated", "created_at"))
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {Assignment.__tablename__} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _copy_value(value: any) -> str:
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
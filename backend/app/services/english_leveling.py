@@ -0,0 +1,190 @@
+"""
+English Leveling Algorithm
+
+This algorithm builds groups of students with the same English level:
+1. Students are bucketed by english_level (counting sort over the CEFR levels)
+2. Inside a level, students are ordered by GPA (tiebreak)
+3. The ordered list is cut into consecutive groups of 4 (or 3 when the
+   count does not divide evenly), choosing the cuts that minimise the
+   total level spread inside groups
+
+Students without a known level (missing or not a CEFR value) are kept in
+their own bucket after C2 rather than guessed: they are grouped together,
+a group mixing them with levelled students costs more than any real spread,
+and the stats count them (students_without_level) and leave them out of the
+level spreads.
+
+Cutting is a dynamic programme with two choices per position (a group of
+4 or of 3 ends here), so everything after the sort is linear in the number
+of students.
+"""
+
+from typing import List, Dict, Tuple, Optional
+
+from app.services.group_algorithm import partition_group_sizes
+
+# CEFR levels from lowest to highest (same values as EnglishLevel)
+ENGLISH_LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+LEVEL_INDEX = {level: i for i, level in enumerate(ENGLISH_LEVELS)}
+
+# Bucket of the students whose level is unknown, after every known level
+UNKNOWN_LEVEL = len(ENGLISH_LEVELS)
+
+
+class EnglishLevelingAlgorithm:
+    """
+    Algorithm to form level-homogeneous groups for English leveling projects
+    """
+
+    def __init__(self, group_size: int = 4):
+        if group_size < 2:
+            raise ValueError("group_size must be at least 2")
+        self.group_size = group_size
+        self.levels: Dict[int, int] = {}
+
+    def form_groups(
+        self,
+        students: List[Tuple[int, str, Optional[float]]]
+    ) -> List[List[int]]:
+        """
+        Main algorithm to form groups
+
+        Args:
+            students: List of (student_id, english_level, gpa) tuples
+
+        Returns:
+            List of groups, ordered from lowest to highest level
+        """
+        ordered = self._sort_students(students)
+        levels = [self.levels[student_id] for student_id in ordered]
+
+        sizes = self._cut_sizes(levels)
+        groups = []
+        start = 0
+        for size in sizes:
+            groups.append(ordered[start:start + size])
+            start += size
+        return groups
+
+    def _sort_students(self, students: List[Tuple[int, str, Optional[float]]]) -> List[int]:
+        """
+        Bucket students by level, then sort each bucket by GPA (best first)
+        """
+        buckets: List[List[Tuple[float, int]]] = [[] for _ in range(UNKNOWN_LEVEL + 1)]
+        self.levels = {}
+
+        for student_id, level, gpa in students:
+            level = getattr(level, "value", level)
+            index = LEVEL_INDEX.get(level, UNKNOWN_LEVEL)
+            self.levels[student_id] = index
+            buckets[index].append((-(gpa if gpa is not None else float("-inf")), student_id))
+
+        ordered = []
+        for bucket in buckets:
+            bucket.sort()
+            ordered.extend(student_id for _, student_id in bucket)
+        return ordered
+
+    def _cut_sizes(self, levels: List[int]) -> List[int]:
+        """
+        Choose consecutive group sizes in {k-1, k} minimising the total level spread
+
+        Ties are broken by using as few groups of k-1 as possible. Falls back to
+        partition_group_sizes when n cannot be written with sizes k-1 and k.
+        """
+        n = len(levels)
+        k = self.group_size
+        infinity = float("inf")
+
+        # cost[i] = (total spread, small groups) for the first i students
+        cost: List[Tuple[float, int]] = [(infinity, 0)] * (n + 1)
+        choice = [0] * (n + 1)
+        cost[0] = (0, 0)
+
+        for i in range(1, n + 1):
+            for size in (k, k - 1):
+                if size > i or cost[i - size][0] == infinity:
+                    continue
+                spread = self._spread(levels[i - size], levels[i - 1])
+                previous = cost[i - size]
+                candidate = (previous[0] + spread, previous[1] + (size < k))
+                if candidate < cost[i]:
+                    cost[i] = candidate
+                    choice[i] = size
+
+        if n and cost[n][0] == infinity:
+            return partition_group_sizes(n, k)
+
+        sizes = []
+        i = n
+        while i > 0:
+            sizes.append(choice[i])
+            i -= choice[i]
+        sizes.reverse()
+        return sizes
+
+    @staticmethod
+    def _spread(lowest: int, highest: int) -> int:
+        # Levels are sorted, so only the last member can be of unknown level
+        if highest == UNKNOWN_LEVEL and lowest != UNKNOWN_LEVEL:
+            return UNKNOWN_LEVEL  # Mixed group: worse than any spread between known levels
+        return highest - lowest
+
+    def calculate_homogeneity_score(self, groups: List[List[int]]) -> Dict[str, any]:
+        """
+        Calculate metrics about how homogeneous the groups are
+
+        Spreads only look at students of known level; groups without any are
+        neither homogeneous nor counted in the spreads.
+
+        Returns:
+            Dict with homogeneity statistics
+        """
+        total_students = sum(len(group) for group in groups)
+        homogeneous_groups = 0
+        students_in_homogeneous = 0
+        spreads = []
+
+        for group in groups:
+            group_levels = [self.levels[student_id] for student_id in group if self.levels[student_id] != UNKNOWN_LEVEL]
+            if not group_levels:
+                continue
+            spread = max(group_levels) - min(group_levels)
+            spreads.append(spread)
+            if spread == 0:
+                homogeneous_groups += 1
+                students_in_homogeneous += len(group)
+
+        return {
+            "total_students": total_students,
+            "homogeneous_groups": homogeneous_groups,
+            "homogeneity_rate": (students_in_homogeneous / total_students * 100) if total_students > 0 else 0,
+            "max_level_spread": max(spreads) if spreads else 0,
+            "average_level_spread": sum(spreads) / len(spreads) if spreads else 0,
+            "total_groups": len(groups),
+            "average_group_size": total_students / len(groups) if groups else 0,
+            "students_without_level": sum(1 for index in self.levels.values() if index == UNKNOWN_LEVEL)
+        }
+
+
+def assign_students_by_level(
+    students: List[Tuple[int, str, Optional[float]]],
+    group_size: int = 4
+) -> Tuple[List[List[int]], Dict[str, any]]:
+    """
+    Convenience function to run the English leveling algorithm
+
+    Args:
+        students: List of (student_id, english_level, gpa) tuples
+        group_size: Desired size for each group (default 4)
+
+    Returns:
+        Tuple of (groups, stats) where:
+            - groups: List of groups (each group is a list of student IDs)
+            - stats: Dictionary with homogeneity metrics
+    """
+    algorithm = EnglishLevelingAlgorithm(group_size=group_size)
+    groups = algorithm.form_groups(students)
+    stats = algorithm.calculate_homogeneity_score(groups)
+
+    return groups, stats
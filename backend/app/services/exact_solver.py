@@ -0,0 +1,370 @@
+"""
+Exact Group Formation for Small Cohorts
+
+Branch-and-bound search for the grouping that satisfies the most partner
+preferences, with the same group sizes as GroupFormationAlgorithm
+(partition_group_sizes):
+1. Incumbent: the greedy grouping improved by the local search
+2. Students are placed one at a time in preference-graph order (each student
+   close to the partner they chose and to the students who chose them)
+3. Upper bound: satisfied so far + for every student still to place, their own
+   choice (if the partner's group still has room) + the most students of one
+   group who chose them; capped by the structural bound (a group that does not
+   hold a whole preference cycle has at least one unsatisfied member)
+4. Memoisation: a state is identified by the seats left and the members that
+   still matter in each group (groups are interchangeable, so their signatures
+   are sorted); reaching a known state with no better score is pruned
+5. Symmetry: empty groups of the same size, and groups whose members no longer
+   matter, are only tried once per number of free seats
+
+Students without any preference link are left out of the search and fill the
+remaining seats at the end. The search stops at the time budget (or when
+should_stop() answers True, e.g. a cancelled job) and returns the best
+grouping found with the proven upper bound, so the gap to the optimum is
+known even when the search is cut short.
+"""
+
+from typing import Callable, List, Dict, Tuple, Optional
+import time
+
+from app.services.group_algorithm import (
+    GroupFormationAlgorithm,
+    assign_students_to_groups,
+    partition_group_sizes
+)
+
+# Beyond this size the search space is too large to be useful
+MAX_EXACT_STUDENTS = 80
+
+# Memoised states kept before the table stops growing
+MAX_MEMO_STATES = 500000
+
+
+class _TimeUp(Exception):
+    pass
+
+
+class ExactGroupSolver:
+    """
+    Branch-and-bound solver maximising satisfied partner preferences
+    """
+
+    def __init__(
+        self,
+        group_size: int = 3,
+        time_budget_ms: int = 5000,
+        seed: Optional[int] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ):
+        self.group_size = group_size
+        self.time_budget_ms = time_budget_ms
+        self.seed = seed
+        self.should_stop = should_stop
+        self.value = 0
+        self.upper_bound = 0
+        self.optimal = False
+        self.nodes = 0
+
+    def form_groups(
+        self,
+        student_ids: List[int],
+        preferences: Dict[int, Optional[int]]
+    ) -> List[List[int]]:
+        """
+        Main algorithm to form groups
+
+        Args:
+            student_ids: List of all student IDs to assign
+            preferences: Dict mapping student_id -> preferred_partner_id (or None)
+
+        Returns:
+            List of groups, where each group is a list of student IDs
+        """
+        student_ids = list(dict.fromkeys(student_ids))
+        if len(student_ids) > MAX_EXACT_STUDENTS:
+            raise ValueError(f"The exact solver handles at most {MAX_EXACT_STUDENTS} students")
+        if not student_ids:
+            return []
+
+        started = time.perf_counter()
+        self._deadline = started + self.time_budget_ms / 1000
+        self._prepare(student_ids, preferences)
+
+        # Incumbent from the heuristic engine (a fifth of the budget, at most 200 ms)
+        incumbent_budget = max(1, min(200, self.time_budget_ms // 5))
+        groups, stats = assign_students_to_groups(
+            student_ids, preferences, self.group_size,
+            time_budget_ms=incumbent_budget, seed=self.seed, should_stop=self.should_stop
+        )
+        # The search leaves out students who chose themselves (always satisfied)
+        self.value = stats["satisfied_students"] - self._self_chosen
+        self._best_groups = groups
+
+        self.nodes = 0
+        self._memo: Dict[tuple, int] = {}
+        self._open_bounds: List[int] = []
+        root_bound = min(self._bound(0, 0), self._structural_bound)
+
+        try:
+            if root_bound > self.value:
+                self._search(0, 0, root_bound)
+            self.upper_bound = self.value
+            self.optimal = True
+        except _TimeUp:
+            # Unexplored subtrees hang from the nodes still on the stack
+            self.upper_bound = max([self.value] + self._open_bounds) if self._open_bounds else root_bound
+            self.optimal = self.upper_bound == self.value
+
+        self.value += self._self_chosen
+        self.upper_bound += self._self_chosen
+        return [sorted(group) for group in self._best_groups]
+
+    def _prepare(self, student_ids: List[int], preferences: Dict[int, Optional[int]]):
+        n = len(student_ids)
+        index = {student_id: i for i, student_id in enumerate(student_ids)}
+        self._ids = student_ids
+
+        partner = [-1] * n
+        children: List[List[int]] = [[] for _ in range(n)]
+        for i, student_id in enumerate(student_ids):
+            p = index.get(preferences.get(student_id))
+            if p is not None and p != i:
+                partner[i] = p
+                children[p].append(i)
+        self._partner = partner
+        self._children = children
+        self._self_chosen = sum(1 for student_id in student_ids if preferences.get(student_id) == student_id)
+
+        # Search order: depth-first over preference links, most chosen students first
+        linked = [i for i in range(n) if partner[i] >= 0 or children[i]]
+        linked.sort(key=lambda i: -len(children[i]))
+        seen = [False] * n
+        order = []
+        for start in linked:
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                if seen[node]:
+                    continue
+                seen[node] = True
+                order.append(node)
+                stack.extend(child for child in children[node] if not seen[child])
+                if partner[node] >= 0 and not seen[partner[node]]:
+                    stack.append(partner[node])
+        self._order = order
+        self._unlinked = [i for i in range(n) if not seen[i]]
+
+        self._capacities = partition_group_sizes(n, self.group_size)
+        self._structural_bound = self._cycle_bound(n)
+
+        # position[i] = step at which student i is placed
+        self._position = [len(order)] * n
+        for step, node in enumerate(order):
+            self._position[node] = step
+
+        num_groups = len(self._capacities)
+        self._free = list(self._capacities)
+        self._members: List[List[int]] = [[] for _ in range(num_groups)]
+        self._label = [-1] * n
+        # chosen_by[u] = {group: placed members of that group who chose u}
+        self._chosen_by: List[Dict[int, int]] = [{} for _ in range(n)]
+
+    def _cycle_bound(self, n: int) -> int:
+        """
+        Bound from the preference graph alone
+
+        Inside a group, the students whose partner is also in the group form a
+        functional graph: unless it contains a whole preference cycle, at least
+        one member is unsatisfied. Students without a partner never are.
+        """
+        largest = max(self._capacities)
+        state = [0] * n  # 0 = unvisited, 1 = on the current path, 2 = done
+        short_cycles = 0
+        for start in range(n):
+            path = []
+            node = start
+            while node >= 0 and state[node] == 0:
+                state[node] = 1
+                path.append(node)
+                node = self._partner[node]
+            if node >= 0 and state[node] == 1:
+                if len(path) - path.index(node) <= largest:
+                    short_cycles += 1
+            for visited in path:
+                state[visited] = 2
+
+        without_partner = sum(1 for p in self._partner if p < 0)
+        groups_without_cycle = max(0, len(self._capacities) - short_cycles)
+        return n - max(without_partner, groups_without_cycle)
+
+    def _bound(self, step: int, score: int) -> int:
+        """
+        Upper bound on the final score from this node
+        """
+        bound = score
+        partner = self._partner
+        label = self._label
+        free = self._free
+        for u in self._order[step:]:
+            p = partner[u]
+            if p >= 0 and (label[p] < 0 or free[label[p]] > 0):
+                bound += 1
+            # u joins one group: only the choosers from that group can be satisfied
+            bound += max((count for g, count in self._chosen_by[u].items() if free[g] > 0), default=0)
+        return bound
+
+    def _matters(self, member: int, step: int) -> bool:
+        """
+        A placed student still matters if a link to a student not yet placed touches them
+        """
+        p = self._partner[member]
+        if p >= 0 and self._position[p] >= step:
+            return True
+        return any(self._position[child] >= step for child in self._children[member])
+
+    def _state_key(self, step: int) -> tuple:
+        signatures = []
+        for g, members in enumerate(self._members):
+            relevant = tuple(sorted(m for m in members if self._matters(m, step)))
+            signatures.append((self._free[g], relevant))
+        signatures.sort()
+        return (step, tuple(signatures))
+
+    def _candidate_groups(self, u: int, step: int) -> List[int]:
+        """
+        Groups worth trying for u, most promising first, one per symmetry class
+        """
+        candidates = []
+        tried = set()
+        p = self._partner[u]
+        if p >= 0 and self._label[p] >= 0 and self._free[self._label[p]] > 0:
+            candidates.append(self._label[p])
+            tried.add(self._label[p])
+
+        for g, _ in sorted(self._chosen_by[u].items(), key=lambda item: -item[1]):
+            if g not in tried and self._free[g] > 0:
+                candidates.append(g)
+                tried.add(g)
+
+        seen_classes = set()
+        for g, members in enumerate(self._members):
+            if g in tried or self._free[g] == 0:
+                continue
+            if not members or not any(self._matters(m, step) for m in members):
+                # Interchangeable with any other such group with as many free seats
+                symmetry_class = (bool(members), self._free[g])
+                if symmetry_class in seen_classes:
+                    continue
+                seen_classes.add(symmetry_class)
+            candidates.append(g)
+        return candidates
+
+    def _place(self, u: int, g: int) -> int:
+        gain = self._chosen_by[u].get(g, 0)
+        p = self._partner[u]
+        if p >= 0:
+            if self._label[p] == g:
+                gain += 1
+            counts = self._chosen_by[p]
+            counts[g] = counts.get(g, 0) + 1
+        self._label[u] = g
+        self._free[g] -= 1
+        self._members[g].append(u)
+        return gain
+
+    def _unplace(self, u: int, g: int):
+        p = self._partner[u]
+        if p >= 0:
+            counts = self._chosen_by[p]
+            counts[g] -= 1
+            if counts[g] == 0:
+                del counts[g]
+        self._label[u] = -1
+        self._free[g] += 1
+        self._members[g].pop()
+
+    def _search(self, step: int, score: int, bound: int):
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and (
+            time.perf_counter() >= self._deadline or (self.should_stop is not None and self.should_stop())
+        ):
+            raise _TimeUp()
+
+        if step == len(self._order):
+            if score > self.value:
+                self.value = score
+                self._best_groups = self._complete_groups()
+            return
+
+        key = self._state_key(step)
+        known = self._memo.get(key)
+        if known is not None and known >= score:
+            return
+        if known is not None or len(self._memo) < MAX_MEMO_STATES:
+            self._memo[key] = score
+
+        # Bound every child first and explore the most promising ones first
+        u = self._order[step]
+        children = []
+        for g in self._candidate_groups(u, step):
+            gain = self._place(u, g)
+            child_bound = min(bound, self._bound(step + 1, score + gain))
+            self._unplace(u, g)
+            if child_bound > self.value:
+                children.append((child_bound, gain, g))
+        children.sort(key=lambda child: -child[0])
+
+        # Children are explored by decreasing bound, so the open bound of this
+        # node is the bound of the child being explored
+        self._open_bounds.append(bound)
+        for child_bound, gain, g in children:
+            if child_bound <= self.value:
+                break
+            self._open_bounds[-1] = child_bound
+            self._place(u, g)
+            self._search(step + 1, score + gain, child_bound)
+            self._unplace(u, g)
+        self._open_bounds.pop()
+
+    def _complete_groups(self) -> List[List[int]]:
+        """
+        Current placement plus the unlinked students in the seats left
+        """
+        groups = [[self._ids[m] for m in members] for members in self._members]
+        unlinked = iter(self._unlinked)
+        for g, free in enumerate(self._free):
+            for _ in range(free):
+                groups[g].append(self._ids[next(unlinked)])
+        return groups
+
+
+def solve_groups_exactly(
+    student_ids: List[int],
+    preferences: Dict[int, Optional[int]],
+    group_size: int = 3,
+    time_budget_ms: int = 5000,
+    seed: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[List[List[int]], Dict[str, any]]:
+    """
+    Convenience function to run the exact solver
+
+    Returns:
+        Tuple of (groups, stats) where stats holds the satisfaction metrics and
+        solution_value, upper_bound, gap (% of the bound) and optimal
+    """
+    solver = ExactGroupSolver(group_size=group_size, time_budget_ms=time_budget_ms, seed=seed, should_stop=should_stop)
+    groups = solver.form_groups(student_ids, preferences)
+
+    scorer = GroupFormationAlgorithm(group_size=group_size)
+    scorer.preferences = preferences
+    stats = scorer.calculate_satisfaction_score(groups)
+    stats.update({
+        "solution_value": solver.value,
+        "upper_bound": solver.upper_bound,
+        "gap": (solver.upper_bound - solver.value) / solver.upper_bound * 100 if solver.upper_bound else 0.0,
+        "optimal": solver.optimal,
+        "nodes": solver.nodes
+    })
+
+    return groups, stats
@@ -0,0 +1,191 @@
+"""
+Exchange Program Matching Algorithm
+
+Student-proposing deferred acceptance (Gale-Shapley) for exchange programs:
+1. Students rank universities (StudentPreference.university_ranking, "A,B,C")
+2. Universities rank students by general_rank, then GPA
+3. Each university accepts at most `capacity` students and may require a
+   minimum English level
+
+The result is stable: no student and university would both rather be
+matched together than with their current match.
+
+Rankings are parsed once into index lists and every university keeps its
+tentatively accepted students in a heap with the weakest on top, so a run
+costs O(total preference length * log capacity).
+"""
+
+from typing import List, Dict, Tuple, Optional
+from collections import deque
+import heapq
+
+from app.services.english_leveling import LEVEL_INDEX
+
+
+def parse_university_ranking(ranking: Optional[str]) -> List[str]:
+    """
+    Parse a ranking string like "A,B,C" into an ordered list of codes (duplicates dropped)
+    """
+    if not ranking:
+        return []
+    codes = [code.strip().upper() for code in ranking.split(",")]
+    return list(dict.fromkeys(code for code in codes if code))
+
+
+class ExchangeMatchingAlgorithm:
+    """
+    Deferred acceptance matching of students to exchange universities
+    """
+
+    def __init__(self):
+        self.rankings: Dict[int, List[str]] = {}
+        self.capacities: Dict[str, int] = {}
+
+    def match(
+        self,
+        rankings: Dict[int, List[str]],
+        capacities: Dict[str, int],
+        students: Dict[int, Tuple[Optional[int], Optional[float], Optional[str]]],
+        requirements: Optional[Dict[str, Optional[str]]] = None
+    ) -> Dict[int, Optional[str]]:
+        """
+        Main algorithm to match students to universities
+
+        Args:
+            rankings: Dict mapping student_id -> ordered list of university codes
+            capacities: Dict mapping university code -> number of seats
+            students: Dict mapping student_id -> (general_rank, gpa, english_level)
+            requirements: Dict mapping university code -> minimum English level (or None)
+
+        Returns:
+            Dict mapping student_id -> university code (None if unmatched)
+        """
+        self.rankings = rankings
+        self.capacities = capacities
+        requirements = requirements or {}
+
+        codes = list(capacities)
+        code_index = {code: u for u, code in enumerate(codes)}
+        seats = [max(0, capacities[code]) for code in codes]
+        minimum_level = [
+            LEVEL_INDEX.get(getattr(requirements.get(code), "value", requirements.get(code)), -1)
+            for code in codes
+        ]
+
+        # Universities all share one priority order over students: best first
+        def priority_key(student_id):
+            general_rank, gpa, _ = students.get(student_id, (None, None, None))
+            return (
+                general_rank if general_rank is not None else float("inf"),
+                -gpa if gpa is not None else float("inf"),
+                student_id
+            )
+
+        priority = {
+            student_id: position
+            for position, student_id in enumerate(sorted(rankings, key=priority_key))
+        }
+
+        # Pre-parse rankings into university indexes, dropping unknown or unreachable ones
+        proposals: Dict[int, List[int]] = {}
+        for student_id, ranking in rankings.items():
+            level = students.get(student_id, (None, None, None))[2]
+            level = LEVEL_INDEX.get(getattr(level, "value", level), -1)
+            proposals[student_id] = [
+                code_index[code] for code in ranking
+                if code in code_index and seats[code_index[code]] > 0
+                and level >= minimum_level[code_index[code]]
+            ]
+
+        # held[u] is a heap of (-priority, student_id): the weakest held student on top
+        held: List[List[Tuple[int, int]]] = [[] for _ in codes]
+        next_choice = {student_id: 0 for student_id in rankings}
+        free = deque(student_id for student_id in rankings if proposals[student_id])
+
+        while free:
+            student_id = free.popleft()
+            choices = proposals[student_id]
+            if next_choice[student_id] >= len(choices):
+                continue
+
+            u = choices[next_choice[student_id]]
+            next_choice[student_id] += 1
+            entry = (-priority[student_id], student_id)
+
+            if len(held[u]) < seats[u]:
+                heapq.heappush(held[u], entry)
+                continue
+
+            if entry > held[u][0]:
+                # The university prefers the newcomer: the weakest held student is rejected
+                _, rejected = heapq.heapreplace(held[u], entry)
+            else:
+                rejected = student_id
+            if next_choice[rejected] < len(proposals[rejected]):
+                free.append(rejected)
+
+        matching: Dict[int, Optional[str]] = {student_id: None for student_id in rankings}
+        for u, heap in enumerate(held):
+            for _, student_id in heap:
+                matching[student_id] = codes[u]
+        return matching
+
+    def calculate_satisfaction_score(self, matching: Dict[int, Optional[str]]) -> Dict[str, any]:
+        """
+        Calculate metrics about how well university rankings were satisfied
+
+        Returns:
+            Dict with satisfaction statistics
+        """
+        total_students = len(matching)
+        rank_distribution: Dict[int, int] = {}
+        filled: Dict[str, int] = {}
+
+        for student_id, code in matching.items():
+            if code is None:
+                continue
+            rank = self.rankings[student_id].index(code) + 1
+            rank_distribution[rank] = rank_distribution.get(rank, 0) + 1
+            filled[code] = filled.get(code, 0) + 1
+
+        matched = sum(rank_distribution.values())
+        total_seats = sum(max(0, seats) for seats in self.capacities.values())
+
+        return {
+            "total_students": total_students,
+            "matched_students": matched,
+            "unmatched_students": total_students - matched,
+            "first_choice_rate": (rank_distribution.get(1, 0) / total_students * 100) if total_students > 0 else 0,
+            "satisfaction_rate": (matched / total_students * 100) if total_students > 0 else 0,
+            "average_rank": sum(r * c for r, c in rank_distribution.items()) / matched if matched > 0 else 0,
+            "rank_distribution": dict(sorted(rank_distribution.items())),
+            "seat_fill_rate": (matched / total_seats * 100) if total_seats > 0 else 0,
+            "universities_filled": sum(1 for code, seats in self.capacities.items() if seats > 0 and filled.get(code, 0) >= seats)
+        }
+
+
+def match_students_to_universities(
+    rankings: Dict[int, List[str]],
+    capacities: Dict[str, int],
+    students: Dict[int, Tuple[Optional[int], Optional[float], Optional[str]]],
+    requirements: Optional[Dict[str, Optional[str]]] = None
+) -> Tuple[Dict[int, Optional[str]], Dict[str, any]]:
+    """
+    Convenience function to run the exchange matching algorithm
+
+    Args:
+        rankings: Dict mapping student_id -> ordered list of university codes
+        capacities: Dict mapping university code -> number of seats
+        students: Dict mapping student_id -> (general_rank, gpa, english_level)
+        requirements: Dict mapping university code -> minimum English level (or None)
+
+    Returns:
+        Tuple of (matching, stats) where:
+            - matching: Dict mapping student_id -> university code (or None)
+            - stats: Dictionary with satisfaction metrics
+    """
+    algorithm = ExchangeMatchingAlgorithm()
+    matching = algorithm.match(rankings, capacities, students, requirements)
+    stats = algorithm.calculate_satisfaction_score(matching)
+
+    return matching, stats
@@ -0,0 +1,150 @@
+"""
+Project Exports (CSV / XLSX)
+
+Exports are produced as a stream, with constant memory whatever the row count:
+1. Each export is one SELECT of plain columns (no ORM objects), read through a
+   server-side cursor in batches of EXPORT_BATCH_SIZE rows
+2. CSV: the header is sent first, then one chunk of text per batch
+3. XLSX: rows go through an openpyxl write-only workbook, which spools them to
+   a temporary file (lxml makes this about twice as fast); the finished file is
+   then sent in chunks (an XLSX file is a zip archive, so no byte of it is
+   final before the last row is written)
+"""
+
+from typing import List, Iterable, Iterator, Tuple
+from enum import Enum
+import csv
+import io
+import tempfile
+
+from openpyxl import Workbook
+from sqlalchemy import Select, select
+from sqlalchemy.orm import aliased
+
+from app.models.assignment import Assignment
+from app.models.form_question import FormQuestion
+from app.models.preference import StudentPreference
+from app.models.student import Student
+from app.models.student_response import StudentResponse
+from app.models.user import User
+
+EXPORT_BATCH_SIZE = 1000
+FILE_CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+STUDENT_COLUMNS = ["student_id", "student_number", "last_name", "first_name", "email", "filiere"]
+
+
+def _student_columns():
+    return [Student.id, Student.student_number, User.last_name, User.first_name, User.email, Student.filiere]
+
+
+def assignment_export(project_id: int) -> Tuple[List[str], Select]:
+    """Assignments of a project, group by group"""
+    columns = ["group_number"] + STUDENT_COLUMNS + ["preference_rank", "satisfaction_score", "is_validated"]
+    query = select(
+        Assignment.group_number,
+        *_student_columns(),
+        Assignment.preference_rank,
+        Assignment.satisfaction_score,
+        Assignment.is_validated
+    ).join(Student, Student.id == Assignment.student_id).join(
+        User, User.id == Student.user_id
+    ).where(
+        Assignment.project_id == project_id
+    ).order_by(Assignment.group_number, Assignment.id)
+    return columns, query
+
+
+def preference_export(project_id: int) -> Tuple[List[str], Select]:
+    """Preference sheet of a project, by rank"""
+    partner = aliased(Student)
+    columns = ["rank"] + STUDENT_COLUMNS + ["preferred_partner_id", "preferred_partner_number", "university_ranking", "updated_at"]
+    query = select(
+        StudentPreference.rank,
+        *_student_columns(),
+        StudentPreference.preferred_partner_id,
+        partner.student_number,
+        StudentPreference.university_ranking,
+        StudentPreference.updated_at
+    ).join(Student, Student.id == StudentPreference.student_id).join(
+        User, User.id == Student.user_id
+    ).outerjoin(
+        partner, partner.id == StudentPreference.preferred_partner_id
+    ).where(
+        StudentPreference.project_id == project_id
+    ).order_by(StudentPreference.rank, StudentPreference.id)
+    return columns, query
+
+
+def response_export(project_id: int) -> Tuple[List[str], Select]:
+    """Form responses of a project, one row per answer, student by student"""
+    columns = STUDENT_COLUMNS + ["question_id", "question_text", "response_text", "response_value", "submitted_at"]
+    query = select(
+        *_student_columns(),
+        FormQuestion.id,
+        FormQuestion.question_text,
+        StudentResponse.response_text,
+        StudentResponse.response_value,
+        StudentResponse.submitted_at
+    ).select_from(StudentResponse).join(
+        FormQuestion, FormQuestion.id == StudentResponse.question_id
+    ).join(Student, Student.id == StudentResponse.student_id).join(
+        User, User.id == Student.user_id
+    ).where(
+        FormQuestion.project_id == project_id
+    ).order_by(StudentResponse.student_id, FormQuestion.order, StudentResponse.id)
+    return columns, query
+
+
+def _cell(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def csv_chunks(columns: List[str], rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    CSV text: the header right away, then one chunk per EXPORT_BATCH_SIZE rows
+
+    Starts with a BOM so that spreadsheet software reads the file as UTF-8.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield "\ufeff" + buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    count = 0
+    for row in rows:
+        writer.writerow([_cell(value) for value in row])
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def xlsx_chunks(columns: List[str], rows: Iterable[tuple], title: str = "Export") -> Iterator[bytes]:
+    """
+    XLSX file, written in write-only mode then sent FILE_CHUNK_SIZE bytes at a time
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(columns)
+    for row in rows:
+        sheet.append([_cell(value) for value in row])
+
+    with tempfile.TemporaryFile() as file:
+        workbook.save(file)
+        file.seek(0)
+        while True:
+            chunk = file.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,103 @@
+"""
+Form Response Writer
+
+Saves a student's form submission in a fixed number of statements, whatever
+the number of questions:
+1. Answers are keyed by question (the last answer to a question wins)
+2. PostgreSQL and SQLite: one INSERT ... ON CONFLICT (student_id, question_id)
+   DO UPDATE ... RETURNING, backed by the unique index on those columns;
+   the returned rows are the saved responses (no refresh per row)
+3. Other databases: the existing responses are loaded with one IN query,
+   updated in place, and the new ones added in the same flush
+
+Questions are checked by the caller (one IN query, see forms.py).
+"""
+
+from typing import List, Dict
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.student_response import StudentResponse
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+RESPONSE_COLUMNS = ("id", "student_id", "question_id", "response_text", "response_value", "submitted_at")
+
+
+def upsert_student_responses(
+    db: Session,
+    student_id: int,
+    answers: List[Dict[str, any]]
+) -> List[Dict[str, any]]:
+    """
+    Insert or update a student's answers
+
+    Args:
+        db: Database session (the caller commits)
+        answers: Dicts with question_id, response_text and response_value
+
+    Returns:
+        Saved responses (RESPONSE_COLUMNS dicts), one per question, in
+        submission order
+    """
+    submitted_at = datetime.utcnow()
+    rows: Dict[int, Dict[str, any]] = {}
+    for answer in answers:
+        rows[answer["question_id"]] = {
+            "student_id": student_id,
+            "question_id": answer["question_id"],
+            "response_text": answer.get("response_text"),
+            "response_value": answer.get("response_value"),
+            "submitted_at": submitted_at
+        }
+    if not rows:
+        return []
+
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        return _merge_responses(db, student_id, rows)
+
+    table = StudentResponse.__table__
+    statement = dialect_insert(table).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.student_id, table.c.question_id],
+        set_={
+            "response_text": statement.excluded.response_text,
+            "response_value": statement.excluded.response_value,
+            "submitted_at": statement.excluded.submitted_at
+        }
+    ).returning(*[table.c[column] for column in RESPONSE_COLUMNS])
+
+    saved = {row["question_id"]: dict(row) for row in db.execute(statement).mappings()}
+    return [saved[question_id] for question_id in rows]
+
+
+def _merge_responses(db: Session, student_id: int, rows: Dict[int, Dict[str, any]]) -> List[Dict[str, any]]:
+    existing = {
+        response.question_id: response
+        for response in db.query(StudentResponse).filter(
+            StudentResponse.student_id == student_id,
+            StudentResponse.question_id.in_(list(rows))
+        )
+    }
+
+    responses = []
+    for question_id, row in rows.items():
+        response = existing.get(question_id)
+        if response is None:
+            response = StudentResponse(**row)
+            db.add(response)
+        else:
+            response.response_text = row["response_text"]
+            response.response_value = row["response_value"]
+            response.submitted_at = row["submitted_at"]
+        responses.append(response)
+    db.flush()
+
+    return [{column: getattr(response, column) for column in RESPONSE_COLUMNS} for response in responses]
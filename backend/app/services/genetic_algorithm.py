@@ -0,0 +1,412 @@
+"""
+Genetic Algorithm for Group Projects
+
+Improves on the greedy GroupFormationAlgorithm by evolving a population of
+groupings:
+1. Chromosome: one int32 group label per student (compact NumPy array)
+2. Fitness: satisfied partner preferences + mutual matches, i.e. the metrics
+   of calculate_satisfaction_score, computed for the whole population at once
+3. Selection by tournament, group crossover whose repair places displaced
+   students next to their partner when there is room, and elitism
+4. Mutation: a few preference-guided swaps, each scored with the incremental
+   delta of the local search (only the two groups involved are looked at) and
+   kept when it does not lower the number of satisfied students
+
+Group sizes are fixed by partition_group_sizes and every operator preserves
+them, so any chromosome is a valid grouping. The greedy result is part of the
+initial population, so the GA never returns a worse grouping than the greedy
+pass. Fitness is evaluated in-process by default (a process pool only pays off
+for very large populations), and the run stops after a fixed number of
+generations or when the time budget is spent.
+"""
+
+from typing import Callable, List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+import random
+import time
+
+import numpy as np
+
+from app.services.group_algorithm import GroupFormationAlgorithm, partition_group_sizes
+
+# Per-process copy of the preference arrays, set once by the pool initializer
+_worker_state: Dict[str, np.ndarray] = {}
+
+
+def population_fitness(
+    population: np.ndarray,
+    partner_index: np.ndarray,
+    has_partner: np.ndarray,
+    is_mutual: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorised fitness of a (population_size x num_students) label matrix
+
+    Fitness = satisfied students + 0.5 * mutual matches, the same quantities
+    reported by calculate_satisfaction_score.
+    """
+    satisfied = (population[:, partner_index] == population) & has_partner
+    satisfied_count = satisfied.sum(axis=1)
+    mutual_count = (satisfied & is_mutual).sum(axis=1) // 2
+    return satisfied_count + 0.5 * mutual_count
+
+
+def _init_worker(partner_index: np.ndarray, has_partner: np.ndarray, is_mutual: np.ndarray):
+    _worker_state["partner_index"] = partner_index
+    _worker_state["has_partner"] = has_partner
+    _worker_state["is_mutual"] = is_mutual
+
+
+def _evaluate_chunk(population: np.ndarray) -> np.ndarray:
+    return population_fitness(
+        population,
+        _worker_state["partner_index"],
+        _worker_state["has_partner"],
+        _worker_state["is_mutual"]
+    )
+
+
+class GeneticGroupAlgorithm:
+    """
+    Genetic algorithm to form groups for group projects
+    """
+
+    def __init__(
+        self,
+        group_size: int = 3,
+        population_size: int = 10,
+        generations: int = 200,
+        time_budget_s: Optional[float] = 10.0,
+        mutation_swaps: Optional[int] = None,
+        elite_count: int = 2,
+        seed: Optional[int] = None,
+        workers: int = 1,
+        should_stop: Optional[Callable[[], bool]] = None
+    ):
+        self.group_size = group_size
+        self.population_size = max(2, population_size)
+        self.generations = generations
+        self.time_budget_s = time_budget_s
+        self.mutation_swaps = mutation_swaps
+        self.elite_count = max(1, min(elite_count, self.population_size - 1))
+        self.seed = seed
+        self.workers = max(1, workers)
+        self.should_stop = should_stop
+        self.rng = np.random.default_rng(seed)
+        self.py_rng = random.Random(seed)
+        self.generations_run = 0
+        self.best_fitness = 0.0
+
+    def form_groups(
+        self,
+        student_ids: List[int],
+        preferences: Dict[int, Optional[int]]
+    ) -> List[List[int]]:
+        """
+        Main algorithm to form groups
+
+        Args:
+            student_ids: List of all student IDs to assign
+            preferences: Dict mapping student_id -> preferred_partner_id (or None)
+
+        Returns:
+            List of groups, where each group is a list of student IDs
+        """
+        started = time.monotonic()
+        student_ids = list(dict.fromkeys(student_ids))
+        n = len(student_ids)
+        if n == 0:
+            return []
+
+        self._prepare(student_ids, preferences)
+        # Swap proposals per child: about one for 25 students by default
+        self.swaps_per_child = max(1, self.mutation_swaps or max(8, n // 25))
+        population = self._initial_population(student_ids, preferences)
+
+        executor = None
+        if self.workers > 1 and self.population_size > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.partner_index, self.has_partner, self.is_mutual)
+            )
+
+        try:
+            fitness = self._evaluate(population, executor)
+            self.generations_run = 0
+
+            for _ in range(self.generations):
+                if self.time_budget_s is not None and time.monotonic() - started >= self.time_budget_s:
+                    break
+                if self.should_stop is not None and self.should_stop():
+                    break
+
+                # Elitism: the best individuals survive unchanged
+                elite = np.argsort(fitness)[::-1][:self.elite_count]
+                offspring_count = self.population_size - self.elite_count
+
+                first = self._tournament(fitness, offspring_count)
+                second = self._tournament(fitness, offspring_count)
+                offspring = self._crossover(population[first], population[second])
+                self._mutate(offspring)
+
+                offspring_fitness = self._evaluate(offspring, executor)
+                population = np.concatenate([population[elite], offspring])
+                fitness = np.concatenate([fitness[elite], offspring_fitness])
+                self.generations_run += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        best = int(np.argmax(fitness))
+        self.best_fitness = float(fitness[best])
+        return self._decode(population[best], student_ids)
+
+    def _prepare(self, student_ids: List[int], preferences: Dict[int, Optional[int]]):
+        """
+        Build the index arrays used by the vectorised operators
+        """
+        n = len(student_ids)
+        position = {student_id: i for i, student_id in enumerate(student_ids)}
+
+        partner_index = np.arange(n, dtype=np.int32)
+        has_partner = np.zeros(n, dtype=bool)
+        for i, student_id in enumerate(student_ids):
+            partner = position.get(preferences.get(student_id))
+            if partner is not None and partner != i:
+                partner_index[i] = partner
+                has_partner[i] = True
+
+        self.partner_index = partner_index
+        self.has_partner = has_partner
+        self.is_mutual = has_partner & (partner_index[partner_index] == np.arange(n))
+
+        # Plain lists for the per-swap operators: partner (or -1), and who chose each student
+        self.partner = np.where(has_partner, partner_index, -1).tolist()
+        self.choosers_of: List[List[int]] = [[] for _ in range(n)]
+        for i in np.flatnonzero(has_partner).tolist():
+            self.choosers_of[self.partner[i]].append(i)
+
+        # Sizes are fixed: sorting any chromosome by label always yields these slices
+        self.capacities = np.array(partition_group_sizes(n, self.group_size), dtype=np.int32)
+        self.group_starts = np.concatenate([[0], np.cumsum(self.capacities)[:-1]]).astype(np.int64)
+        self.group_start_list = self.group_starts.tolist()
+        self.capacity_list = self.capacities.tolist()
+        self.base_labels = np.repeat(np.arange(len(self.capacities), dtype=np.int32), self.capacities)
+
+    def _initial_population(
+        self,
+        student_ids: List[int],
+        preferences: Dict[int, Optional[int]]
+    ) -> np.ndarray:
+        """
+        Seed the population with the greedy grouping and mutated copies of it
+        """
+        greedy = GroupFormationAlgorithm(group_size=self.group_size, rng=random.Random(self.seed))
+        groups = greedy.form_groups(student_ids, preferences)
+
+        position = {student_id: i for i, student_id in enumerate(student_ids)}
+        seeded = np.empty(len(student_ids), dtype=np.int32)
+        # Both engines use the same partition, so groups map onto labels by size
+        order = sorted(range(len(groups)), key=lambda g: -len(groups[g]))
+        for label, g in enumerate(order):
+            seeded[[position[s] for s in groups[g]]] = label
+
+        population = np.tile(seeded, (self.population_size, 1))
+        self._mutate(population[1:])
+        return population
+
+    def _evaluate(self, population: np.ndarray, executor: Optional[ProcessPoolExecutor]) -> np.ndarray:
+        if executor is None or len(population) < 2:
+            return population_fitness(population, self.partner_index, self.has_partner, self.is_mutual)
+
+        chunks = np.array_split(population, min(self.workers, len(population)))
+        return np.concatenate(list(executor.map(_evaluate_chunk, chunks)))
+
+    def _tournament(self, fitness: np.ndarray, count: int) -> np.ndarray:
+        """
+        Binary tournament selection
+        """
+        a = self.rng.integers(0, len(fitness), count)
+        b = self.rng.integers(0, len(fitness), count)
+        return np.where(fitness[a] >= fitness[b], a, b)
+
+    def _crossover(self, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """
+        Group-based crossover, then repair group sizes
+
+        Each child keeps a random half of the first parent's groups intact and
+        takes the second parent's labels for everybody else. Students in overfull
+        groups (those inherited from the second parent first) are then moved to
+        a group with room: their partner's group, else the group of a student
+        who chose them, else any free seat.
+        """
+        count, n = first.shape
+        num_groups = len(self.capacities)
+        children = np.empty_like(first)
+
+        for i in range(count):
+            kept_groups = self.rng.random(num_groups) < 0.5
+            from_first = kept_groups[first[i]]
+            child = np.where(from_first, first[i], second[i])
+
+            counts = np.bincount(child, minlength=num_groups)
+            if not np.array_equal(counts, self.capacities):
+                # Rank students inside their group: first parent, then random order
+                order = np.lexsort((self.rng.random(n), ~from_first, child))
+                starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+                rank_in_group = np.empty(n, dtype=np.int64)
+                rank_in_group[order] = np.arange(n) - np.repeat(starts, counts)
+
+                excess = self.rng.permutation(np.flatnonzero(rank_in_group >= self.capacities[child]))
+                self._place_excess(child, excess, np.maximum(self.capacities - counts, 0))
+
+            children[i] = child
+
+        return children
+
+    def _place_excess(self, child: np.ndarray, excess: np.ndarray, free: np.ndarray):
+        """
+        Give each displaced student a seat in a group with room, next to a
+        student they share a preference with when possible
+        """
+        labels = child.tolist()
+        free_seats = free.tolist()
+        unplaced = []
+
+        for i in excess.tolist():
+            p = self.partner[i]
+            if p >= 0 and free_seats[labels[p]] > 0:
+                target = labels[p]
+            else:
+                target = next((labels[c] for c in self.choosers_of[i] if free_seats[labels[c]] > 0), -1)
+            if target < 0:
+                unplaced.append(i)
+                continue
+            labels[i] = target
+            free_seats[target] -= 1
+
+        child[excess] = [labels[i] for i in excess.tolist()]
+        if unplaced:
+            seats = np.repeat(np.arange(len(free_seats), dtype=child.dtype), free_seats)
+            child[unplaced] = self.rng.permutation(seats)
+
+    def _mutate(self, offspring: np.ndarray):
+        """
+        Guided swap mutations, which always keep group sizes intact
+
+        Each child gets swaps_per_child proposals: an unsatisfied student trades
+        places with a member of their preferred partner's group. A proposal is
+        kept when it does not lower the number of satisfied students (see
+        _swap_delta), so neutral swaps still move children across plateaus.
+        """
+        rng = self.py_rng
+        partner = self.partner
+        starts, capacities = self.group_start_list, self.capacity_list
+
+        for row in offspring:
+            unsatisfied = np.flatnonzero(self.has_partner & (row[self.partner_index] != row)).tolist()
+            if not unsatisfied:
+                continue
+            labels = row.tolist()
+            # Students sorted by label: group g holds members[starts[g]:starts[g] + capacities[g]]
+            members = np.argsort(row, kind="stable").tolist()
+
+            for _ in range(self.swaps_per_child):
+                a = unsatisfied[rng.randrange(len(unsatisfied))]
+                group_a, group_b = labels[a], labels[partner[a]]
+                if group_a == group_b:
+                    continue
+                slot_b = starts[group_b] + rng.randrange(capacities[group_b])
+                b = members[slot_b]
+                if b == partner[a] or self._swap_delta(labels, a, b) < 0:
+                    continue
+
+                slot_a = members.index(a, starts[group_a], starts[group_a] + capacities[group_a])
+                members[slot_a], members[slot_b] = b, a
+                labels[a], labels[b] = group_b, group_a
+
+            row[:] = labels
+
+    def _swap_delta(self, labels: List[int], a: int, b: int) -> int:
+        """
+        Change in satisfied students if a and b trade groups
+
+        The terms of GroupLocalSearch._delta: the choices of a and b themselves,
+        then the students who chose a or b, found through the inverse
+        preference index, so the cost only depends on how popular they are.
+        """
+        partner = self.partner
+        group_a, group_b = labels[a], labels[b]
+        moved = {a: group_b, b: group_a}
+        delta = 0
+
+        for i, new_group in ((a, group_b), (b, group_a)):
+            p = partner[i]
+            if p >= 0:
+                delta += (moved.get(p, labels[p]) == new_group) - (labels[p] == labels[i])
+
+        for i, old_group, new_group, other in ((a, group_a, group_b, b), (b, group_b, group_a, a)):
+            for chooser in self.choosers_of[i]:
+                if chooser != other:
+                    delta += (labels[chooser] == new_group) - (labels[chooser] == old_group)
+
+        return delta
+
+    def _decode(self, labels: np.ndarray, student_ids: List[int]) -> List[List[int]]:
+        ids = np.asarray(student_ids)
+        order = np.argsort(labels, kind="stable")
+        groups = np.split(ids[order], np.cumsum(self.capacities)[:-1])
+        return [sorted(int(s) for s in group) for group in groups]
+
+
+def evolve_groups(
+    student_ids: List[int],
+    preferences: Dict[int, Optional[int]],
+    group_size: int = 3,
+    generations: int = 200,
+    population_size: int = 10,
+    time_budget_s: Optional[float] = 10.0,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[List[List[int]], Dict[str, any]]:
+    """
+    Convenience function to run the genetic algorithm
+
+    Args:
+        student_ids: List of student IDs to assign
+        preferences: Dict mapping student_id -> preferred_partner_id
+        group_size: Desired size for each group (default 3)
+        generations: Maximum number of generations
+        population_size: Number of groupings per generation
+        time_budget_s: Wall-clock limit in seconds (None for no limit)
+        seed: Seed for reproducible runs
+        workers: Processes used for fitness evaluation (default 1: in-process,
+            a pool costs more than it saves at usual population sizes)
+        should_stop: Checked every generation; when it answers True the best
+            grouping so far is returned
+
+    Returns:
+        Tuple of (groups, stats) where:
+            - groups: List of groups (each group is a list of student IDs)
+            - stats: Dictionary with satisfaction metrics and GA run details
+    """
+    algorithm = GeneticGroupAlgorithm(
+        group_size=group_size,
+        population_size=population_size,
+        generations=generations,
+        time_budget_s=time_budget_s,
+        seed=seed,
+        workers=workers,
+        should_stop=should_stop
+    )
+    groups = algorithm.form_groups(student_ids, preferences)
+
+    scorer = GroupFormationAlgorithm(group_size=group_size)
+    scorer.preferences = preferences
+    stats = scorer.calculate_satisfaction_score(groups)
+    stats["generations_run"] = algorithm.generations_run
+    stats["fitness"] = algorithm.best_fitness
+
+    return groups, stats
@@ -2,15 +2,52 @@
 Group Formation Algorithm for Group Projects
 
 This algorithm assigns students to groups based on:
-1. Partner preferences (mutual matching prioritized)
+1. Partner preferences, read as a graph (cycles and chains of choices kept together)
 2. Group size constraints
 3. Random assignment for unmatched students
+
+Group sizes are fixed up front by arithmetic partitioning: with n students and
+a target size k, ceil(n / k) groups are created and the n seats are spread as
+evenly as possible, so every group has k-1 or k members whenever n allows it
+(and sizes never differ by more than one otherwise).
+
+Each student chooses at most one partner, so the preferences form a functional
+graph: every component is a cycle (A -> B -> C -> A, or a mutual pair) or a
+student without a choice, with in-trees of students pointing at it. Components
+that fit in a group are packed whole; larger ones are cut along their chains.
+
+The engine keeps a student -> group index and buckets of groups by free seats,
+so every placement is O(1) and a full run is linear in the number of students
+(plus the shuffle of the unmatched ones).
+
+All randomness goes through a seeded random.Random, so a run is reproducible
+from its seed. Several restarts with different seeds can be run in parallel
+over a process pool, keeping the best grouping and the seed that produced it.
 """
 
-from typing import List, Dict, Set, Tuple, Optional
-from datetime import datetime
+from typing import Callable, List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+import os
 import random
-from collections import defaultdict
+
+from app.services.local_search import optimise_groups
+
+# Per-process copy of the restart inputs, set once by the pool initializer
+_worker_state: Dict[str, any] = {}
+
+
+def partition_group_sizes(n: int, group_size: int) -> List[int]:
+    """
+    Split n seats into ceil(n / group_size) groups whose sizes differ by at most one
+    
+    Larger groups come first so that they are seeded first.
+    """
+    if n == 0:
+        return []
+    
+    num_groups = -(-n // group_size)
+    base, extra = divmod(n, num_groups)
+    return [base + 1] * extra + [base] * (num_groups - extra)
 
 
 class GroupFormationAlgorithm:
@@ -18,10 +55,14 @@ class GroupFormationAlgorithm:
     Algorithm to form groups for group projects
     """
     
-    def __init__(self, group_size: int = 3):
+    def __init__(self, group_size: int = 3, rng: Optional[random.Random] = None):
+        if group_size < 1:
+            raise ValueError("group_size must be at least 1")
         self.group_size = group_size
-        self.groups: List[Set[int]] = []
-        self.assigned_students: Set[int] = set()
+        self.rng = rng or random.Random()
+        self.groups: List[List[int]] = []
+        self.capacities: List[int] = []
+        self.student_group: Dict[int, int] = {}
         self.preferences: Dict[int, Optional[int]] = {}
         
     def form_groups(
@@ -39,168 +80,195 @@ class GroupFormationAlgorithm:
         Returns:
             List of groups, where each group is a list of student IDs
         """
-        self.preferences = preferences
-        self.groups = []
-        self.assigned_students = set()
+        # Deduplicate while keeping the caller's order
+        student_ids = list(dict.fromkeys(student_ids))
         
-        # Step 1: Find mutual preferences and create pairs
-        mutual_pairs = self._find_mutual_preferences(student_ids)
+        self.preferences = preferences
+        self.student_group = {}
         
-        # Step 2: Create groups from mutual pairs
-        for pair in mutual_pairs:
-            self._create_group_from_pair(pair, student_ids)
+        # Step 1: Fix the number of groups and their sizes
+        self.capacities = partition_group_sizes(len(student_ids), self.group_size)
+        self.groups = [[] for _ in self.capacities]
         
-        # Step 3: Handle one-sided preferences
-        self._handle_onesided_preferences(student_ids)
+        # Step 2: Pack the preference graph (cycles and chains of choices)
+        self._build_preference_graph(student_ids)
+        self._pack_components()
         
-        # Step 4: Assign remaining students randomly
+        # Step 3: Assign remaining students randomly
         self._assign_remaining_students(student_ids)
         
-        # Step 5: Balance group sizes
-        self._balance_groups()
+        # Sort members for consistent output
+        return [sorted(group) for group in self.groups if group]
+    
+    def _free_seats(self, group_index: int) -> int:
+        return self.capacities[group_index] - len(self.groups[group_index])
+    
+    def _add_to_group(self, student_id: int, group_index: int):
+        self.groups[group_index].append(student_id)
+        self.student_group[student_id] = group_index
+        # Lazy bucket update: older entries for this group become stale
+        self._by_free_seats[self._free_seats(group_index)].append(group_index)
+    
+    def _take_group(self, seats: int, best_fit: bool) -> Optional[int]:
+        """
+        Pop a group with at least `seats` free seats from the free-seat buckets
         
-        # Convert sets to sorted lists for consistent output
-        return [sorted(list(group)) for group in self.groups]
+        best_fit picks the tightest such group (to pack whole components),
+        otherwise the emptiest one (to open room for a chain).
+        """
+        buckets = range(seats, len(self._by_free_seats))
+        for free in (buckets if best_fit else reversed(buckets)):
+            bucket = self._by_free_seats[free]
+            while bucket:
+                group_index = bucket.pop()
+                if self._free_seats(group_index) == free:
+                    return group_index
+        return None
     
-    def _find_mutual_preferences(self, student_ids: List[int]) -> List[Tuple[int, int]]:
+    def _build_preference_graph(self, student_ids: List[int]):
         """
-        Find pairs of students who mutually selected each other
+        Read preferred_partner_id as a functional graph (one outgoing edge per student)
         
-        Returns:
-            List of tuples (student1_id, student2_id)
+        Every weakly connected component holds at most one cycle (or one student
+        without a usable choice) with in-trees hanging from it. Components are
+        found with union-find, cycles with an iterative three-colour walk, and each
+        component is laid out root first so that every student comes after the
+        partner they chose.
         """
-        mutual_pairs = []
-        checked = set()
+        n = len(student_ids)
+        index = {student_id: i for i, student_id in enumerate(student_ids)}
+        self._ids = student_ids
         
-        for student_id in student_ids:
-            if student_id in checked:
+        partner = [-1] * n
+        children: List[List[int]] = [[] for _ in range(n)]
+        for i, student_id in enumerate(student_ids):
+            p = index.get(self.preferences.get(student_id))
+            if p is not None and p != i:
+                partner[i] = p
+                children[p].append(i)
+        self._partner = partner
+        self._children = children
+        
+        # Union-find with path halving and union by size
+        parent = list(range(n))
+        size = [1] * n
+        
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        
+        for i, p in enumerate(partner):
+            if p < 0:
                 continue
-                
-            preferred = self.preferences.get(student_id)
-            if not preferred or preferred not in student_ids:
+            a, b = find(i), find(p)
+            if a != b:
+                if size[a] < size[b]:
+                    a, b = b, a
+                parent[b] = a
+                size[a] += size[b]
+        
+        # Colouring walk: 0 = unvisited, 1 = on the current walk, 2 = done
+        colour = [0] * n
+        roots: Dict[int, List[int]] = {}
+        for start in range(n):
+            if colour[start]:
                 continue
+            walk = []
+            node = start
+            while node >= 0 and colour[node] == 0:
+                colour[node] = 1
+                walk.append(node)
+                node = partner[node]
+            
+            if node < 0:
+                # The walk ended at a student without a usable choice
+                roots[find(walk[-1])] = [walk[-1]]
+            elif colour[node] == 1:
+                # New cycle c0 -> c1 -> ... -> c0: lay out c0, then back along the cycle
+                cycle = walk[walk.index(node):]
+                roots[find(node)] = [cycle[0]] + cycle[:0:-1]
             
-            # Check if preference is mutual
-            reverse_pref = self.preferences.get(preferred)
-            if reverse_pref == student_id:
-                mutual_pairs.append((student_id, preferred))
-                checked.add(student_id)
-                checked.add(preferred)
+            for visited in walk:
+                colour[visited] = 2
         
-        return mutual_pairs
+        # Component layouts: root (or cycle) first, then the in-trees breadth first
+        placed = [False] * n
+        self._components: List[List[int]] = []
+        for component_roots in roots.values():
+            order = list(component_roots)
+            for node in order:
+                placed[node] = True
+            for node in order:
+                for child in children[node]:
+                    if not placed[child]:
+                        placed[child] = True
+                        order.append(child)
+            self._components.append(order)
     
-    def _create_group_from_pair(self, pair: Tuple[int, int], student_ids: List[int]):
-        """
-        Create a group starting from a mutual pair
-        Fill remaining slots with available students
+    def _pack_components(self):
         """
-        group = set(pair)
-        self.assigned_students.update(pair)
+        Place preference components into groups before the random fill
         
-        # Fill remaining slots (group_size - 2)
-        available = [s for s in student_ids 
-                    if s not in self.assigned_students]
+        Components larger than a group are cut along their layout: each student
+        joins the group of the partner they chose while it has room, and a
+        student who still has followers opens a new group otherwise. Smaller
+        components are then packed whole, largest first, into the tightest group
+        that fits them. Ties in the order are broken by the seeded RNG.
+        """
+        self._by_free_seats: List[List[int]] = [[] for _ in range(max(self.capacities, default=0) + 1)]
+        for group_index in reversed(range(len(self.groups))):
+            self._by_free_seats[self._free_seats(group_index)].append(group_index)
         
-        needed = self.group_size - len(group)
-        if available and needed > 0:
-            additions = random.sample(available, min(needed, len(available)))
-            group.update(additions)
-            self.assigned_students.update(additions)
+        largest = max(self.capacities, default=0)
+        components = list(self._components)
+        self.rng.shuffle(components)
+        components.sort(key=len, reverse=True)
         
-        self.groups.append(group)
+        for order in components:
+            if len(order) <= largest:
+                group_index = self._take_group(len(order), best_fit=True)
+                if group_index is not None:
+                    for node in order:
+                        self._add_to_group(self._ids[node], group_index)
+                    continue
+            self._place_chain(order)
     
-    def _handle_onesided_preferences(self, student_ids: List[int]):
+    def _place_chain(self, order: List[int]):
         """
-        Handle students who have preferences but weren't matched mutually
-        Try to honor their preference by adding them to their preferred partner's group
+        Place a component student by student, following the chosen partners
         """
-        unassigned = [s for s in student_ids if s not in self.assigned_students]
-        
-        for student_id in unassigned[:]:  # Copy list to modify during iteration
-            preferred = self.preferences.get(student_id)
+        for position, node in enumerate(order):
+            student_id = self._ids[node]
+            partner = self._partner[node]
+            group_index = self.student_group.get(self._ids[partner]) if partner >= 0 else None
             
-            if not preferred or preferred not in self.assigned_students:
-                continue
+            if group_index is None or self._free_seats(group_index) == 0:
+                # Only worth a new group for the first student or one with followers
+                if position > 0 and not self._children[node]:
+                    continue
+                group_index = self._take_group(1, best_fit=False)
+                if group_index is None:
+                    continue
             
-            # Find the group containing the preferred partner
-            for group in self.groups:
-                if preferred in group and len(group) < self.group_size:
-                    group.add(student_id)
-                    self.assigned_students.add(student_id)
-                    break
+            self._add_to_group(student_id, group_index)
     
     def _assign_remaining_students(self, student_ids: List[int]):
         """
         Assign all remaining unassigned students
-        """
-        unassigned = [s for s in student_ids if s not in self.assigned_students]
-        random.shuffle(unassigned)
         
-        for student_id in unassigned:
-            # Try to add to existing incomplete group
-            added = False
-            for group in self.groups:
-                if len(group) < self.group_size:
-                    group.add(student_id)
-                    self.assigned_students.add(student_id)
-                    added = True
-                    break
-            
-            # If no incomplete group, create new group
-            if not added:
-                new_group = {student_id}
-                self.assigned_students.add(student_id)
-                self.groups.append(new_group)
-    
-    def _balance_groups(self):
-        """
-        Balance group sizes - move students from oversized groups to undersized ones
+        Incomplete groups are consumed in order through a single cursor; since
+        the total capacity equals the number of students, every student finds a seat.
         """
-        if not self.groups:
-            return
+        unassigned = [s for s in student_ids if s not in self.student_group]
+        self.rng.shuffle(unassigned)
         
-        # Find groups that are too small or too large
-        small_groups = [g for g in self.groups if len(g) < self.group_size - 1]
-        large_groups = [g for g in self.groups if len(g) > self.group_size]
-        
-        # Move students from large to small groups
-        for large_group in large_groups:
-            while len(large_group) > self.group_size and small_groups:
-                # Get smallest group
-                small_group = min(small_groups, key=len)
-                
-                # Move a random student from large to small
-                student_to_move = random.choice(list(large_group))
-                large_group.remove(student_to_move)
-                small_group.add(student_to_move)
-                
-                # Update small_groups list if group is now full
-                if len(small_group) >= self.group_size - 1:
-                    small_groups.remove(small_group)
-        
-        # Merge very small groups if necessary
-        self._merge_small_groups()
-    
-    def _merge_small_groups(self):
-        """
-        Merge groups that are too small (size 1) with other groups
-        """
-        tiny_groups = [g for g in self.groups if len(g) == 1]
-        
-        for tiny_group in tiny_groups:
-            # Find smallest non-tiny group to merge with
-            other_groups = [g for g in self.groups 
-                           if g != tiny_group and len(g) < self.group_size]
-            
-            if other_groups:
-                target_group = min(other_groups, key=len)
-                target_group.update(tiny_group)
-                self.groups.remove(tiny_group)
-            elif len(self.groups) > 1:
-                # If no undersized groups, merge with smallest group
-                target_group = min([g for g in self.groups if g != tiny_group], key=len)
-                target_group.update(tiny_group)
-                self.groups.remove(tiny_group)
+        cursor = 0
+        for student_id in unassigned:
+            while self._free_seats(cursor) == 0:
+                cursor += 1
+            self._add_to_group(student_id, cursor)
     
     def calculate_satisfaction_score(self, groups: List[List[int]]) -> Dict[str, any]:
         """
@@ -209,22 +277,26 @@ class GroupFormationAlgorithm:
         Returns:
             Dict with satisfaction statistics
         """
-        total_students = sum(len(group) for group in groups)
+        group_of = {
+            student_id: group_index
+            for group_index, group in enumerate(groups)
+            for student_id in group
+        }
+        total_students = len(group_of)
         satisfied_count = 0
         mutual_matched = 0
         
-        for group in groups:
-            for student_id in group:
-                preferred = self.preferences.get(student_id)
+        for student_id, group_index in group_of.items():
+            preferred = self.preferences.get(student_id)
+            
+            # Student is satisfied if their preference is in their group
+            if preferred and group_of.get(preferred) == group_index:
+                satisfied_count += 1
                 
-                # Student is satisfied if their preference is in their group
-                if preferred and preferred in group:
-                    satisfied_count += 1
-                    
-                    # Check if mutual
-                    reverse_pref = self.preferences.get(preferred)
-                    if reverse_pref == student_id:
-                        mutual_matched += 1
+                # Check if mutual
+                reverse_pref = self.preferences.get(preferred)
+                if reverse_pref == student_id:
+                    mutual_matched += 1
         
         # Divide by 2 since mutual matches are counted twice
         mutual_matched = mutual_matched // 2
@@ -239,10 +311,59 @@ class GroupFormationAlgorithm:
         }
 
 
+def _run_once(
+    student_ids: List[int],
+    preferences: Dict[int, Optional[int]],
+    group_size: int,
+    time_budget_ms: Optional[int],
+    seed: Optional[int],
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[List[List[int]], Dict[str, any]]:
+    """
+    One greedy pass (plus the optional local search) driven by a single seeded RNG
+    """
+    rng = random.Random(seed)
+    algorithm = GroupFormationAlgorithm(group_size=group_size, rng=rng)
+    groups = algorithm.form_groups(student_ids, preferences)
+    
+    details = {}
+    if time_budget_ms:
+        groups, details = optimise_groups(groups, preferences, group_size, time_budget_ms, rng, should_stop)
+    
+    stats = algorithm.calculate_satisfaction_score(groups)
+    stats.update(details)
+    stats["seed"] = seed
+    
+    return groups, stats
+
+
+def _init_worker(
+    student_ids: List[int],
+    preferences: Dict[int, Optional[int]],
+    group_size: int,
+    time_budget_ms: Optional[int]
+):
+    _worker_state["args"] = (student_ids, preferences, group_size, time_budget_ms)
+
+
+def _run_restart(seed: int) -> Tuple[List[List[int]], Dict[str, any]]:
+    return _run_once(*_worker_state["args"], seed)
+
+
+def _restart_key(result: Tuple[List[List[int]], Dict[str, any]]) -> Tuple[int, int]:
+    _, stats = result
+    return stats["satisfied_students"], stats["mutual_matches"]
+
+
 def assign_students_to_groups(
     student_ids: List[int],
     preferences: Dict[int, Optional[int]],
-    group_size: int = 3
+    group_size: int = 3,
+    time_budget_ms: Optional[int] = None,
+    seed: Optional[int] = None,
+    restarts: int = 1,
+    workers: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None
 ) -> Tuple[List[List[int]], Dict[str, any]]:
     """
     Convenience function to run the group formation algorithm
@@ -251,14 +372,44 @@ def assign_students_to_groups(
         student_ids: List of student IDs to assign
         preferences: Dict mapping student_id -> preferred_partner_id
         group_size: Desired size for each group (default 3)
+        time_budget_ms: If set, improve the greedy groups with the local search
+            post-optimiser for this many milliseconds (per restart)
+        seed: Seed for reproducible runs (drawn at random when None); with
+            restarts, the seed of each restart is drawn from it
+        restarts: Number of independent runs; the best grouping is kept
+        workers: Processes used for restarts (default: CPU count)
+        should_stop: Checked by the local search (in-process runs only); when
+            it answers True the best grouping found so far is returned
     
     Returns:
         Tuple of (groups, stats) where:
             - groups: List of groups (each group is a list of student IDs)
-            - stats: Dictionary with satisfaction metrics
+            - stats: Dictionary with satisfaction metrics, including the seed
+              of the returned grouping (passing it back as seed, with
+              restarts=1, replays that grouping)
     """
-    algorithm = GroupFormationAlgorithm(group_size=group_size)
-    groups = algorithm.form_groups(student_ids, preferences)
-    stats = algorithm.calculate_satisfaction_score(groups)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    
+    if restarts <= 1:
+        return _run_once(student_ids, preferences, group_size, time_budget_ms, seed, should_stop)
+    
+    seed_source = random.Random(seed)
+    seeds = [seed_source.getrandbits(32) for _ in range(restarts)]
+    workers = min(workers if workers is not None else (os.cpu_count() or 1), restarts)
+    
+    if workers <= 1:
+        results = [_run_once(student_ids, preferences, group_size, time_budget_ms, s, should_stop) for s in seeds]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(student_ids, preferences, group_size, time_budget_ms)
+        ) as executor:
+            results = list(executor.map(_run_restart, seeds))
+    
+    # Ties go to the earliest restart so that a seed always gives the same answer
+    groups, stats = max(results, key=_restart_key)
+    stats["restarts"] = restarts
     
     return groups, stats
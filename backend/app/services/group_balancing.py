@@ -0,0 +1,199 @@
+"""
+Multi-objective Group Balancing
+
+Scores a grouping on several objectives, weighted against each other:
+1. partner:  share of partner preferences satisfied (as in calculate_satisfaction_score)
+2. filiere:  filière diversity inside groups (distinct filières / possible ones)
+3. gpa:      GPA balance across groups (group mean GPAs close to each other)
+4. english:  English-level balance across groups (mean CEFR level per group)
+
+Every objective is in [0, 1] and the score is their weighted average. Students
+are stored as a student x feature matrix and a grouping as one label per
+student, so a full evaluation is a handful of NumPy bincounts: a few
+milliseconds for 20k students. This makes the objective cheap enough for the
+improvement loop (batches of swaps, kept only when the score goes up).
+"""
+
+from typing import Callable, List, Dict, Tuple, Optional
+import time
+
+import numpy as np
+
+from app.services.english_leveling import LEVEL_INDEX
+
+OBJECTIVES = ("partner", "filiere", "gpa", "english")
+DEFAULT_WEIGHTS = {"partner": 1.0, "filiere": 0.0, "gpa": 0.0, "english": 0.0}
+
+
+class GroupBalanceObjective:
+    """
+    Vectorised weighted objective over a student x feature matrix
+    """
+
+    def __init__(
+        self,
+        student_ids: List[int],
+        preferences: Dict[int, Optional[int]],
+        students: Dict[int, Tuple[Optional[str], Optional[float], Optional[str]]],
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            student_ids: Students to group (the label order)
+            preferences: Dict mapping student_id -> preferred_partner_id (or None)
+            students: Dict mapping student_id -> (filiere, gpa, english_level)
+            weights: Dict mapping objective name -> weight (see OBJECTIVES)
+        """
+        self.student_ids = list(student_ids)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        n = len(self.student_ids)
+        position = {student_id: i for i, student_id in enumerate(self.student_ids)}
+
+        partner_index = np.arange(n)
+        has_partner = np.zeros(n, dtype=bool)
+        for i, student_id in enumerate(self.student_ids):
+            p = position.get(preferences.get(student_id))
+            if p is not None and p != i:
+                partner_index[i] = p
+                has_partner[i] = True
+        self.partner_index = partner_index
+        self.has_partner = has_partner
+
+        # Feature matrix: filière code, GPA, English level index
+        filieres: Dict[str, int] = {}
+        features = np.empty((n, 3), dtype=np.float64)
+        for i, student_id in enumerate(self.student_ids):
+            filiere, gpa, level = students.get(student_id, (None, None, None))
+            filiere = getattr(filiere, "value", filiere)
+            level = getattr(level, "value", level)
+            features[i, 0] = filieres.setdefault(filiere, len(filieres))
+            features[i, 1] = gpa if gpa is not None else np.nan
+            features[i, 2] = LEVEL_INDEX.get(level, LEVEL_INDEX["B1"])
+
+        # Missing GPAs count as the cohort mean
+        gpa_column = features[:, 1]
+        mean_gpa = np.nanmean(gpa_column) if np.isfinite(gpa_column).any() else 0.0
+        gpa_column[np.isnan(gpa_column)] = mean_gpa
+
+        self.features = features
+        self.filiere = features[:, 0].astype(np.int64)
+        self.num_filieres = max(1, len(filieres))
+
+    def evaluate(self, labels: np.ndarray) -> Dict[str, float]:
+        """
+        Score one grouping given as a group label per student
+
+        Returns:
+            Dict with one score per objective and the weighted "total"
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        num_groups = int(labels.max()) + 1 if len(labels) else 0
+        sizes = np.bincount(labels, minlength=num_groups)
+        scores = {}
+
+        partners = self.has_partner.sum()
+        satisfied = (labels[self.partner_index] == labels) & self.has_partner
+        scores["partner"] = float(satisfied.sum() / partners) if partners else 1.0
+
+        # Distinct filières per group, against the most a group of that size could have
+        counts = np.bincount(labels * self.num_filieres + self.filiere, minlength=num_groups * self.num_filieres)
+        distinct = (counts.reshape(num_groups, self.num_filieres) > 0).sum(axis=1)
+        possible = np.minimum(sizes, self.num_filieres)
+        used = sizes > 0
+        scores["filiere"] = float((distinct[used] / possible[used]).mean()) if used.any() else 1.0
+
+        scores["gpa"] = self._balance(labels, sizes, self.features[:, 1])
+        scores["english"] = self._balance(labels, sizes, self.features[:, 2])
+
+        total_weight = sum(self.weights[name] for name in OBJECTIVES)
+        scores["total"] = (
+            sum(self.weights[name] * scores[name] for name in OBJECTIVES) / total_weight
+            if total_weight > 0 else 0.0
+        )
+        return scores
+
+    @staticmethod
+    def _balance(labels: np.ndarray, sizes: np.ndarray, values: np.ndarray) -> float:
+        """
+        1 when every group has the same mean value, 0 when the group means
+        spread as much as the individual values
+        """
+        spread = values.var()
+        if spread == 0:
+            return 1.0
+        used = sizes > 0
+        means = np.bincount(labels, weights=values, minlength=len(sizes))[used] / sizes[used]
+        return float(max(0.0, 1.0 - means.var() / spread))
+
+    def labels_from_groups(self, groups: List[List[int]]) -> np.ndarray:
+        position = {student_id: i for i, student_id in enumerate(self.student_ids)}
+        labels = np.empty(len(self.student_ids), dtype=np.int64)
+        for g, group in enumerate(groups):
+            labels[[position[student_id] for student_id in group]] = g
+        return labels
+
+    def groups_from_labels(self, labels: np.ndarray) -> List[List[int]]:
+        groups: List[List[int]] = [[] for _ in range(int(labels.max()) + 1)] if len(labels) else []
+        for student_id, g in zip(self.student_ids, labels.tolist()):
+            groups[g].append(student_id)
+        return [sorted(group) for group in groups if group]
+
+
+def balance_groups(
+    groups: List[List[int]],
+    preferences: Dict[int, Optional[int]],
+    students: Dict[int, Tuple[Optional[str], Optional[float], Optional[str]]],
+    weights: Optional[Dict[str, float]] = None,
+    time_budget_ms: int = 1000,
+    seed: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[List[List[int]], Dict[str, any]]:
+    """
+    Improve a grouping on the weighted objective within the time budget
+    (or until should_stop() answers True)
+
+    Each step swaps a batch of random student pairs at once, scores the result
+    with one vectorised evaluation and keeps it only if the total went up.
+    The batch shrinks after failed steps and grows back after successes.
+    Swaps keep group sizes unchanged.
+
+    Returns:
+        Tuple of (groups, scores) where scores holds the objective values of
+        the returned grouping and the number of steps run
+    """
+    student_ids = [student_id for group in groups for student_id in group]
+    objective = GroupBalanceObjective(student_ids, preferences, students, weights)
+    labels = objective.labels_from_groups(groups)
+    n = len(labels)
+
+    best = objective.evaluate(labels)
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    batch = max(1, n // 20)
+    steps = 0
+
+    while n > 1 and time.perf_counter() < deadline:
+        if should_stop is not None and should_stop():
+            break
+        steps += 1
+        a = rng.integers(0, n, batch)
+        b = rng.integers(0, n, batch)
+        # Drop pairs sharing a student so that every swap in the batch is independent
+        touched = np.concatenate([a, b])
+        _, inverse, counts = np.unique(touched, return_inverse=True, return_counts=True)
+        repeated = counts[inverse] > 1
+        keep = ~(repeated[:batch] | repeated[batch:])
+        a, b = a[keep], b[keep]
+
+        candidate = labels.copy()
+        candidate[a], candidate[b] = labels[b], labels[a]
+        scores = objective.evaluate(candidate)
+
+        if scores["total"] > best["total"]:
+            labels, best = candidate, scores
+            batch = min(max(1, n // 20), batch * 2)
+        else:
+            batch = max(1, batch // 2)
+
+    best["balance_steps"] = steps
+    return objective.groups_from_labels(labels), best
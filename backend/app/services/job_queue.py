@@ -0,0 +1,155 @@
+"""
+In-process Job Queue for Algorithm Runs
+
+Long solves are run outside of the request that started them:
+1. A job is registered with a unique id and queued on a thread pool
+2. The job function reports its phase (loading, solving, saving, ...)
+3. Clients poll the job for its phase, then for the final result or error
+4. A queued job that is cancelled is finished at once and never starts. A
+   running one stops its solver early (the time-budgeted loops check
+   job.cancel_requested) and is stopped at the next phase boundary, so a
+   cancelled job never writes its assignments
+
+Jobs run on threads of this process: the solvers hold the GIL for the whole
+solve unless they use a process pool (greedy restarts > 1, or a genetic run
+with workers > 1). The pool is kept small (ALGORITHM_JOB_WORKERS) so that
+queued solves do not starve the API of CPU.
+Finished jobs are kept in memory for polling, up to MAX_FINISHED_JOBS.
+"""
+
+from typing import Callable, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import uuid
+
+from app.config import settings
+
+# Finished jobs kept for polling before the oldest ones are forgotten
+MAX_FINISHED_JOBS = 200
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class AlgorithmJob:
+    """
+    State of one queued algorithm run
+    """
+
+    def __init__(self, project_id: Optional[int] = None):
+        self.id = str(uuid.uuid4())
+        self.project_id = project_id
+        self.status = QUEUED
+        self.phase = QUEUED
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._cancel_requested = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    def cancel_requested(self) -> bool:
+        """
+        True once cancellation was asked (solvers poll it to stop early)
+        """
+        return self._cancel_requested.is_set()
+
+    def report(self, phase: str):
+        """
+        Enter a new phase, or stop here if the job was cancelled
+        """
+        if self._cancel_requested.is_set():
+            raise JobCancelled()
+        self.phase = phase
+
+
+class JobQueue:
+    """
+    Registry of algorithm jobs running on a thread pool
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="algorithm-job")
+        self._jobs: "OrderedDict[str, AlgorithmJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, function: Callable[[AlgorithmJob], any], project_id: Optional[int] = None) -> AlgorithmJob:
+        """
+        Queue function(job) and return the job right away
+        """
+        job = AlgorithmJob(project_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        self._executor.submit(self._run, job, function)
+        return job
+
+    def get(self, job_id: str) -> Optional[AlgorithmJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[AlgorithmJob]:
+        """
+        Request cancellation: a queued job is cancelled right away and never
+        starts, a running one stops its solver and then at its next phase
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.finished:
+                job._cancel_requested.set()
+                if job.status == QUEUED:
+                    job.status = CANCELLED
+                    job.phase = CANCELLED
+                    job.finished_at = datetime.utcnow()
+        return job
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            if not job.finished:
+                job._cancel_requested.set()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, job: AlgorithmJob, function: Callable[[AlgorithmJob], any]):
+        # A job cancelled while queued is already finished
+        with self._lock:
+            if job.status == CANCELLED:
+                return
+            job.status = RUNNING
+            job.started_at = datetime.utcnow()
+
+        try:
+            job.report("starting")
+            job.result = function(job)
+            job.status = SUCCEEDED
+            job.phase = "done"
+        except JobCancelled:
+            job.status = CANCELLED
+            job.phase = CANCELLED
+        except Exception as exc:
+            job.status = FAILED
+            job.error = str(getattr(exc, "detail", exc))
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+# Shared queue used by the API
+job_queue = JobQueue(max_workers=settings.ALGORITHM_JOB_WORKERS)
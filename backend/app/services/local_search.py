@@ -0,0 +1,269 @@
+"""
+Local Search Post-Optimiser for Group Projects
+
+Simulated annealing on top of an existing grouping (usually the greedy one):
+1. Swap: two students from different groups trade places
+2. Move: a student leaves a group of size k for a group of size k-1
+   (so group sizes stay in {k-1, k})
+
+Most proposals are guided: an unsatisfied student tries to join the group of
+their preferred partner. The objective is the number of satisfied students.
+
+Every move is scored incrementally in O(1): each group keeps a counter of how
+many of its members chose each student, so only the two affected groups are
+looked at. The search is anytime: it stops when the time budget is spent (or
+should_stop() answers True, e.g. a cancelled job) and returns the best
+grouping seen.
+"""
+
+from typing import Callable, List, Dict, Optional, Tuple
+import math
+import random
+import time
+
+
+class GroupLocalSearch:
+    """
+    Simulated annealing over swap/move neighbourhoods with incremental scoring
+    """
+
+    def __init__(
+        self,
+        group_size: int = 3,
+        time_budget_ms: int = 500,
+        initial_temperature: float = 1.0,
+        guided_ratio: float = 0.8,
+        rng: Optional[random.Random] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ):
+        self.group_size = group_size
+        self.time_budget_ms = time_budget_ms
+        self.initial_temperature = initial_temperature
+        self.guided_ratio = guided_ratio
+        self.rng = rng or random.Random()
+        self.should_stop = should_stop
+        self.iterations = 0
+        self.accepted_moves = 0
+        self.initial_score = 0
+        self.best_score = 0
+
+    def optimise(
+        self,
+        groups: List[List[int]],
+        preferences: Dict[int, Optional[int]]
+    ) -> List[List[int]]:
+        """
+        Improve a grouping within the time budget
+
+        Args:
+            groups: Starting groups (each group is a list of student IDs)
+            preferences: Dict mapping student_id -> preferred_partner_id (or None)
+
+        Returns:
+            The best groups found, as sorted lists of student IDs
+        """
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        self._build_state(groups, preferences)
+        if len(self.members) < 2:
+            return [sorted(group) for group in groups]
+
+        score = self._score()
+        self.initial_score = score
+        self.best_score = score
+        best_group_of = None
+        self.iterations = 0
+        self.accepted_moves = 0
+
+        started = time.perf_counter()
+        total = max(deadline - started, 1e-9)
+        temperature = self.initial_temperature
+
+        while True:
+            # Check the clock and cool down every 256 iterations
+            if self.iterations & 255 == 0:
+                now = time.perf_counter()
+                if now >= deadline or (self.should_stop is not None and self.should_stop()):
+                    break
+                temperature = self.initial_temperature * (1 - (now - started) / total)
+
+            self.iterations += 1
+            move = self._propose()
+            if move is None:
+                continue
+            delta = self._delta(*move)
+
+            if delta < 0:
+                if temperature <= 1e-3 or self.rng.random() >= math.exp(delta / temperature):
+                    continue
+                # About to leave a local optimum: remember it if it is the best so far
+                if score >= self.best_score and best_group_of is None:
+                    best_group_of = list(self.group_of)
+
+            self._apply(*move)
+            score += delta
+            self.accepted_moves += 1
+            if score > self.best_score:
+                self.best_score = score
+                best_group_of = None
+
+        if best_group_of is not None and self.best_score > score:
+            self.group_of = best_group_of
+        else:
+            self.best_score = score
+
+        result: List[List[int]] = [[] for _ in self.members]
+        for student_id, g in zip(self.students, self.group_of):
+            result[g].append(student_id)
+        return [sorted(group) for group in result if group]
+
+    def _build_state(self, groups: List[List[int]], preferences: Dict[int, Optional[int]]):
+        """
+        Index students and build per-group "chosen by" counters
+        """
+        self.students = [student_id for group in groups for student_id in group]
+        index = {student_id: i for i, student_id in enumerate(self.students)}
+
+        # partner[i] = index of the preferred partner, or -1
+        self.partner = []
+        for i, student_id in enumerate(self.students):
+            p = index.get(preferences.get(student_id), -1)
+            self.partner.append(p if p != i else -1)
+        self.choosers = [i for i, p in enumerate(self.partner) if p >= 0]
+
+        self.members: List[List[int]] = []
+        self.position = [0] * len(self.students)
+        self.group_of = [0] * len(self.students)
+        # chosen_by[g][s] = number of members of group g whose partner is s
+        self.chosen_by: List[Dict[int, int]] = []
+
+        for g, group in enumerate(groups):
+            members = [index[student_id] for student_id in group]
+            counter: Dict[int, int] = {}
+            for slot, i in enumerate(members):
+                self.group_of[i] = g
+                self.position[i] = slot
+                p = self.partner[i]
+                if p >= 0:
+                    counter[p] = counter.get(p, 0) + 1
+            self.members.append(members)
+            self.chosen_by.append(counter)
+
+    def _score(self) -> int:
+        return sum(1 for i in self.choosers if self.group_of[self.partner[i]] == self.group_of[i])
+
+    def _propose(self) -> Optional[Tuple[int, int]]:
+        """
+        Propose (student, target): a swap when target is a student, a move when
+        target is -(group + 1)
+        """
+        rng = self.rng
+        if self.choosers and rng.random() < self.guided_ratio:
+            a = self.choosers[rng.randrange(len(self.choosers))]
+            target_group = self.group_of[self.partner[a]]
+        else:
+            a = rng.randrange(len(self.students))
+            target_group = rng.randrange(len(self.members))
+
+        source_group = self.group_of[a]
+        if target_group == source_group:
+            return None
+
+        # Moves keep sizes in {k-1, k}: only from a full group to a short one
+        if (len(self.members[source_group]) == self.group_size
+                and len(self.members[target_group]) == self.group_size - 1
+                and rng.random() < 0.5):
+            return a, -(target_group + 1)
+
+        target_members = self.members[target_group]
+        b = target_members[rng.randrange(len(target_members))]
+        return a, b
+
+    def _own_gain(self, i: int, new_group: int, moved: Dict[int, int]) -> int:
+        p = self.partner[i]
+        if p < 0:
+            return 0
+        before = self.group_of[p] == self.group_of[i]
+        after = moved.get(p, self.group_of[p]) == new_group
+        return after - before
+
+    def _delta(self, a: int, target: int) -> int:
+        """
+        Change in satisfied students if the move is applied, in O(1)
+        """
+        group_a = self.group_of[a]
+
+        if target < 0:
+            group_b = -target - 1
+            moved = {a: group_b}
+            # Students who chose a: lose those in group_a, gain those in group_b
+            admirers = self.chosen_by[group_b].get(a, 0) - self.chosen_by[group_a].get(a, 0)
+            return self._own_gain(a, group_b, moved) + admirers
+
+        b = target
+        group_b = self.group_of[b]
+        moved = {a: group_b, b: group_a}
+        own = self._own_gain(a, group_b, moved) + self._own_gain(b, group_a, moved)
+
+        admirers_a = (self.chosen_by[group_b].get(a, 0) - (self.partner[b] == a)) - self.chosen_by[group_a].get(a, 0)
+        admirers_b = (self.chosen_by[group_a].get(b, 0) - (self.partner[a] == b)) - self.chosen_by[group_b].get(b, 0)
+        return own + admirers_a + admirers_b
+
+    def _leave(self, i: int):
+        g = self.group_of[i]
+        members = self.members[g]
+        last = members.pop()
+        if last != i:
+            members[self.position[i]] = last
+            self.position[last] = self.position[i]
+        p = self.partner[i]
+        if p >= 0:
+            counter = self.chosen_by[g]
+            counter[p] -= 1
+            if counter[p] == 0:
+                del counter[p]
+
+    def _join(self, i: int, g: int):
+        self.group_of[i] = g
+        self.position[i] = len(self.members[g])
+        self.members[g].append(i)
+        p = self.partner[i]
+        if p >= 0:
+            counter = self.chosen_by[g]
+            counter[p] = counter.get(p, 0) + 1
+
+    def _apply(self, a: int, target: int):
+        if target < 0:
+            self._leave(a)
+            self._join(a, -target - 1)
+            return
+
+        b = target
+        group_a, group_b = self.group_of[a], self.group_of[b]
+        self._leave(a)
+        self._leave(b)
+        self._join(a, group_b)
+        self._join(b, group_a)
+
+
+def optimise_groups(
+    groups: List[List[int]],
+    preferences: Dict[int, Optional[int]],
+    group_size: int = 3,
+    time_budget_ms: int = 500,
+    rng: Optional[random.Random] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Tuple[List[List[int]], Dict[str, any]]:
+    """
+    Convenience function to run the local search post-optimiser
+
+    Returns:
+        Tuple of (groups, details) where details holds the search counters
+    """
+    search = GroupLocalSearch(group_size=group_size, time_budget_ms=time_budget_ms, rng=rng, should_stop=should_stop)
+    optimised = search.optimise(groups, preferences)
+
+    return optimised, {
+        "local_search_iterations": search.iterations,
+        "local_search_accepted_moves": search.accepted_moves,
+        "local_search_gain": search.best_score - search.initial_score
+    }
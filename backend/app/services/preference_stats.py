@@ -0,0 +1,139 @@
+"""
+Incrementally Maintained Preference Statistics
+
+The dashboard polls /preferences/stats; counting the tables on every call
+grows with their size. The counts are kept in a single preference_stats row:
+1. Every write that changes them applies its delta in its own transaction
+   (UPDATE ... SET x = x + delta, atomic under concurrent submissions)
+2. The stats endpoint reads that row by primary key
+3. When the row does not exist yet, the first read recounts the tables
+   (the four COUNT queries) and stores the result; deltas applied while the
+   row is missing are dropped, the recount already includes them
+4. An optional background thread recounts every
+   PREFERENCE_STATS_RECONCILE_SECONDS, to fix any drift from writes made
+   outside the API (scripts, manual SQL)
+"""
+
+from typing import Dict, Optional
+from datetime import datetime
+import logging
+import threading
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.preference import StudentPreference
+from app.models.preference_stats import PreferenceStats
+from app.models.project import Project
+from app.models.student import Student
+
+STATS_ID = 1
+
+logger = logging.getLogger(__name__)
+
+
+def count_stats(db: Session) -> Dict[str, int]:
+    """Counts straight from the tables"""
+    return {
+        "total_students": db.query(Student).count(),
+        "students_with_preferences": db.query(StudentPreference.student_id).distinct().count(),
+        "total_active_projects": db.query(Project).filter(Project.is_active == True).count(),
+        "total_preferences": db.query(StudentPreference).count()
+    }
+
+
+def adjust_stats(db: Session, **deltas: int):
+    """
+    Apply counter deltas in the session's transaction (the caller commits)
+
+    Example: adjust_stats(db, total_preferences=3, students_with_preferences=1)
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    table = PreferenceStats.__table__
+    db.execute(
+        update(table).where(table.c.id == STATS_ID).values(
+            {name: table.c[name] + delta for name, delta in deltas.items()}
+        )
+    )
+
+
+def reconcile_stats(db: Session) -> PreferenceStats:
+    """
+    Recount the tables into the stats row (the caller commits)
+
+    The row is locked before counting: a submission that already applied
+    its delta commits first and is counted, later ones wait and apply theirs
+    on top of the recount.
+    """
+    stats = db.get(PreferenceStats, STATS_ID, with_for_update=True)
+    counts = count_stats(db)
+    if stats is None:
+        stats = PreferenceStats(id=STATS_ID)
+        db.add(stats)
+    for name, value in counts.items():
+        setattr(stats, name, value)
+    stats.reconciled_at = datetime.utcnow()
+    db.flush()
+    return stats
+
+
+def get_stats(db: Session) -> PreferenceStats:
+    """
+    The stats row, created from a recount on first use
+    """
+    stats = db.get(PreferenceStats, STATS_ID)
+    if stats is not None:
+        return stats
+
+    try:
+        stats = reconcile_stats(db)
+        db.commit()
+    except IntegrityError:
+        # Another request created it first
+        db.rollback()
+        stats = db.get(PreferenceStats, STATS_ID)
+    return stats
+
+
+class StatsReconciler:
+    """
+    Background thread recounting the stats row at a fixed interval
+    """
+
+    def __init__(self, interval_seconds: int):
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="preference-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            db = SessionLocal()
+            try:
+                reconcile_stats(db)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception("Preference stats reconciliation failed")
+            finally:
+                db.close()
+
+
+# Started and stopped with the API (see main.py)
+stats_reconciler = StatsReconciler(settings.PREFERENCE_STATS_RECONCILE_SECONDS)
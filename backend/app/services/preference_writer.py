@@ -0,0 +1,70 @@
+"""
+Preference Writer
+
+Replaces a student's ranked project choices in a fixed number of statements:
+1. The previous choices are removed with one DELETE
+2. The new ones are written with one multi-row INSERT ... RETURNING where the
+   dialect supports it (PostgreSQL, SQLite >= 3.35): the saved rows come back
+   from the insert, with no refresh per row
+3. Other databases: one executemany INSERT, then one SELECT of the rows
+4. The preference statistics counters get the difference (see preference_stats)
+
+Projects are validated by the caller (one IN query, see preferences.py).
+"""
+
+from typing import List, Dict
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.preference import StudentPreference
+from app.services.preference_stats import adjust_stats
+
+PREFERENCE_COLUMNS = (
+    "id", "student_id", "project_id", "preferred_partner_id", "university_ranking", "rank", "created_at"
+)
+
+
+def replace_student_preferences(
+    db: Session,
+    student_id: int,
+    choices: List[Dict[str, any]]
+) -> List[Dict[str, any]]:
+    """
+    Replace every preference of a student
+
+    Args:
+        db: Database session (the caller commits)
+        choices: Dicts with project_id and rank
+
+    Returns:
+        Saved preferences (PREFERENCE_COLUMNS dicts), in submission order
+    """
+    removed = db.query(StudentPreference).filter(
+        StudentPreference.student_id == student_id
+    ).delete(synchronize_session=False)
+
+    saved = {}
+    if choices:
+        table = StudentPreference.__table__
+        columns = [table.c[column] for column in PREFERENCE_COLUMNS]
+        rows = [
+            {"student_id": student_id, "project_id": choice["project_id"], "rank": choice["rank"]}
+            for choice in choices
+        ]
+
+        dialect = db.get_bind().dialect
+        if dialect.insert_returning and dialect.supports_multivalues_insert:
+            result = db.execute(insert(table).values(rows).returning(*columns))
+        else:
+            db.execute(insert(table), rows)
+            result = db.execute(select(*columns).where(table.c.student_id == student_id))
+        saved = {row["project_id"]: dict(row) for row in result.mappings()}
+
+    # Last statement: the stats row stays locked until the caller commits
+    adjust_stats(
+        db,
+        total_preferences=len(choices) - removed,
+        students_with_preferences=bool(choices) - bool(removed)
+    )
+    return [saved[choice["project_id"]] for choice in choices]
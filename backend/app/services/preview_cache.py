@@ -0,0 +1,108 @@
+"""
+Preview Cache for Group Formation Runs
+
+Teachers preview groupings several times before saving one:
+1. A run's inputs are reduced to a fingerprint: SHA-256 of the project, its
+   sorted preference pairs, the group size and the solver parameters
+2. Solved groupings are kept in an LRU cache under that fingerprint, so a
+   preview (or a run) with unchanged inputs skips the solve
+3. A preview can be committed later by its key: the cached groups are saved
+   as they were shown, provided the inputs still have the same fingerprint
+
+The cache lives in the API process (like the job queue), so each worker
+process keeps its own previews.
+"""
+
+from typing import List, Dict, Tuple, Optional
+from collections import OrderedDict
+from datetime import datetime
+import hashlib
+import json
+import threading
+
+from app.config import settings
+
+
+class CachedPreview:
+    """
+    A solved grouping and the inputs it was solved from
+    """
+
+    def __init__(
+        self,
+        key: str,
+        project_id: int,
+        algorithm: str,
+        parameters: Dict[str, any],
+        groups: List[List[int]],
+        preferences: Dict[int, Optional[int]],
+        stats: Dict[str, any],
+        solve_seconds: float
+    ):
+        self.key = key
+        self.project_id = project_id
+        self.algorithm = algorithm
+        self.parameters = parameters
+        self.groups = groups
+        self.preferences = preferences
+        self.stats = stats
+        self.solve_seconds = solve_seconds
+        self.created_at = datetime.utcnow()
+
+
+def fingerprint(
+    project_id: int,
+    preferences: Dict[int, Optional[int]],
+    group_size: int,
+    parameters: Dict[str, any],
+    profiles: Optional[List[Tuple]] = None
+) -> str:
+    """
+    Hash of everything a group formation run depends on
+
+    Args:
+        preferences: Dict mapping student_id -> preferred_partner_id (or None)
+        parameters: Solver parameters (solver, seed, restarts, ...)
+        profiles: Student profile rows, for runs that balance on them
+    """
+    payload = json.dumps(
+        [
+            project_id,
+            sorted(preferences.items(), key=lambda item: item[0]),
+            group_size,
+            parameters,
+            sorted(profiles) if profiles else None
+        ],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PreviewCache:
+    """
+    Thread-safe LRU cache of solved groupings
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedPreview]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedPreview]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, entry: CachedPreview):
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Shared by the API routes
+preview_cache = PreviewCache(max_entries=settings.PREVIEW_CACHE_SIZE)
@@ -0,0 +1,341 @@
+"""
+Project Assignment Algorithm (ranked choices across projects)
+
+This algorithm assigns every student to at most one project based on:
+1. The ranked project choices (StudentPreference.rank, 1 = first choice)
+2. Project capacities (max_students) and minimums (min_students)
+
+The problem is solved exactly as a min-cost flow
+    source -> student -> project -> sink
+with the primal-dual method: one multi-source Dijkstra (with node potentials)
+per phase, then as many augmenting paths as possible along zero reduced-cost
+edges before the next phase. Preferences are stored as a sparse matrix (one row
+of (project, cost) entries per student), so the work depends on the number of
+submitted choices and not on students x projects.
+
+Objectives, in strict priority order:
+1. Place as many students as possible
+2. Fill project minimums
+3. Minimise the total rank obtained
+"""
+
+from typing import List, Dict, Tuple, Optional
+import heapq
+
+# Preferences are ranked from 1 to MAX_RANK (see PreferenceCreate.rank)
+MAX_RANK = 10
+
+
+def rank_to_satisfaction(rank: Optional[int]) -> float:
+    """
+    Convert an obtained preference rank into a satisfaction score (0-10)
+
+    First choice gives 10, each rank below costs one point.
+    """
+    if rank is None:
+        return 0.0
+    return float(max(0, MAX_RANK + 1 - rank))
+
+
+class ProjectAssignmentAlgorithm:
+    """
+    Min-cost-flow solver assigning students to projects by ranked choice
+    """
+
+    def __init__(self):
+        self.student_ids: List[int] = []
+        self.project_ids: List[int] = []
+        self.assignment: Dict[int, Optional[int]] = {}
+        self.preferences: Dict[int, Dict[int, int]] = {}
+        self.capacities: Dict[int, Tuple[int, int]] = {}
+
+    def assign(
+        self,
+        preferences: Dict[int, Dict[int, int]],
+        capacities: Dict[int, Tuple[int, int]]
+    ) -> Dict[int, Optional[int]]:
+        """
+        Main algorithm to assign students to projects
+
+        Args:
+            preferences: Dict mapping student_id -> {project_id: rank}
+            capacities: Dict mapping project_id -> (min_students, max_students)
+
+        Returns:
+            Dict mapping student_id -> project_id (None if no ranked project had room)
+        """
+        self.preferences = preferences
+        self.capacities = capacities
+        self.student_ids = list(preferences)
+        self.project_ids = list(capacities)
+
+        self._build_network()
+
+        unassigned = set(range(len(self.student_ids)))
+        while unassigned:
+            self._update_potentials(unassigned)
+            self._augment_admissible_paths(unassigned)
+
+        num_projects = len(self.project_ids)
+        self.assignment = {
+            student_id: (self.project_ids[j] if j < num_projects else None)
+            for student_id, j in zip(self.student_ids, self._assigned_to)
+        }
+        return self.assignment
+
+    def _build_network(self):
+        """
+        Compact the preferences into a sparse matrix and reset the flow
+
+        Node layout: students [0, S), projects [S, S + P) and a final
+        "unassigned" node S + P with unlimited room.
+        """
+        num_students = len(self.student_ids)
+        num_projects = len(self.project_ids)
+        project_index = {pid: j for j, pid in enumerate(self.project_ids)}
+
+        # Sparse preference matrix: one row of (project, cost) per student
+        self._rows: List[List[Tuple[int, int]]] = []
+        max_cost = 0
+        for student_id in self.student_ids:
+            row = []
+            for project_id, rank in self.preferences[student_id].items():
+                j = project_index.get(project_id)
+                if j is not None and self.capacities[project_id][1] > 0:
+                    row.append((j, rank - 1))
+                    max_cost = max(max_cost, rank - 1)
+            self._rows.append(row)
+
+        self._maximums = [max(0, self.capacities[pid][1]) for pid in self.project_ids]
+        self._minimums = [
+            min(max(0, self.capacities[pid][0]), maximum)
+            for pid, maximum in zip(self.project_ids, self._maximums)
+        ]
+
+        # Lexicographic weights: one seat above a minimum costs more than any rank
+        # total, and leaving a student out costs more than anything else
+        self._above_minimum = num_students * (max_cost + 1) + 1
+        self._unassigned_cost = num_students * (max_cost + 1 + self._above_minimum) + 1
+
+        self._offset = num_students
+        self._dummy = num_students + num_projects
+        self._potential = [0] * (self._dummy + 1)
+        self._members: List[set] = [set() for _ in range(num_projects + 1)]
+        self._counts = [0] * num_projects
+        self._assigned_to = [-1] * num_students
+        self._assigned_cost = [0] * num_students
+        self._dist = [0] * (self._dummy + 1)
+        self._stamp = [0] * (self._dummy + 1)
+        self._run = 0
+
+    def _sink_cost(self, node: int) -> Optional[int]:
+        """
+        Cost of ending an augmenting path at a project (None when it is full)
+        """
+        if node == self._dummy:
+            return 0
+        j = node - self._offset
+        if self._counts[j] >= self._maximums[j]:
+            return None
+        return 0 if self._counts[j] < self._minimums[j] else self._above_minimum
+
+    def _edges(self, node: int):
+        """
+        Yield the residual edges (target, cost) leaving a node
+        """
+        if node < self._offset:
+            current = self._assigned_to[node]
+            for j, cost in self._rows[node]:
+                if j != current:
+                    yield self._offset + j, cost
+            if self._offset + current != self._dummy:
+                yield self._dummy, self._unassigned_cost
+        else:
+            # Reverse edges: a student holding a seat can be pushed elsewhere
+            for member in self._members[node - self._offset]:
+                yield member, -self._assigned_cost[member]
+
+    def _update_potentials(self, sources: set):
+        """
+        Multi-source Dijkstra on reduced costs, then shift the potentials so that
+        every shortest path to the sink is made of zero reduced-cost edges
+        """
+        potential = self._potential
+        dist = self._dist
+        stamp = self._stamp
+        self._run += 1
+        run = self._run
+
+        # The sink is only ever a target, so its potential is picked as the
+        # smallest one keeping every edge into it non-negative
+        sink_potential = min(
+            cost + potential[node]
+            for node in range(self._offset, self._dummy + 1)
+            for cost in [self._sink_cost(node)] if cost is not None
+        )
+        self._sink_potential = sink_potential
+
+        heap = []
+        for source in sources:
+            dist[source] = 0
+            stamp[source] = run
+            heap.append((0, source))
+        heapq.heapify(heap)
+
+        finalized = []
+        best = None
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node] or stamp[node] == -run:
+                continue
+            if best is not None and d >= best:
+                break
+            stamp[node] = -run
+            finalized.append(node)
+
+            if node >= self._offset:
+                end_cost = self._sink_cost(node)
+                if end_cost is not None:
+                    end = d + end_cost + potential[node] - sink_potential
+                    if best is None or end < best:
+                        best = end
+
+            base = d + potential[node]
+            for target, cost in self._edges(node):
+                if stamp[target] == -run:
+                    continue
+                nd = base + cost - potential[target]
+                if stamp[target] != run or nd < dist[target]:
+                    stamp[target] = run
+                    dist[target] = nd
+                    heapq.heappush(heap, (nd, target))
+
+        for node in finalized:
+            if dist[node] < best:
+                potential[node] -= best - dist[node]
+
+    def _augment_admissible_paths(self, unassigned: set):
+        """
+        Push students along zero reduced-cost paths until none is left
+
+        Nodes found to be dead ends are not explored again in this phase; the
+        first search always succeeds, so every phase makes progress.
+        """
+        potential = self._potential
+        sink_potential = self._sink_potential
+        dead = set()
+
+        for source in list(unassigned):
+            path = [source]
+            on_path = {source}
+            costs = []
+            stack = [self._edges(source)]
+
+            while stack:
+                node = path[-1]
+                if node >= self._offset:
+                    end_cost = self._sink_cost(node)
+                    if end_cost is not None and end_cost + potential[node] == sink_potential:
+                        break
+                for target, cost in stack[-1]:
+                    if (target not in dead and target not in on_path
+                            and cost + potential[node] == potential[target]):
+                        path.append(target)
+                        on_path.add(target)
+                        costs.append(cost)
+                        stack.append(self._edges(target))
+                        break
+                else:
+                    # Dead end: no zero reduced-cost path to the sink from here
+                    dead.add(node)
+                    on_path.discard(node)
+                    stack.pop()
+                    path.pop()
+                    if costs:
+                        costs.pop()
+            else:
+                continue
+
+            self._apply_path(path, costs)
+            unassigned.discard(source)
+
+    def _apply_path(self, path: List[int], costs: List[int]):
+        """
+        Move every student on the path to the seat that follows it
+        """
+        for i in range(0, len(path) - 1, 2):
+            student, node = path[i], path[i + 1]
+            previous = self._assigned_to[student]
+            if previous >= 0:
+                self._members[previous].discard(student)
+            j = node - self._offset
+            self._members[j].add(student)
+            self._assigned_to[student] = j
+            self._assigned_cost[student] = costs[i]
+
+        end = path[-1] - self._offset
+        if end < len(self._counts):
+            self._counts[end] += 1
+
+    def calculate_satisfaction_score(self, assignment: Dict[int, Optional[int]]) -> Dict[str, any]:
+        """
+        Calculate metrics about how well ranked choices were satisfied
+
+        Returns:
+            Dict with satisfaction statistics
+        """
+        total_students = len(assignment)
+        rank_distribution: Dict[int, int] = {}
+        project_counts: Dict[int, int] = {}
+        rank_total = 0
+        satisfaction_total = 0.0
+
+        for student_id, project_id in assignment.items():
+            if project_id is None:
+                continue
+            rank = self.preferences[student_id][project_id]
+            rank_distribution[rank] = rank_distribution.get(rank, 0) + 1
+            project_counts[project_id] = project_counts.get(project_id, 0) + 1
+            rank_total += rank
+            satisfaction_total += rank_to_satisfaction(rank)
+
+        assigned = sum(rank_distribution.values())
+        below_minimum = [
+            project_id for project_id, (minimum, _) in self.capacities.items()
+            if 0 < project_counts.get(project_id, 0) < minimum
+        ]
+
+        return {
+            "total_students": total_students,
+            "assigned_students": assigned,
+            "unassigned_students": total_students - assigned,
+            "first_choice_rate": (rank_distribution.get(1, 0) / total_students * 100) if total_students > 0 else 0,
+            "satisfaction_rate": (satisfaction_total / (assigned * 10) * 100) if assigned > 0 else 0,
+            "average_rank": rank_total / assigned if assigned > 0 else 0,
+            "rank_distribution": dict(sorted(rank_distribution.items())),
+            "projects_used": len(project_counts),
+            "projects_below_minimum": sorted(below_minimum)
+        }
+
+
+def assign_students_to_projects(
+    preferences: Dict[int, Dict[int, int]],
+    capacities: Dict[int, Tuple[int, int]]
+) -> Tuple[Dict[int, Optional[int]], Dict[str, any]]:
+    """
+    Convenience function to run the project assignment algorithm
+
+    Args:
+        preferences: Dict mapping student_id -> {project_id: rank}
+        capacities: Dict mapping project_id -> (min_students, max_students)
+
+    Returns:
+        Tuple of (assignment, stats) where:
+            - assignment: Dict mapping student_id -> project_id (or None)
+            - stats: Dictionary with satisfaction metrics
+    """
+    algorithm = ProjectAssignmentAlgorithm()
+    assignment = algorithm.assign(preferences, capacities)
+    stats = algorithm.calculate_satisfaction_score(assignment)
+
+    return assignment, stats
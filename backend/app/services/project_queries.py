@@ -0,0 +1,93 @@
+"""
+Project Listing Queries
+
+Read paths of the project routes, with a fixed number of queries per request
+whatever the number of projects and students:
+1. One query for the projects themselves (paginated by the route)
+2. One joined projection query (project_students x students x users) for all
+   their rosters, turned into StudentInProject rows from plain tuples
+
+Walking project.students then student.user instead lazy-loads one roster per
+project and one user per student (1 + P + P*S round trips).
+"""
+
+from typing import List, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.project import Project, project_students
+from app.models.student import Student
+from app.models.user import User
+from app.schemas import StudentInProject
+
+
+def _roster_query(db: Session):
+    return db.query(
+        project_students.c.project_id,
+        Student.id,
+        User.first_name,
+        User.last_name,
+        User.email,
+        Student.filiere,
+        Student.general_rank,
+        Student.gpa
+    ).select_from(project_students).join(
+        Student, Student.id == project_students.c.student_id
+    ).join(
+        User, User.id == Student.user_id
+    )
+
+
+def _student_in_project(row) -> StudentInProject:
+    full_name = f"{row.first_name} {row.last_name}" if row.first_name else row.email
+    return StudentInProject(
+        id=row.id,
+        name=full_name,
+        email=row.email,
+        filiere=row.filiere.value if row.filiere else None,
+        rank=row.general_rank,
+        grade=row.gpa
+    )
+
+
+def get_rosters(db: Session, project_ids: List[int]) -> Dict[int, List[StudentInProject]]:
+    """
+    Students of several projects in one query
+
+    Returns:
+        Dict mapping project_id -> students (every requested project is present)
+    """
+    rosters: Dict[int, List[StudentInProject]] = {project_id: [] for project_id in project_ids}
+    if not project_ids:
+        return rosters
+
+    rows = _roster_query(db).filter(
+        project_students.c.project_id.in_(project_ids)
+    ).order_by(project_students.c.project_id, Student.id).all()
+
+    for row in rows:
+        rosters[row.project_id].append(_student_in_project(row))
+    return rosters
+
+
+def get_project_roster(db: Session, project_id: int) -> List[StudentInProject]:
+    return get_rosters(db, [project_id])[project_id]
+
+
+def with_rosters(
+    db: Session,
+    projects: List[Project],
+    include_students: bool = True
+) -> List[Dict[str, any]]:
+    """
+    Project dicts with their "students", all rosters loaded in one query
+    """
+    rosters = get_rosters(db, [project.id for project in projects]) if include_students else {}
+    return [{**project.__dict__, "students": rosters.get(project.id, [])} for project in projects]
+
+
+def get_project_with_students(db: Session, project_id: int) -> Optional[Dict[str, any]]:
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        return None
+    return with_rosters(db, [project])[0]
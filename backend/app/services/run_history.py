@@ -0,0 +1,149 @@
+"""
+Algorithm Run History
+
+Every algorithm run is kept in the algorithm_runs table:
+1. Run metadata: algorithm, request parameters, solve time
+2. The full calculate_*_score output and a precomputed summary
+   (assignments, groups, satisfied students) for the stats endpoint
+3. A copy of the run's assignments, so older runs can be compared or
+   activated again after the assignments table has moved on
+
+Each project has at most one active run: the one whose assignments are
+currently in the assignments table.
+"""
+
+from typing import List, Dict, Optional, FrozenSet
+
+from sqlalchemy.orm import Session
+
+from app.models.algorithm_run import AlgorithmRun
+from app.models.assignment import Assignment
+from app.services.bulk_writer import bulk_insert_assignments
+
+# Same threshold as the stats endpoint: a satisfied student scores at least 8/10
+SATISFIED_SCORE = 8.0
+
+
+def record_run(
+    db: Session,
+    project_id: int,
+    run_id: str,
+    algorithm: str,
+    parameters: Optional[Dict[str, any]],
+    stats: Dict[str, any],
+    rows: List[Dict[str, any]],
+    solve_seconds: Optional[float] = None
+) -> AlgorithmRun:
+    """
+    Store a run and make it the project's active run
+
+    The caller commits, in the same transaction as the assignment rows.
+
+    Args:
+        rows: The Assignment rows written for this project (bulk insert format)
+    """
+    deactivate_runs(db, project_id)
+
+    run = AlgorithmRun(
+        id=run_id,
+        project_id=project_id,
+        algorithm=algorithm,
+        parameters=parameters,
+        stats=stats,
+        total_assignments=len(rows),
+        total_groups=len({row["group_number"] for row in rows if row["group_number"] is not None}),
+        satisfied_students=sum(
+            1 for row in rows
+            if row["satisfaction_score"] is not None and row["satisfaction_score"] >= SATISFIED_SCORE
+        ),
+        assignments=[
+            [row["student_id"], row["group_number"], row["preference_rank"], row["satisfaction_score"]]
+            for row in rows
+        ],
+        solve_seconds=solve_seconds,
+        is_active=True
+    )
+    db.add(run)
+    return run
+
+
+def deactivate_runs(db: Session, project_id: Optional[int] = None):
+    """
+    Clear the active run pointer of a project (or of every project)
+    """
+    query = db.query(AlgorithmRun).filter(AlgorithmRun.is_active == True)
+    if project_id is not None:
+        query = query.filter(AlgorithmRun.project_id == project_id)
+    query.update({"is_active": False}, synchronize_session=False)
+
+
+def get_active_run(db: Session, project_id: int) -> Optional[AlgorithmRun]:
+    return db.query(AlgorithmRun).filter(
+        AlgorithmRun.project_id == project_id,
+        AlgorithmRun.is_active == True
+    ).first()
+
+
+def activate_run(db: Session, run: AlgorithmRun) -> int:
+    """
+    Put a stored run back in the assignments table and make it active
+
+    The caller commits. Returns the number of assignments written.
+    """
+    db.query(Assignment).filter(Assignment.project_id == run.project_id).delete(synchronize_session=False)
+
+    rows = [
+        {
+            "student_id": student_id,
+            "project_id": run.project_id,
+            "group_number": group_number,
+            "preference_rank": preference_rank,
+            "satisfaction_score": satisfaction_score,
+            "algorithm_score": (run.stats or {}).get("satisfaction_rate"),
+            "algorithm_run_id": run.id,
+            "assigned_at": run.created_at
+        }
+        for student_id, group_number, preference_rank, satisfaction_score in run.assignments
+    ]
+    bulk_insert_assignments(db, rows)
+
+    deactivate_runs(db, run.project_id)
+    run.is_active = True
+    return len(rows)
+
+
+def _groups(run: AlgorithmRun) -> Dict[Optional[int], FrozenSet[int]]:
+    members: Dict[Optional[int], set] = {}
+    for student_id, group_number, _, _ in run.assignments:
+        members.setdefault(group_number, set()).add(student_id)
+    return {group_number: frozenset(group) for group_number, group in members.items()}
+
+
+def diff_runs(run_a: AlgorithmRun, run_b: AlgorithmRun) -> Dict[str, any]:
+    """
+    Compare two runs by group membership
+
+    Group numbers are arbitrary labels, so a student "changed group" when the
+    set of students they are grouped with differs between the two runs.
+    """
+    groups_a = set(_groups(run_a).values())
+    groups_b = set(_groups(run_b).values())
+
+    students_a = set().union(*groups_a)
+    students_b = set().union(*groups_b)
+    common = students_a & students_b
+
+    # Identical groups in both runs: their members did not move
+    kept_groups = groups_a & groups_b
+    unchanged = set().union(*kept_groups) & common
+    changed = common - unchanged
+
+    return {
+        "run_a": run_a.id,
+        "run_b": run_b.id,
+        "only_in_a": sorted(students_a - students_b),
+        "only_in_b": sorted(students_b - students_a),
+        "changed_group": sorted(changed),
+        "unchanged_students": len(unchanged),
+        "groups_kept": len(kept_groups)
+    }
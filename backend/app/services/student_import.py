@@ -0,0 +1,334 @@
+"""
+Student Roster Import
+
+Imports promotion files (CSV or XLSX) into a project, chunk by chunk:
+1. The file is parsed in chunks of IMPORT_CHUNK_SIZE rows (pandas chunked
+   read_csv, openpyxl read-only mode), never whole in memory
+2. Each row is validated as StudentCSVData; invalid rows are reported and skipped
+3. One IN query per chunk finds the users that already exist (and their
+   student profile)
+4. New users, their student profiles and the missing project_students links
+   are bulk inserted (and counted in the preference statistics), then the
+   chunk is committed. Usernames are the email's local part, with a numeric
+   suffix when it is already taken (john@a.com and john@b.com)
+5. A chunk the database still refuses (IntegrityError) is rolled back and
+   reported with the rejected rows; the import goes on with the next chunk
+
+The JSON upload endpoint goes through the same chunk import, so both paths
+create exactly the same rows.
+"""
+
+from typing import List, Dict, Iterator, Optional, Tuple, BinaryIO
+import csv
+
+import pandas as pd
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.project import project_students
+from app.models.student import Student, Filiere, EnglishLevel
+from app.models.user import User, UserRole
+from app.schemas import StudentCSVData, StudentInProject
+from app.services.preference_stats import adjust_stats
+
+IMPORT_CHUNK_SIZE = 2000
+
+# Errors kept in an import report (the count is always exact)
+MAX_REPORTED_ERRORS = 50
+
+# Filière names and codes accepted in roster files
+FILIERE_MAP = {
+    'INFORMATIQUE': Filiere.INFORMATIQUE,
+    'INFO': Filiere.INFORMATIQUE,
+    'E5FI': Filiere.INFORMATIQUE,
+    'ELECTRONIQUE': Filiere.ELECTRONIQUE,
+    'ELEC': Filiere.ELECTRONIQUE,
+    'E5SE': Filiere.SYSTEMES_EMBARQUES,
+    'ENERGIE': Filiere.ENERGIE,
+    'BIOTECHNOLOGIE': Filiere.BIOTECHNOLOGIE,
+    'BIOTECH': Filiere.BIOTECHNOLOGIE,
+    'SYSTEMES_EMBARQUES': Filiere.SYSTEMES_EMBARQUES,
+    'RESEAUX': Filiere.RESEAUX,
+    'AUTRE': Filiere.AUTRE
+}
+
+ROSTER_COLUMNS = ("name", "email", "filiere", "rank", "grade")
+
+
+def parse_filiere(value: Optional[str]) -> Filiere:
+    if not value:
+        return Filiere.AUTRE
+    return FILIERE_MAP.get(value.upper(), Filiere.AUTRE)
+
+
+def _full_name(first_name: Optional[str], last_name: Optional[str], email: str) -> str:
+    return f"{first_name} {last_name}" if first_name else email
+
+
+def unique_usernames(db: Session, emails: List[str]) -> List[str]:
+    """
+    Usernames for new users: the local part of each email, suffixed with 2, 3...
+    when the database or an earlier email of the list already uses it
+
+    One IN query, plus one more per round of suffixed names that are taken too.
+    """
+    bases = [email.split('@')[0] for email in emails]
+    usernames = list(bases)
+    suffixes = [1] * len(bases)
+    taken = set()
+    pending = list(range(len(bases)))
+
+    while pending:
+        candidates = {usernames[i] for i in pending} - taken
+        taken.update(db.scalars(select(User.username).where(User.username.in_(candidates))))
+
+        retry = []
+        for i in pending:
+            if usernames[i] in taken:
+                suffixes[i] += 1
+                usernames[i] = f"{bases[i]}{suffixes[i]}"
+                retry.append(i)
+            else:
+                taken.add(usernames[i])
+        pending = retry
+
+    return usernames
+
+
+def import_student_chunk(
+    db: Session,
+    project_id: int,
+    students: List[StudentCSVData]
+) -> Tuple[int, int, List[StudentInProject]]:
+    """
+    Create or link one chunk of students, in a constant number of queries
+
+    The caller commits.
+
+    Returns:
+        Tuple of (created_count, existing_count, students linked to the project)
+    """
+    # First occurrence of each email wins, later ones count as existing
+    by_email: Dict[str, StudentCSVData] = {}
+    for student in students:
+        by_email.setdefault(student.email, student)
+
+    existing_rows = db.execute(
+        select(
+            User.email, User.first_name, User.last_name,
+            Student.id, Student.filiere, Student.general_rank, Student.gpa
+        ).outerjoin(Student, Student.user_id == User.id).where(User.email.in_(list(by_email)))
+    ).all()
+    existing = {row.email: row for row in existing_rows}
+
+    # New users then their student profiles, ids read back by email / user_id
+    new_students = [student for email, student in by_email.items() if email not in existing]
+    usernames = unique_usernames(db, [student.email for student in new_students]) if new_students else []
+    user_rows = []
+    for student, username in zip(new_students, usernames):
+        name_parts = student.name.split(' ', 1)
+        user_rows.append({
+            "email": student.email,
+            "username": username,
+            "first_name": name_parts[0] if name_parts else student.name,
+            "last_name": name_parts[1] if len(name_parts) > 1 else "",
+            "role": UserRole.STUDENT,
+            "hashed_password": "temporary_password_hash"  # TODO: Generate proper password
+        })
+
+    roster: Dict[str, StudentInProject] = {}
+    if user_rows:
+        db.execute(insert(User.__table__), user_rows)
+        user_ids_by_email = dict(db.execute(
+            select(User.email, User.id).where(User.email.in_([row["email"] for row in user_rows]))
+        ).all())
+        user_ids = [user_ids_by_email[row["email"]] for row in user_rows]
+        student_rows = [
+            {
+                "user_id": user_id,
+                "student_number": f"STU{user_id:06d}",  # Auto-generate student number
+                "filiere": parse_filiere(student.filiere),
+                "english_level": EnglishLevel.B1,  # Default
+                "general_rank": student.rank,
+                "gpa": student.grade
+            }
+            for user_id, student in zip(user_ids, new_students)
+        ]
+        db.execute(insert(Student.__table__), student_rows)
+        student_ids_by_user = dict(db.execute(
+            select(Student.user_id, Student.id).where(Student.user_id.in_(user_ids))
+        ).all())
+        student_ids = [student_ids_by_user[user_id] for user_id in user_ids]
+        for student_id, user_row, student_row in zip(student_ids, user_rows, student_rows):
+            roster[user_row["email"]] = StudentInProject(
+                id=student_id,
+                name=f"{user_row['first_name']} {user_row['last_name']}".strip(),
+                email=user_row["email"],
+                filiere=student_row["filiere"].value,
+                rank=student_row["general_rank"],
+                grade=student_row["gpa"]
+            )
+
+    # Existing users are linked only if they have a student profile
+    for row in existing_rows:
+        if row.id is not None:
+            roster[row.email] = StudentInProject(
+                id=row.id,
+                name=_full_name(row.first_name, row.last_name, row.email),
+                email=row.email,
+                filiere=row.filiere.value if row.filiere else None,
+                rank=row.general_rank,
+                grade=row.gpa
+            )
+
+    linked_ids = [roster[row.email].id for row in existing_rows if row.email in roster]
+    already_linked = set(db.scalars(
+        select(project_students.c.student_id).where(
+            project_students.c.project_id == project_id,
+            project_students.c.student_id.in_(linked_ids)
+        )
+    ).all()) if linked_ids else set()
+
+    link_rows = [
+        {"project_id": project_id, "student_id": student.id}
+        for student in roster.values() if student.id not in already_linked
+    ]
+    if link_rows:
+        db.execute(insert(project_students), link_rows)
+    adjust_stats(db, total_students=len(new_students))
+
+    existing_count = len(students) - len(new_students)
+    return len(new_students), existing_count, [roster[email] for email in by_email if email in roster]
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _csv_records(file: BinaryIO, chunk_size: int) -> Iterator[List[Dict[str, any]]]:
+    # sep=None sniffs the delimiter (spreadsheet exports often use ";")
+    try:
+        reader = pd.read_csv(
+            file, chunksize=chunk_size, dtype=str, keep_default_na=False,
+            sep=None, engine="python", encoding="utf-8-sig"
+        )
+        for frame in reader:
+            frame.columns = [str(column).strip().lower() for column in frame.columns]
+            yield frame.to_dict("records")
+    except csv.Error as error:
+        raise ValueError(str(error))
+
+
+def _xlsx_records(file: BinaryIO, chunk_size: int) -> Iterator[List[Dict[str, any]]]:
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(column).strip().lower() if column is not None else "" for column in header]
+
+        chunk = []
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            chunk.append(dict(zip(columns, values)))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+
+def read_roster_chunks(
+    file: BinaryIO,
+    filename: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Iterator[List[Dict[str, Optional[str]]]]:
+    """
+    Rows of a CSV or XLSX roster, chunk_size at a time
+
+    Each row is a dict with the ROSTER_COLUMNS keys (missing cells are None).
+    """
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        records = _xlsx_records(file, chunk_size)
+    elif filename.lower().endswith((".csv", ".txt")):
+        records = _csv_records(file, chunk_size)
+    else:
+        raise ValueError("Unsupported file type, expected .csv or .xlsx")
+
+    for index, chunk in enumerate(records):
+        if index == 0 and chunk:
+            missing = [column for column in ("name", "email") if column not in chunk[0]]
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+        yield [{column: _clean(record.get(column)) for column in ROSTER_COLUMNS} for record in chunk]
+
+
+def import_roster(
+    db: Session,
+    project_id: int,
+    chunks: Iterator[List[Dict[str, Optional[str]]]]
+) -> Iterator[Dict[str, any]]:
+    """
+    Import a roster chunk by chunk, committing each chunk
+
+    Yields one progress dict per chunk (rows processed so far, created,
+    existing and rejected counts), then a final one with "done": True and
+    the first rejected rows. If the file turns out to be malformed part way,
+    the final dict also has "failed" (the chunks before it stay imported).
+    A chunk refused by the database is rolled back, its rows counted as
+    rejected and reported as one error with its line range.
+    """
+    report = {"processed": 0, "created": 0, "existing": 0, "rejected": 0, "done": False}
+    errors = []
+    line = 1  # Header line
+
+    while True:
+        try:
+            chunk = next(chunks, None)
+        except ValueError as error:
+            yield {**report, "done": True, "errors": errors, "failed": str(error)}
+            return
+        if chunk is None:
+            break
+
+        first_line = line + 1
+        valid = []
+        for row in chunk:
+            line += 1
+            try:
+                valid.append(StudentCSVData(**row))
+            except ValidationError as error:
+                report["rejected"] += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line, "email": row.get("email"), "error": error.errors()[0]["msg"]})
+
+        if valid:
+            try:
+                created_count, existing_count, _ = import_student_chunk(db, project_id, valid)
+                db.commit()
+            except IntegrityError as error:
+                db.rollback()
+                report["rejected"] += len(valid)
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({
+                        "line": first_line,
+                        "email": None,
+                        "error": f"Lines {first_line}-{line} not imported: {error.orig}"
+                    })
+            else:
+                report["created"] += created_count
+                report["existing"] += existing_count
+        report["processed"] += len(chunk)
+        yield dict(report)
+
+    yield {**report, "done": True, "errors": errors}
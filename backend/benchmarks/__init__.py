@@ -0,0 +1,6 @@
+"""
+Benchmarks for the assignment algorithms
+
+Run from the backend directory:
+    python -m benchmarks.run_benchmarks --output benchmarks/results.json
+"""
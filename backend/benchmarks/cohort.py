@@ -0,0 +1,89 @@
+"""
+Synthetic Cohort Generator
+
+Builds (student_ids, preferences) inputs for assign_students_to_groups with a
+controlled preference structure:
+1. Mutual pairs (A <-> B)
+2. Cycles of length 3 to group_size (A -> B -> C -> A)
+3. Chains (A -> B -> C -> random student)
+4. Students without a preference (None)
+5. Everybody else chooses a random classmate
+"""
+
+from typing import List, Dict, Tuple, Optional
+import random
+
+
+def generate_cohort(
+    n: int,
+    group_size: int = 3,
+    mutual_ratio: float = 0.2,
+    cycle_ratio: float = 0.1,
+    chain_ratio: float = 0.1,
+    no_preference_ratio: float = 0.1,
+    seed: Optional[int] = 0
+) -> Tuple[List[int], Dict[int, Optional[int]]]:
+    """
+    Generate a cohort of n students
+
+    Args:
+        n: Number of students
+        group_size: Target group size (longest generated cycle)
+        mutual_ratio: Share of students in mutual pairs
+        cycle_ratio: Share of students in cycles of length 3 or more
+        chain_ratio: Share of students in chains
+        no_preference_ratio: Share of students without a preferred partner
+        seed: Seed for reproducible cohorts
+
+    Returns:
+        Tuple of (student_ids, preferences) in the format of assign_students_to_groups
+    """
+    if mutual_ratio + cycle_ratio + chain_ratio + no_preference_ratio > 1:
+        raise ValueError("Structure ratios must add up to at most 1")
+
+    rng = random.Random(seed)
+    student_ids = list(range(1, n + 1))
+    pool = student_ids[:]
+    rng.shuffle(pool)
+    preferences: Dict[int, Optional[int]] = {}
+
+    def take(count: int) -> List[int]:
+        taken = pool[-count:] if count > 0 else []
+        del pool[len(pool) - len(taken):]
+        return taken
+
+    # Mutual pairs
+    students = take(int(n * mutual_ratio) // 2 * 2)
+    for a, b in zip(students[::2], students[1::2]):
+        preferences[a] = b
+        preferences[b] = a
+
+    # Cycles of length 3..group_size (3 when groups are smaller)
+    remaining = int(n * cycle_ratio)
+    while remaining >= 3:
+        length = min(rng.randint(3, max(3, group_size)), remaining)
+        cycle = take(length)
+        for i, student_id in enumerate(cycle):
+            preferences[student_id] = cycle[(i + 1) % len(cycle)]
+        remaining -= length
+
+    # Chains ending on a random classmate
+    remaining = int(n * chain_ratio)
+    while remaining >= 2:
+        length = min(rng.randint(2, 2 * group_size), remaining)
+        chain = take(length)
+        for a, b in zip(chain, chain[1:]):
+            preferences[a] = b
+        preferences[chain[-1]] = rng.choice(student_ids)
+        remaining -= length
+
+    # No preference
+    for student_id in take(int(n * no_preference_ratio)):
+        preferences[student_id] = None
+
+    # Everybody else picks a random classmate
+    for student_id in pool:
+        partner = rng.choice(student_ids)
+        preferences[student_id] = partner if partner != student_id else None
+
+    return student_ids, preferences
@@ -0,0 +1,135 @@
+"""
+Benchmark Runner for the Grouping Engine
+
+Measures GroupFormationAlgorithm.form_groups and calculate_satisfaction_score
+on synthetic cohorts of growing size and writes the scaling curves (time and
+peak memory vs n) as JSON.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 --repeats 5 --output results.json
+
+Timings are the best of --repeats runs. Peak memory is measured in a separate
+run under tracemalloc, which would otherwise slow the timed runs down.
+"""
+
+from typing import List, Dict, Callable
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.services.group_algorithm import GroupFormationAlgorithm
+from benchmarks.cohort import generate_cohort
+
+DEFAULT_SIZES = [1000, 5000, 10000, 50000, 100000, 200000]
+
+
+def measure(function: Callable[[], any], repeats: int) -> Dict[str, float]:
+    """
+    Best wall-clock time over `repeats` runs, then peak traced memory of one run
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": best, "peak_memory_bytes": peak}
+
+
+def run_benchmarks(
+    sizes: List[int],
+    group_size: int = 3,
+    repeats: int = 3,
+    seed: int = 0,
+    **cohort_options
+) -> Dict[str, any]:
+    """
+    Run every benchmark case for each cohort size
+
+    Returns:
+        Dict with the run configuration and one result entry per size
+    """
+    results = []
+
+    for n in sizes:
+        student_ids, preferences = generate_cohort(n, group_size=group_size, seed=seed, **cohort_options)
+
+        def form_groups():
+            algorithm = GroupFormationAlgorithm(group_size=group_size, rng=random.Random(seed))
+            return algorithm.form_groups(student_ids, preferences)
+
+        groups = form_groups()
+        scorer = GroupFormationAlgorithm(group_size=group_size)
+        scorer.preferences = preferences
+        stats = scorer.calculate_satisfaction_score(groups)
+
+        results.append({
+            "n": n,
+            "form_groups": measure(form_groups, repeats),
+            "calculate_satisfaction_score": measure(lambda: scorer.calculate_satisfaction_score(groups), repeats),
+            "satisfaction_rate": stats["satisfaction_rate"],
+            "mutual_matches": stats["mutual_matches"],
+            "total_groups": stats["total_groups"]
+        })
+        print(
+            f"n={n:>7}  form_groups {results[-1]['form_groups']['seconds'] * 1000:9.1f} ms  "
+            f"score {results[-1]['calculate_satisfaction_score']['seconds'] * 1000:8.1f} ms  "
+            f"satisfaction {stats['satisfaction_rate']:5.1f}%",
+            file=sys.stderr
+        )
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {"group_size": group_size, "repeats": repeats, "seed": seed, **cohort_options},
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the group formation engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Cohort sizes to run")
+    parser.add_argument("--group-size", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mutual-ratio", type=float, default=0.2)
+    parser.add_argument("--cycle-ratio", type=float, default=0.1)
+    parser.add_argument("--chain-ratio", type=float, default=0.1)
+    parser.add_argument("--no-preference-ratio", type=float, default=0.1)
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        sizes=args.sizes,
+        group_size=args.group_size,
+        repeats=args.repeats,
+        seed=args.seed,
+        mutual_ratio=args.mutual_ratio,
+        cycle_ratio=args.cycle_ratio,
+        chain_ratio=args.chain_ratio,
+        no_preference_ratio=args.no_preference_ratio
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
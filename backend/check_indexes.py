@@ -0,0 +1,89 @@
+"""
+Script pour vérifier que les requêtes fréquentes utilisent leurs index (EXPLAIN)
+
+Les requêtes sont celles de preferences.py, forms.py, assignments.py et
+projects.py. Le script affiche le plan de chaque requête et se termine en
+erreur si un index attendu n'apparaît pas (par exemple si les migrations n'ont
+pas été appliquées: alembic upgrade head).
+
+Usage:
+    python check_indexes.py
+"""
+
+import sys
+
+from sqlalchemy import select, text
+
+from app.database import engine
+from app.models import Assignment, FormQuestion, Project, StudentPreference, StudentResponse
+
+# (description, requête, index attendus dans le plan)
+HOT_QUERIES = [
+    (
+        "preferences: préférences d'un projet par rang",
+        select(StudentPreference).where(StudentPreference.project_id == 1).order_by(StudentPreference.rank),
+        ["ix_student_preferences_project_rank"]
+    ),
+    (
+        "preferences: élèves ayant choisi un partenaire",
+        select(StudentPreference.student_id).where(StudentPreference.preferred_partner_id == 1),
+        ["ix_student_preferences_preferred_partner"]
+    ),
+    (
+        "assignments: affectations d'un projet",
+        select(Assignment).where(Assignment.project_id == 1),
+        ["ix_assignments_project_group"]
+    ),
+    (
+        "forms: questions d'un projet dans l'ordre",
+        select(FormQuestion).where(FormQuestion.project_id == 1).order_by(FormQuestion.order),
+        ["ix_form_questions_project_order"]
+    ),
+    (
+        "forms: réponse d'un élève à une question",
+        select(StudentResponse).where(StudentResponse.student_id == 1, StudentResponse.question_id == 1),
+        ["ix_student_responses_student_question"]
+    ),
+    (
+        "forms: réponses d'un projet",
+        select(StudentResponse).join(FormQuestion).where(FormQuestion.project_id == 1),
+        ["ix_form_questions_project_order", "ix_student_responses_question"]
+    ),
+    (
+        "projects: projets actifs d'un professeur",
+        select(Project).where(Project.teacher_id == 1, Project.is_active == True).order_by(Project.created_at.desc()),
+        ["ix_projects_teacher_active_created"]
+    ),
+]
+
+def explain(connection, query) -> str:
+    sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return "\n".join(row[-1] for row in rows)
+    rows = connection.execute(text(f"EXPLAIN {sql}")).all()
+    return "\n".join(row[0] for row in rows)
+
+def main():
+    failures = 0
+
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            # Sur des tables presque vides, PostgreSQL préfère un parcours séquentiel
+            connection.execute(text("SET enable_seqscan = off"))
+
+        for description, query, expected in HOT_QUERIES:
+            plan = explain(connection, query)
+            missing = [name for name in expected if name not in plan]
+            print(f"[{'OK' if not missing else 'ERREUR'}] {description}")
+            for line in plan.splitlines():
+                print(f"    {line}")
+            if missing:
+                print(f"    index non utilisés: {', '.join(missing)}")
+                failures += 1
+
+    print(f"\n{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} requêtes utilisent leurs index")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -3,18 +3,19 @@ Script pour initialiser la base de données
 Crée toutes les tables selon les modèles définis
 """
 
-from app.database import engine, Base
+from app.database import upgrade_database
 from app.models import (
     User, Student, Teacher, Project, Assignment,
-    StudentPreference, FormQuestion, StudentResponse
+    StudentPreference, FormQuestion, StudentResponse, University, AlgorithmRun,
+    PreferenceStats
 )
 
 def init_db():
     """Créer toutes les tables dans la base de données"""
     print("Creation des tables de la base de donnees...")
     
-    # Créer toutes les tables
-    Base.metadata.create_all(bind=engine)
+    # Créer toutes les tables puis appliquer les migrations (index, contraintes)
+    upgrade_database()
     
     print("Base de donnees initialisee avec succes!")
     print("\nTables creees:")
@@ -27,6 +28,9 @@ def init_db():
     print("  - student_responses (reponses des eleves)")
     print("  - student_preferences (preferences des eleves)")
     print("  - assignments (affectations finales)")
+    print("  - universities (places des programmes d'echange)")
+    print("  - algorithm_runs (historique des executions de l'algorithme)")
+    print("  - preference_stats (compteurs des statistiques de preferences)")
 
 if __name__ == "__main__":
     init_db()
@@ -1,10 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.routes import auth, students, projects, assignments, teachers, forms, preferences
-from app.database import engine, Base
+from app.database import async_engine, upgrade_database
+from app.services.job_queue import job_queue
+from app.services.preference_stats import stats_reconciler
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and apply migrations (indexes, constraints)
+upgrade_database()
 
 app = FastAPI(
     title="Student Assignment API",
@@ -19,6 +22,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # Cursor of the next page on list endpoints
 )
 
 # Include routers
@@ -38,6 +42,19 @@ async def root():
         "version": "1.0.0"
     }
 
+@app.on_event("startup")
+def start_stats_reconciler():
+    stats_reconciler.start()
+
+@app.on_event("shutdown")
+def stop_algorithm_jobs():
+    job_queue.shutdown()
+    stats_reconciler.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
@@ -0,0 +1,45 @@
+"""Add indexes on the hot lookup columns
+
+Databases created before migrations existed (Base.metadata.create_all) have
+none of these indexes. Fresh databases get them from the models through
+create_all, so each index is only created when it is missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_student_preferences_project_rank', 'student_preferences', ['project_id', 'rank']),
+    ('ix_student_preferences_preferred_partner', 'student_preferences', ['preferred_partner_id']),
+    ('ix_assignments_project_group', 'assignments', ['project_id', 'group_number']),
+    ('ix_form_questions_project_order', 'form_questions', ['project_id', 'order']),
+    ('ix_student_responses_student_question', 'student_responses', ['student_id', 'question_id']),
+    ('ix_student_responses_question', 'student_responses', ['question_id']),
+    ('ix_projects_teacher_active_created', 'projects', ['teacher_id', 'is_active', 'created_at']),
+]
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
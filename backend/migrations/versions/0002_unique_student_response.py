@@ -0,0 +1,49 @@
+"""Make (student_id, question_id) unique on student_responses
+
+Form submissions upsert on (student_id, question_id), which needs a unique
+index. Duplicate responses left by the old submission path are removed first
+(the most recent one of each pair is kept).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEX = 'ix_student_responses_student_question'
+TABLE = 'student_responses'
+COLUMNS = ['student_id', 'question_id']
+
+
+def _index(name):
+    for index in sa.inspect(op.get_bind()).get_indexes(TABLE):
+        if index['name'] == name:
+            return index
+    return None
+
+
+def upgrade():
+    index = _index(INDEX)
+    if index and index['unique']:
+        return
+
+    op.execute(
+        "DELETE FROM student_responses WHERE id NOT IN ("
+        "SELECT MAX(id) FROM student_responses GROUP BY student_id, question_id)"
+    )
+    if index:
+        op.drop_index(INDEX, table_name=TABLE)
+    op.create_index(INDEX, TABLE, COLUMNS, unique=True)
+
+
+def downgrade():
+    if _index(INDEX):
+        op.drop_index(INDEX, table_name=TABLE)
+    op.create_index(INDEX, TABLE, COLUMNS)
@@ -0,0 +1,41 @@
+"""Add the preference_stats counters table
+
+The row itself is created by the first stats read (a full recount), so the
+counters start from the current data.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+TABLE = 'preference_stats'
+
+
+def upgrade():
+    # Fresh databases already have it (create_all)
+    if sa.inspect(op.get_bind()).has_table(TABLE):
+        return
+    op.create_table(
+        TABLE,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('total_students', sa.Integer(), nullable=False),
+        sa.Column('students_with_preferences', sa.Integer(), nullable=False),
+        sa.Column('total_active_projects', sa.Integer(), nullable=False),
+        sa.Column('total_preferences', sa.Integer(), nullable=False),
+        sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table(TABLE):
+        op.drop_table(TABLE)
@@ -0,0 +1,45 @@
+"""
+Script pour lancer l'algorithme de groupes sur tous les projets de groupe actifs
+
+Usage:
+    python run_batch.py
+    python run_batch.py --projects 1 2 3 --time-budget-ms 2000 --seed 42
+"""
+
+import argparse
+
+from app.database import SessionLocal
+from app.services.batch_runner import run_group_projects_batch
+
+def main():
+    parser = argparse.ArgumentParser(description="Run group formation for many projects at once")
+    parser.add_argument("--projects", type=int, nargs="+", help="Project ids (default: every active group project)")
+    parser.add_argument("--time-budget-ms", type=int, help="Local search budget per project")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="Processes used to solve projects (default: CPU count)")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        report = run_group_projects_batch(
+            db,
+            project_ids=args.projects,
+            time_budget_ms=args.time_budget_ms,
+            seed=args.seed,
+            workers=args.workers
+        )
+    finally:
+        db.close()
+    
+    for result in report["projects"]:
+        if result["status"] == "success":
+            print(f"Projet {result['project_id']}: {result['groups_created']} groupes, "
+                  f"{result['stats']['satisfaction_rate']:.1f}% satisfaits ({result['solve_seconds']:.2f}s)")
+        else:
+            print(f"Projet {result['project_id']}: {result['status']} - {result['detail']}")
+    print(f"\nTemps total: {report['total_seconds']:.2f}s")
+    
+    return report
+
+if __name__ == "__main__":
+    main()
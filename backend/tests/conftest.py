@@ -0,0 +1,31 @@
+"""
+Shared fixtures: the API and service modules run against a throwaway SQLite database
+"""
+
+import os
+import tempfile
+
+import pytest
+
+# Before anything imports app.config: the engines are built at import time
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(prefix="student-assignment-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_FILE}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+
+@pytest.fixture
+def db():
+    """
+    A session on freshly created tables, dropped again after the test
+    """
+    from app import models  # noqa: F401 (registers every table)
+    from app.database import Base, SessionLocal, engine
+
+    engine.echo = False
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
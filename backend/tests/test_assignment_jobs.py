@@ -0,0 +1,75 @@
+"""
+Queued algorithm runs: a cancelled solve leaves nothing behind
+"""
+
+import time
+
+from app.api.routes.assignments import RunAlgorithmRequest, _load_preferences, _preview_key, _run_algorithm
+from app.database import SessionLocal
+from app.models import Filiere, Project, Student, StudentPreference, Teacher, User, UserRole
+from app.models.project import ProjectType
+from app.services.job_queue import CANCELLED, JobQueue
+from app.services.preview_cache import preview_cache
+from benchmarks.cohort import generate_cohort
+
+
+def seed_group_project(db, n_students):
+    teacher_user = User(email="teacher@example.com", username="teacher", hashed_password="x", role=UserRole.TEACHER)
+    db.add(teacher_user)
+    db.flush()
+    teacher = Teacher(user_id=teacher_user.id)
+    db.add(teacher)
+    db.flush()
+    project = Project(teacher_id=teacher.id, title="Groups", project_type=ProjectType.GROUP_PROJECT, group_size=3)
+    db.add(project)
+    db.flush()
+
+    students = []
+    for i in range(n_students):
+        user = User(email=f"s{i}@example.com", username=f"s{i}", hashed_password="x", role=UserRole.STUDENT)
+        db.add(user)
+        db.flush()
+        students.append(Student(user_id=user.id, student_number=f"N{i}", filiere=Filiere.INFORMATIQUE))
+    db.add_all(students)
+    db.flush()
+
+    cohort_ids, cohort_preferences = generate_cohort(n_students, group_size=3, seed=0)
+    student_of = {cohort_id: student.id for cohort_id, student in zip(cohort_ids, students)}
+    for cohort_id, partner in cohort_preferences.items():
+        db.add(StudentPreference(
+            student_id=student_of[cohort_id], project_id=project.id, rank=1,
+            preferred_partner_id=student_of.get(partner)
+        ))
+    db.commit()
+    return project
+
+
+def test_cancelled_solve_is_not_cached(db):
+    project = seed_group_project(db, 600)
+    request = RunAlgorithmRequest(
+        project_id=project.id, solver="genetic", generations=100000, time_budget_ms=60000, seed=3, dry_run=True
+    )
+    queue = JobQueue(max_workers=1)
+
+    def run(job):
+        job_db = SessionLocal()
+        try:
+            return _run_algorithm(request, job_db, job.report, job.cancel_requested)
+        finally:
+            job_db.close()
+
+    job = queue.submit(run, project_id=project.id)
+    deadline = time.monotonic() + 10
+    while job.phase != "solving" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    queue.cancel(job.id)
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    queue.shutdown()
+
+    assert job.status == CANCELLED
+    assert job.result is None
+    parameters = request.dict(exclude={"project_id", "dry_run"})
+    key, _ = _preview_key(project, _load_preferences(project.id, db), parameters, db)
+    assert preview_cache.get(key) is None
@@ -0,0 +1,41 @@
+"""
+English leveling: level-sorted groups, students without a known level kept apart
+"""
+
+import random
+
+import pytest
+
+from app.services.english_leveling import ENGLISH_LEVELS, assign_students_by_level
+
+
+@pytest.mark.parametrize("n", [2, 5, 9, 17, 40])
+def test_every_student_in_one_group_of_k_or_k_minus_one(n):
+    rng = random.Random(n)
+    students = [(i, rng.choice(ENGLISH_LEVELS), rng.uniform(8, 18)) for i in range(n)]
+    groups, stats = assign_students_by_level(students, group_size=4)
+
+    assert sorted(s for group in groups for s in group) == list(range(n))
+    if n >= 6:
+        assert {len(group) for group in groups} <= {3, 4}
+    assert stats["students_without_level"] == 0
+
+
+def test_students_without_level_are_not_put_in_b1_groups():
+    students = [(i, "B1", 12.0) for i in range(8)] + [(100, None, 14.0), (101, "Z9", 11.0), (102, "", None), (103, None, 9.0)]
+    groups, stats = assign_students_by_level(students, group_size=4)
+
+    unknown = {100, 101, 102, 103}
+    assert unknown in [set(group) for group in groups]
+    assert stats["students_without_level"] == 4
+    assert stats["homogeneous_groups"] == 2
+    assert stats["max_level_spread"] == 0
+
+
+def test_mixed_groups_are_a_last_resort():
+    # 4 C2 students and 3 without level: 7 = 4 + 3, no group needs to mix them
+    students = [(i, "C2", None) for i in range(4)] + [(10 + i, None, None) for i in range(3)]
+    groups, stats = assign_students_by_level(students, group_size=4)
+
+    assert sorted(map(sorted, groups)) == [[0, 1, 2, 3], [10, 11, 12]]
+    assert stats["average_level_spread"] == 0
@@ -0,0 +1,74 @@
+"""
+Exact solver against a brute force over every grouping, for n <= 10
+"""
+
+import random
+
+import pytest
+
+from app.services.exact_solver import MAX_EXACT_STUDENTS, solve_groups_exactly
+from app.services.group_algorithm import partition_group_sizes
+
+
+def brute_force(student_ids, preferences, group_size):
+    """
+    Best number of satisfied students over every grouping with the partition sizes
+
+    As in calculate_satisfaction_score, a student who chose themselves is satisfied.
+    """
+    capacities = partition_group_sizes(len(student_ids), group_size)
+    label = {}
+    free = list(capacities)
+    best = 0
+
+    def search(i):
+        nonlocal best
+        if i == len(student_ids):
+            best = max(best, sum(
+                1 for s in student_ids
+                if preferences.get(s) in label and label[preferences[s]] == label[s]
+            ))
+            return
+        tried_empty = set()
+        for g, seats in enumerate(free):
+            if seats == 0:
+                continue
+            # Empty groups of the same size are interchangeable
+            if seats == capacities[g]:
+                if seats in tried_empty:
+                    continue
+                tried_empty.add(seats)
+            label[student_ids[i]] = g
+            free[g] -= 1
+            search(i + 1)
+            free[g] += 1
+        del label[student_ids[i]]
+
+    search(0)
+    return best
+
+
+def random_instance(rng):
+    n = rng.randint(1, 10)
+    student_ids = rng.sample(range(1, 100), n)
+    choices = student_ids + [None, 500]
+    return student_ids, {student_id: rng.choice(choices) for student_id in student_ids}
+
+
+@pytest.mark.parametrize("group_size", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(25))
+def test_value_equals_brute_force(group_size, seed):
+    student_ids, preferences = random_instance(random.Random(seed * 7 + group_size))
+    groups, stats = solve_groups_exactly(student_ids, preferences, group_size, time_budget_ms=250, seed=seed)
+
+    assert stats["optimal"]
+    assert stats["solution_value"] == stats["satisfied_students"] == stats["upper_bound"]
+    assert stats["solution_value"] == brute_force(student_ids, preferences, group_size)
+    assert sorted(s for group in groups for s in group) == sorted(student_ids)
+    assert sorted(map(len, groups)) == sorted(partition_group_sizes(len(student_ids), group_size))
+
+
+def test_too_many_students_are_refused():
+    student_ids = list(range(MAX_EXACT_STUDENTS + 1))
+    with pytest.raises(ValueError):
+        solve_groups_exactly(student_ids, {}, 3)
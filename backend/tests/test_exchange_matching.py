@@ -0,0 +1,97 @@
+"""
+Exchange matching: stability, capacities and English requirements
+"""
+
+import enum
+import random
+
+import pytest
+
+from app.services.english_leveling import ENGLISH_LEVELS, LEVEL_INDEX
+from app.services.exchange_matching import match_students_to_universities, parse_university_ranking
+
+
+class EnglishLevel(str, enum.Enum):
+    # Same shape as app.models.student.EnglishLevel (importing models needs a database driver)
+    B1 = "B1"
+    B2 = "B2"
+    C1 = "C1"
+
+
+def priority(students, student_id):
+    # Same order as the universities: general rank, then GPA (higher first), then id
+    general_rank, gpa, _ = students[student_id]
+    return (
+        general_rank if general_rank is not None else float("inf"),
+        -gpa if gpa is not None else float("inf"),
+        student_id
+    )
+
+
+def eligible(students, requirements, student_id, code):
+    required = requirements.get(code)
+    if required is None:
+        return True
+    level = students[student_id][2]
+    return level is not None and LEVEL_INDEX[level] >= LEVEL_INDEX[required]
+
+
+def random_instance(rng):
+    codes = [chr(ord("A") + u) for u in range(rng.randint(1, 6))]
+    capacities = {code: rng.randint(0, 4) for code in codes}
+    requirements = {code: rng.choice([None, None] + ENGLISH_LEVELS) for code in codes}
+
+    students = {}
+    rankings = {}
+    for student_id in range(1, rng.randint(1, 30) + 1):
+        students[student_id] = (
+            rng.choice([None] + list(range(1, 40))),
+            rng.choice([None, round(rng.uniform(8, 18), 1)]),
+            rng.choice([None] + ENGLISH_LEVELS)
+        )
+        # Unknown codes are ignored by the matching
+        rankings[student_id] = rng.sample(codes + ["ZZ"], rng.randint(0, len(codes) + 1))
+    return rankings, capacities, students, requirements
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matching_is_stable_and_feasible(seed):
+    rankings, capacities, students, requirements = random_instance(random.Random(seed))
+    matching, _ = match_students_to_universities(rankings, capacities, students, requirements)
+
+    assert set(matching) == set(rankings)
+    held = {code: [] for code in capacities}
+    for student_id, code in matching.items():
+        if code is not None:
+            assert code in rankings[student_id]
+            assert eligible(students, requirements, student_id, code)
+            held[code].append(student_id)
+
+    for code, members in held.items():
+        assert len(members) <= capacities[code]
+
+    # No blocking pair: a university a student prefers to their match is full of better students
+    for student_id, ranking in rankings.items():
+        matched = matching[student_id]
+        preferred = ranking[:ranking.index(matched)] if matched else ranking
+        for code in preferred:
+            if code not in capacities or capacities[code] == 0:
+                continue
+            if not eligible(students, requirements, student_id, code):
+                continue
+            assert len(held[code]) == capacities[code]
+            assert all(priority(students, other) < priority(students, student_id) for other in held[code])
+
+
+def test_english_level_enum_values_are_accepted():
+    students = {1: (1, 15.0, EnglishLevel.B1), 2: (2, 14.0, EnglishLevel.C1)}
+    matching, _ = match_students_to_universities(
+        {1: ["A", "B"], 2: ["A"]}, {"A": 1, "B": 1}, students, {"A": EnglishLevel.B2, "B": None}
+    )
+
+    assert matching == {1: "B", 2: "A"}
+
+
+def test_parse_university_ranking_drops_blanks_and_duplicates():
+    assert parse_university_ranking(" a, B,,a ,c ") == ["A", "B", "C"]
+    assert parse_university_ranking(None) == []
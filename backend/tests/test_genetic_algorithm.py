@@ -0,0 +1,61 @@
+"""
+Genetic group formation: valid groupings, incremental swap delta, and a gain over the greedy start
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.services.genetic_algorithm import GeneticGroupAlgorithm, evolve_groups
+from app.services.group_algorithm import assign_students_to_groups, partition_group_sizes
+from benchmarks.cohort import generate_cohort
+
+
+def satisfied(groups, preferences):
+    group_of = {student_id: g for g, group in enumerate(groups) for student_id in group}
+    return sum(
+        1 for student_id, partner in preferences.items()
+        if partner is not None and partner in group_of and group_of[partner] == group_of[student_id]
+    )
+
+
+@pytest.mark.parametrize("n,group_size", [(1, 3), (10, 3), (31, 4), (200, 3)])
+def test_groups_cover_every_student_with_partition_sizes(n, group_size):
+    student_ids, preferences = generate_cohort(n, group_size=group_size, seed=n)
+    groups, _ = evolve_groups(student_ids, preferences, group_size, generations=20, seed=1, time_budget_s=None)
+
+    assert sorted(s for group in groups for s in group) == sorted(student_ids)
+    assert sorted(len(group) for group in groups) == sorted(partition_group_sizes(n, group_size))
+
+
+def test_swap_delta_matches_full_rescore():
+    student_ids, preferences = generate_cohort(120, group_size=3, seed=3)
+    algorithm = GeneticGroupAlgorithm(group_size=3, seed=3)
+    algorithm._prepare(student_ids, preferences)
+    rng = random.Random(3)
+    labels = np.random.default_rng(3).permutation(algorithm.base_labels).tolist()
+
+    def score(labels):
+        groups = [[] for _ in algorithm.capacity_list]
+        for i, label in enumerate(labels):
+            groups[label].append(student_ids[i])
+        return satisfied(groups, preferences)
+
+    for _ in range(500):
+        a, b = rng.randrange(len(labels)), rng.randrange(len(labels))
+        if labels[a] == labels[b]:
+            continue
+        swapped = list(labels)
+        swapped[a], swapped[b] = labels[b], labels[a]
+        assert algorithm._swap_delta(labels, a, b) == score(swapped) - score(labels)
+        labels = swapped
+
+
+def test_improves_on_the_greedy_grouping():
+    student_ids, preferences = generate_cohort(600, group_size=3, seed=0)
+    _, greedy = assign_students_to_groups(student_ids, preferences, 3, seed=0)
+    groups, stats = evolve_groups(student_ids, preferences, 3, generations=100, seed=0, time_budget_s=None)
+
+    assert stats["satisfied_students"] == satisfied(groups, preferences)
+    assert stats["satisfied_students"] > greedy["satisfied_students"]
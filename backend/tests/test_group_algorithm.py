@@ -0,0 +1,66 @@
+"""
+Greedy group formation: every student placed once, balanced sizes, replayable seeds
+"""
+
+import random
+
+import pytest
+
+from app.services.group_algorithm import assign_students_to_groups, partition_group_sizes
+from benchmarks.cohort import generate_cohort
+
+
+def random_preferences(n, rng):
+    # Arbitrary graph: self choices, unknown partners and students without a choice
+    student_ids = rng.sample(range(1, 10 * n + 1), n)
+    choices = student_ids + [None, 0, -1]
+    return student_ids, {student_id: rng.choice(choices) for student_id in student_ids}
+
+
+def assert_valid_grouping(groups, student_ids, group_size):
+    placed = [student_id for group in groups for student_id in group]
+    assert sorted(placed) == sorted(student_ids)
+
+    sizes = [len(group) for group in groups]
+    if sizes:
+        assert max(sizes) <= group_size
+        assert max(sizes) - min(sizes) <= 1
+    assert len(groups) == -(-len(student_ids) // group_size)
+
+
+@pytest.mark.parametrize("group_size", [1, 2, 3, 4, 5])
+@pytest.mark.parametrize("n", [0, 1, 2, 7, 13, 50, 301])
+def test_random_graphs_give_valid_groupings(n, group_size):
+    rng = random.Random(n * 10 + group_size)
+    student_ids, preferences = random_preferences(n, rng)
+    groups, stats = assign_students_to_groups(student_ids, preferences, group_size, seed=n)
+
+    assert_valid_grouping(groups, student_ids, group_size)
+    assert stats["total_students"] == n
+
+
+@pytest.mark.parametrize("restarts", [1, 3])
+def test_local_search_and_restarts_keep_groupings_valid(restarts):
+    student_ids, preferences = generate_cohort(500, group_size=4, seed=2)
+    groups, _ = assign_students_to_groups(
+        student_ids, preferences, 4, time_budget_ms=50, seed=2, restarts=restarts, workers=1
+    )
+
+    assert_valid_grouping(groups, student_ids, 4)
+
+
+def test_partition_sizes_differ_by_at_most_one():
+    for n in range(0, 60):
+        for group_size in range(1, 7):
+            sizes = partition_group_sizes(n, group_size)
+            assert sum(sizes) == n
+            assert all(size <= group_size for size in sizes)
+            assert not sizes or max(sizes) - min(sizes) <= 1
+
+
+def test_reported_seed_replays_the_grouping():
+    student_ids, preferences = generate_cohort(300, group_size=3, seed=5)
+    groups, stats = assign_students_to_groups(student_ids, preferences, 3)
+
+    assert stats["seed"] is not None
+    assert assign_students_to_groups(student_ids, preferences, 3, seed=stats["seed"])[0] == groups
@@ -0,0 +1,69 @@
+"""
+Local search: incremental deltas against a full rescore, and valid results
+"""
+
+import random
+
+import pytest
+
+from app.services.group_algorithm import GroupFormationAlgorithm, assign_students_to_groups
+from app.services.local_search import GroupLocalSearch, optimise_groups
+from benchmarks.cohort import generate_cohort
+
+
+def satisfied(groups, preferences):
+    scorer = GroupFormationAlgorithm()
+    scorer.preferences = preferences
+    return scorer.calculate_satisfaction_score(groups)["satisfied_students"]
+
+
+@pytest.mark.parametrize("group_size", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(5))
+def test_delta_equals_full_rescore(group_size, seed):
+    rng = random.Random(seed)
+    student_ids, preferences = generate_cohort(61, group_size=group_size, seed=seed)
+    # Dense preference cycles and self choices make the admirer counters matter
+    for student_id in rng.sample(student_ids, 20):
+        preferences[student_id] = rng.choice(student_ids)
+    groups, _ = assign_students_to_groups(student_ids, preferences, group_size, seed=seed)
+
+    search = GroupLocalSearch(group_size=group_size, rng=rng)
+    search._build_state(groups, preferences)
+    score = search._score()
+    checked = 0
+    while checked < 2000:
+        move = search._propose()
+        if move is None:
+            continue
+        delta = search._delta(*move)
+        search._apply(*move)
+        new_score = search._score()
+        assert delta == new_score - score, move
+        score = new_score
+        checked += 1
+
+    sizes = [len(members) for members in search.members]
+    assert set(sizes) <= {group_size - 1, group_size}
+    for g, members in enumerate(search.members):
+        for slot, i in enumerate(members):
+            assert search.group_of[i] == g and search.position[i] == slot
+
+
+def test_optimise_returns_a_valid_grouping_and_reports_its_gain():
+    student_ids, preferences = generate_cohort(900, group_size=3, seed=4)
+    groups, _ = assign_students_to_groups(student_ids, preferences, 3, seed=4)
+    optimised, details = optimise_groups(groups, preferences, 3, time_budget_ms=200, rng=random.Random(4))
+
+    assert sorted(s for group in optimised for s in group) == sorted(student_ids)
+    assert sorted(len(group) for group in optimised) == sorted(len(group) for group in groups)
+    assert details["local_search_gain"] >= 0
+    assert satisfied(optimised, preferences) - satisfied(groups, preferences) == details["local_search_gain"]
+
+
+def test_should_stop_ends_the_search_early():
+    student_ids, preferences = generate_cohort(300, group_size=3, seed=6)
+    groups, _ = assign_students_to_groups(student_ids, preferences, 3, seed=6)
+    search = GroupLocalSearch(group_size=3, time_budget_ms=60000, should_stop=lambda: True)
+
+    assert sorted(map(len, search.optimise(groups, preferences))) == sorted(map(len, groups))
+    assert search.iterations <= 1
@@ -0,0 +1,74 @@
+"""
+Min-cost-flow project assignment against a brute force on small instances
+"""
+
+import itertools
+import random
+
+import pytest
+
+from app.services.project_assignment import assign_students_to_projects
+
+
+def objective(assignment, preferences, capacities):
+    """
+    Lexicographic cost of the solver: students left out, seats above the
+    project minimums, then the total rank obtained
+    """
+    counts = {project_id: 0 for project_id in capacities}
+    rank_total = 0
+    for student_id, project_id in assignment.items():
+        if project_id is not None:
+            counts[project_id] += 1
+            rank_total += preferences[student_id][project_id]
+    unassigned = sum(1 for project_id in assignment.values() if project_id is None)
+    above_minimum = sum(max(0, counts[p] - min(minimum, maximum)) for p, (minimum, maximum) in capacities.items())
+    return unassigned, above_minimum, rank_total
+
+
+def feasible(assignment, preferences, capacities):
+    counts = {}
+    for student_id, project_id in assignment.items():
+        if project_id is not None:
+            assert project_id in preferences[student_id]
+            counts[project_id] = counts.get(project_id, 0) + 1
+    return all(count <= capacities[project_id][1] for project_id, count in counts.items())
+
+
+def brute_force(preferences, capacities):
+    student_ids = list(preferences)
+    options = [[None] + list(preferences[student_id]) for student_id in student_ids]
+    best = None
+    for choice in itertools.product(*options):
+        assignment = dict(zip(student_ids, choice))
+        if feasible(assignment, preferences, capacities):
+            cost = objective(assignment, preferences, capacities)
+            best = cost if best is None else min(best, cost)
+    return best
+
+
+def random_instance(rng):
+    project_ids = list(range(100, 100 + rng.randint(1, 4)))
+    capacities = {}
+    for project_id in project_ids:
+        maximum = rng.randint(0, 3)
+        capacities[project_id] = (rng.randint(0, maximum + 1), maximum)
+
+    preferences = {}
+    for student_id in range(1, rng.randint(1, 7) + 1):
+        chosen = rng.sample(project_ids, rng.randint(1, len(project_ids)))
+        # Ranks are not always contiguous (withdrawn choices)
+        ranks = sorted(rng.sample(range(1, 6), len(chosen)))
+        preferences[student_id] = dict(zip(chosen, ranks))
+    return preferences, capacities
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_matches_brute_force(seed):
+    preferences, capacities = random_instance(random.Random(seed))
+    assignment, stats = assign_students_to_projects(preferences, capacities)
+
+    assert set(assignment) == set(preferences)
+    assert feasible(assignment, preferences, capacities)
+    assert objective(assignment, preferences, capacities) == brute_force(preferences, capacities)
+    assert stats["assigned_students"] + stats["unassigned_students"] == len(preferences)
@@ -0,0 +1,65 @@
+"""
+Saving a project assignment: run history and the assignments it replaces
+"""
+
+from app.api.routes.assignments import _replace_project_assignments
+from app.models import AlgorithmRun, Assignment, Filiere, Project, Student, StudentPreference, Teacher, User, UserRole
+from app.models.project import ProjectType
+from app.services.run_history import get_active_run, record_run
+
+
+def add_user(db, name, role):
+    user = User(email=f"{name}@example.com", username=name, hashed_password="x", role=role)
+    db.add(user)
+    db.flush()
+    return user
+
+
+def test_runs_only_for_filled_projects_and_cleared_groups_reported(db):
+    teacher = Teacher(user_id=add_user(db, "teacher", UserRole.TEACHER).id)
+    db.add(teacher)
+    db.flush()
+    chosen, empty, groups = [
+        Project(teacher_id=teacher.id, title=title, project_type=project_type)
+        for title, project_type in [
+            ("Chosen", ProjectType.GROUP_PROJECT),
+            ("Empty", ProjectType.GROUP_PROJECT),
+            ("Groups", ProjectType.GROUP_PROJECT)
+        ]
+    ]
+    db.add_all([chosen, empty, groups])
+    students = [
+        Student(user_id=add_user(db, f"s{i}", UserRole.STUDENT).id, student_number=f"N{i}", filiere=Filiere.AUTRE)
+        for i in range(2)
+    ]
+    db.add_all(students)
+    db.flush()
+
+    # Earlier runs: a group run holding the first student, and an older run of the empty project
+    group_row = {
+        "student_id": students[0].id, "project_id": groups.id, "group_number": 1,
+        "preference_rank": None, "satisfaction_score": 10.0, "algorithm_run_id": "group-run"
+    }
+    db.add(Assignment(**group_row))
+    record_run(db, groups.id, "group-run", "greedy", None, {}, [group_row])
+    record_run(db, empty.id, "empty-run", "project_assignment", None, {}, [])
+    db.flush()
+
+    preferences = {student.id: {chosen.id: 1, empty.id: 2} for student in students}
+    db.add_all([
+        StudentPreference(student_id=student_id, project_id=project_id, rank=rank)
+        for student_id, ranks in preferences.items() for project_id, rank in ranks.items()
+    ])
+    db.flush()
+    created, cleared = _replace_project_assignments(
+        db, {chosen.id: (0, 5), empty.id: (0, 5)}, preferences,
+        {student.id: chosen.id for student in students}, {"satisfaction_rate": 100.0}, {}, 0.1
+    )
+    db.commit()
+
+    assert created == 2
+    assert cleared == [groups.id]
+    assert get_active_run(db, chosen.id).total_assignments == 2
+    assert db.query(AlgorithmRun).filter(AlgorithmRun.project_id == empty.id).count() == 1
+    assert get_active_run(db, groups.id) is None
+    assert db.query(Assignment).filter(Assignment.project_id == groups.id).count() == 0
@@ -0,0 +1,50 @@
+"""
+Teacher list: bounded by default, cursor pages and the deprecated skip offset
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.routes.teachers import get_all_teachers
+from app.models import Teacher, User, UserRole
+
+
+@pytest.fixture
+def teachers(db):
+    for i in range(130):
+        user = User(email=f"t{i}@example.com", username=f"t{i}", hashed_password="x", role=UserRole.TEACHER)
+        db.add(user)
+        db.flush()
+        db.add(Teacher(user_id=user.id))
+    db.commit()
+    return [teacher.id for teacher in db.query(Teacher).order_by(Teacher.id)]
+
+
+def list_teachers(db, **params):
+    response = Response()
+    params = {"cursor": None, "limit": 100, "skip": None, "fields": None, **params}
+    return get_all_teachers(response, db=db, **params), response.headers.get(NEXT_CURSOR_HEADER)
+
+
+def test_default_page_is_bounded_and_has_a_cursor(db, teachers):
+    first, cursor = list_teachers(db)
+    second, last_cursor = list_teachers(db, cursor=cursor)
+
+    assert [t.id for t in first] == teachers[:100]
+    assert [t.id for t in second] == teachers[100:]
+    assert last_cursor is None
+
+
+def test_skip_is_still_an_offset(db, teachers):
+    page, cursor = list_teachers(db, skip=120, limit=5)
+
+    assert [t.id for t in page] == teachers[120:125]
+    assert cursor is None
+
+
+def test_skip_with_a_cursor_is_refused(db, teachers):
+    _, cursor = list_teachers(db)
+    with pytest.raises(HTTPException) as error:
+        list_teachers(db, cursor=cursor, skip=10)
+    assert error.value.status_code == 400